@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+End-to-End-Benchmark des Dokumenten-Scrapers gegen einen lokalen Replay-Server
+
+Ein lokaler HTTP-Server liefert eine aufgezeichnete Kopie der Dokumentenseite samt
+Dateien aus, wahlweise mit künstlicher Latenz pro Anfrage und begrenzter Bandbreite.
+scraper_dokumente.main() läuft zuerst kalt (leerer data-Ordner) und danach warm
+(gleicher data-Ordner, alle Dokumente bekannt). Pro Lauf werden Laufzeit, Anfragen
+und übertragene Bytes aus Sicht des Servers und des Scrapers ausgegeben.
+
+Aufruf mit einer Kopie der echten Seite, Pfade relativ zum Host wie bei
+wget --mirror --no-host-directories (Seiten mit Query liegen als "index.html?tab=2"):
+	python benchmarks/bench_end_to_end.py --site kopie/
+Ohne --site wird eine synthetische Seite mit Dokumenten erzeugt:
+	python benchmarks/bench_end_to_end.py --latency-ms 40 --bandwidth-kib 2048
+Optionen nach "--" gehen unverändert an den Scraper:
+	python benchmarks/bench_end_to_end.py -- --http-cache /tmp/http_cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import mimetypes
+import random
+import sys
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterator, List, Mapping, Optional
+from urllib.parse import unquote, urlparse
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import scripts.scraper_dokumente as scraper
+from bench_parser import buildSyntheticPage
+
+DOCUMENTS_PATH = urlparse(scraper.BASE_URL).path
+CHUNK_SIZE = 16 * 1024
+
+
+def buildSyntheticSite(root: Path, tabs: int, sections: int, size_kib: int) -> int:
+	"""
+	Legt eine synthetische Dokumentenseite mit allen verlinkten Dateien an
+
+	Args:
+		root (Path): Wurzelordner der Seite
+		tabs (int): Anzahl der Tabs
+		sections (int): Zwischenüberschriften je Tab, jede mit fünf Dokumenten
+		size_kib (int): Größe jeder Datei in KiB
+
+	Returns:
+		int: Anzahl angelegter Dateien
+	"""
+	page = root / DOCUMENTS_PATH.lstrip("/") / "index.html"
+	page.parent.mkdir(parents=True, exist_ok=True)
+	page.write_text(buildSyntheticPage(tabs, sections), encoding="utf-8")
+
+	count = 0
+	for i in range(tabs):
+		for j in range(sections):
+			for k in range(5):
+				name = f"{i}_{j}_{k}.pdf"
+				path = root / "fileadmin" / "docs" / name
+				path.parent.mkdir(parents=True, exist_ok=True)
+				# Zufällige, aber reproduzierbare Bytes, damit sich nichts wegkomprimieren lässt
+				path.write_bytes(random.Random(name).randbytes(size_kib * 1024))
+				count += 1
+	return count
+
+
+class ReplayServer(ThreadingHTTPServer):
+	"""
+	HTTP-Server für eine lokale Kopie der Seite mit Latenz, Bandbreite und Zählern
+	"""
+
+	daemon_threads = True
+
+	def __init__(self, site_dir: Path, latency: float = 0.0, bandwidth: float = 0.0):
+		"""
+		Startet den Server auf einem freien Port von 127.0.0.1
+
+		Args:
+			site_dir (Path): Wurzelordner der Kopie
+			latency (float): Verzögerung vor jeder Antwort in Sekunden
+			bandwidth (float): Bytes pro Sekunde je Antwort, 0 für unbegrenzt
+		"""
+		super().__init__(("127.0.0.1", 0), ReplayHandler)
+		self.site_dir = site_dir.resolve()
+		self.latency = latency
+		self.bandwidth = bandwidth
+		self._lock = threading.Lock()
+		self.counters: Dict[str, int] = {}
+
+	@property
+	def origin(self) -> str:
+		"""
+		Liefert Schema, Host und Port des Servers
+
+		Returns:
+			str: Origin wie http://127.0.0.1:8123
+		"""
+		return f"http://127.0.0.1:{self.server_address[1]}"
+
+	def count(self, method: str, status: int, sent: int) -> None:
+		"""
+		Zählt eine beantwortete Anfrage
+
+		Args:
+			method (str): HTTP-Methode
+			status (int): Status-Code der Antwort
+			sent (int): Gesendete Body-Bytes
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			for name, amount in (("requests", 1), (method, 1), (str(status), 1), ("bytes_sent", sent)):
+				self.counters[name] = self.counters.get(name, 0) + amount
+
+	def takeCounters(self) -> Dict[str, int]:
+		"""
+		Liefert die Zähler seit dem letzten Aufruf und setzt sie zurück
+
+		Returns:
+			Dict[str, int]: Anfragen gesamt, pro Methode, pro Status und gesendete Bytes
+		"""
+		with self._lock:
+			counters, self.counters = self.counters, {}
+		return counters
+
+	def resolve(self, target: str) -> Optional[Path]:
+		"""
+		Ordnet einen Anfragepfad einer Datei der Kopie zu
+
+		Args:
+			target (str): Pfad mit optionalem Query-String
+
+		Returns:
+			Optional[Path]: Datei oder None wenn sie fehlt oder außerhalb der Kopie liegt
+		"""
+		parsed = urlparse(target)
+		path = (self.site_dir / unquote(parsed.path).lstrip("/")).resolve()
+		if path != self.site_dir and self.site_dir not in path.parents:
+			return None
+		if path.is_dir():
+			path = path / "index.html"
+		if parsed.query:
+			path = path.with_name(f"{path.name}?{unquote(parsed.query)}")
+		return path if path.is_file() else None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+	"""
+	Beantwortet GET und HEAD mit Validatoren, damit auch bedingte Anfragen realistisch sind
+	"""
+
+	protocol_version = "HTTP/1.1"
+	server: ReplayServer
+
+	def do_GET(self):
+		self.respond(send_body=True)
+
+	def do_HEAD(self):
+		self.respond(send_body=False)
+
+	def respond(self, send_body: bool) -> None:
+		"""
+		Sendet Datei, 304 oder 404 nach der eingestellten Latenz
+
+		Args:
+			send_body (bool): False bei HEAD
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		if self.server.latency > 0:
+			time.sleep(self.server.latency)
+
+		path = self.server.resolve(self.path)
+		if path is None:
+			body = b"nicht gefunden"
+			self.send_response(404)
+			self.send_header("Content-Type", "text/plain")
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.sendBody(body if send_body else b"")
+			self.server.count(self.command, 404, len(body) if send_body else 0)
+			return
+
+		stat = path.stat()
+		etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+		last_modified = formatdate(stat.st_mtime, usegmt=True)
+		if self.notModified(etag, stat.st_mtime):
+			self.send_response(304)
+			self.send_header("ETag", etag)
+			self.send_header("Last-Modified", last_modified)
+			self.end_headers()
+			self.server.count(self.command, 304, 0)
+			return
+
+		content_type = "text/html; charset=utf-8" if path.name.startswith("index.html") else None
+		content_type = content_type or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+		self.send_response(200)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(stat.st_size))
+		self.send_header("ETag", etag)
+		self.send_header("Last-Modified", last_modified)
+		self.end_headers()
+		body = path.read_bytes() if send_body else b""
+		self.sendBody(body)
+		self.server.count(self.command, 200, len(body))
+
+	def notModified(self, etag: str, mtime: float) -> bool:
+		"""
+		Wertet If-None-Match und If-Modified-Since aus
+
+		Args:
+			etag (str): Aktueller ETag der Datei
+			mtime (float): Änderungszeitpunkt der Datei
+
+		Returns:
+			bool: True wenn der Client eine aktuelle Kopie hat
+		"""
+		if_none_match = self.headers.get("If-None-Match")
+		if if_none_match is not None:
+			return etag in [value.strip() for value in if_none_match.split(",")]
+		if_modified_since = self.headers.get("If-Modified-Since")
+		if not if_modified_since:
+			return False
+		try:
+			return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+		except (TypeError, ValueError):
+			return False
+
+	def sendBody(self, body: bytes) -> None:
+		"""
+		Schreibt den Body in Blöcken und drosselt dabei auf die eingestellte Bandbreite
+
+		Args:
+			body (bytes): Zu sendender Inhalt
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		for offset in range(0, len(body), CHUNK_SIZE):
+			chunk = body[offset:offset + CHUNK_SIZE]
+			self.wfile.write(chunk)
+			if self.server.bandwidth > 0:
+				time.sleep(len(chunk) / self.server.bandwidth)
+
+	def log_message(self, *args):
+		return
+
+
+@contextlib.contextmanager
+def patchedAttributes(module: ModuleType, values: Mapping[str, object]) -> Iterator[None]:
+	"""
+	Setzt Modul-Attribute für die Dauer des Blocks
+
+	Args:
+		module (ModuleType): Zu veränderndes Modul
+		values (Mapping[str, object]): Neue Werte nach Attributname
+
+	Returns:
+		Iterator[None]: Kontextmanager
+	"""
+	original = {name: getattr(module, name) for name in values}
+	try:
+		for name, value in values.items():
+			setattr(module, name, value)
+		yield
+	finally:
+		for name, value in original.items():
+			setattr(module, name, value)
+
+
+def redirectedPaths(data_dir: Path) -> Dict[str, Path]:
+	"""
+	Verlegt alle Datenpfade des Scrapers in einen anderen data-Ordner
+
+	Args:
+		data_dir (Path): Neuer data-Ordner
+
+	Returns:
+		Dict[str, Path]: Neue Werte für alle Pfad-Konstanten unterhalb von DATA_DIR
+	"""
+	paths: Dict[str, Path] = {"DATA_DIR": data_dir}
+	for name, value in vars(scraper).items():
+		if name.isupper() and isinstance(value, Path) and scraper.DATA_DIR in value.parents:
+			paths[name] = data_dir / value.relative_to(scraper.DATA_DIR)
+	return paths
+
+
+def runOnce(label: str, server: ReplayServer, scraper_args: List[str], verbose: bool) -> Dict:
+	"""
+	Führt einen kompletten Scraper-Lauf aus und sammelt die Messwerte
+
+	Args:
+		label (str): Bezeichnung des Laufs
+		server (ReplayServer): Laufender Replay-Server
+		scraper_args (List[str]): Kommandozeilen-Optionen für den Scraper
+		verbose (bool): Ausgabe des Scrapers anzeigen
+
+	Returns:
+		Dict: Laufzeit, Exit-Code, Server-Zähler und Metriken des Scrapers
+	"""
+	server.takeCounters()
+	output = io.StringIO()
+	started = time.perf_counter()
+	with contextlib.redirect_stdout(sys.stdout if verbose else output):
+		exit_code = scraper.main(list(scraper_args))
+	elapsed = time.perf_counter() - started
+
+	try:
+		metrics = json.loads(scraper.METRICS_FILE.read_text(encoding="utf-8"))
+	except (OSError, ValueError):
+		metrics = {}
+	if exit_code != 0 and not verbose:
+		print(output.getvalue()[-4000:])
+	return {
+		"run": label,
+		"seconds": elapsed,
+		"exit_code": exit_code,
+		"server": server.takeCounters(),
+		"phases": metrics.get("phases", {}),
+		"documents": metrics.get("documents", {}),
+		"http": metrics.get("http", {}),
+	}
+
+
+def printTable(results: List[Dict]) -> None:
+	"""
+	Gibt die Messwerte aller Läufe als Tabelle aus
+
+	Args:
+		results (List[Dict]): Ergebnisse von runOnce
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	print(f"{'Lauf':<8} {'Laufzeit':>10} {'Anfragen':>9} {'GET':>6} {'HEAD':>6} {'304':>6} {'MiB':>8} {'Downloads':>10} {'p95':>9}")
+	for result in results:
+		server = result["server"]
+		latency = result["http"].get("latency_seconds", {})
+		print(
+			f"{result['run']:<8} {result['seconds']:>9.2f}s {server.get('requests', 0):>9} "
+			f"{server.get('GET', 0):>6} {server.get('HEAD', 0):>6} {server.get('304', 0):>6} "
+			f"{server.get('bytes_sent', 0) / (1024 * 1024):>8.2f} {result['documents'].get('downloaded', 0):>10} "
+			f"{latency.get('p95', 0.0) * 1000:>7.1f}ms"
+		)
+
+	print("\nPhasen (Sekunden):")
+	names = sorted({name for result in results for name in result["phases"]})
+	print(f"{'Phase':<14}" + "".join(f"{result['run']:>10}" for result in results))
+	for name in names:
+		print(f"{name:<14}" + "".join(f"{result['phases'].get(name, 0.0):>10.3f}" for result in results))
+
+
+def parseArguments(argv: List[str]) -> argparse.Namespace:
+	"""
+	Liest die Optionen des Benchmarks
+
+	Args:
+		argv (List[str]): Argumente ohne Programmnamen
+
+	Returns:
+		argparse.Namespace: Ausgewertete Optionen, scraper_args enthält alles nach "--"
+	"""
+	scraper_args: List[str] = []
+	if "--" in argv:
+		split = argv.index("--")
+		argv, scraper_args = argv[:split], argv[split + 1:]
+
+	parser = argparse.ArgumentParser(description="End-to-End-Benchmark des Dokumenten-Scrapers")
+	parser.add_argument("--site", type=Path, default=None, help="Lokale Kopie der Seite (Standard: synthetische Seite)")
+	parser.add_argument("--latency-ms", type=float, default=0.0, help="Verzögerung pro Anfrage in Millisekunden")
+	parser.add_argument("--bandwidth-kib", type=float, default=0.0, help="Bandbreite pro Antwort in KiB/s (Standard: unbegrenzt)")
+	parser.add_argument("--tabs", type=int, default=3, help="Tabs der synthetischen Seite")
+	parser.add_argument("--sections", type=int, default=4, help="Abschnitte je Tab der synthetischen Seite (je fünf Dokumente)")
+	parser.add_argument("--size-kib", type=int, default=64, help="Dateigröße der synthetischen Dokumente in KiB")
+	parser.add_argument("--warm-runs", type=int, default=1, help="Anzahl warmer Läufe nach dem kalten Lauf")
+	parser.add_argument("--rate", type=float, default=None, help="Startrate des Scrapers in Anfragen pro Sekunde und Host")
+	parser.add_argument("--json", type=Path, default=None, help="Ergebnisse zusätzlich als JSON schreiben")
+	parser.add_argument("--verbose", action="store_true", help="Ausgabe des Scrapers anzeigen")
+	args = parser.parse_args(argv)
+	args.scraper_args = scraper_args
+	return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""
+	Startet den Replay-Server, führt kalte und warme Läufe aus und gibt die Messwerte aus
+
+	Args:
+		argv (Optional[List[str]]): Argumente ohne Programmnamen, Standard ist sys.argv
+
+	Returns:
+		int: 0 wenn alle Läufe erfolgreich waren, sonst 1
+	"""
+	args = parseArguments(sys.argv[1:] if argv is None else argv)
+	with tempfile.TemporaryDirectory(prefix="bench-dokumente-") as tmp:
+		site_dir = args.site
+		if site_dir is None:
+			site_dir = Path(tmp) / "site"
+			count = buildSyntheticSite(site_dir, args.tabs, args.sections, args.size_kib)
+			print(f"Synthetische Seite: {count} Dokumente à {args.size_kib} KiB")
+		else:
+			print(f"Kopie der Seite: {site_dir}")
+
+		server = ReplayServer(site_dir, args.latency_ms / 1000, args.bandwidth_kib * 1024)
+		thread = threading.Thread(target=server.serve_forever, daemon=True)
+		thread.start()
+		bandwidth = f"{args.bandwidth_kib:g} KiB/s" if args.bandwidth_kib > 0 else "unbegrenzt"
+		print(f"Replay-Server: {server.origin}, Latenz {args.latency_ms:g} ms, Bandbreite {bandwidth}\n")
+
+		overrides: Dict[str, object] = {
+			**redirectedPaths(Path(tmp) / "data"),
+			"BASE_URL": server.origin + DOCUMENTS_PATH,
+			# Ein Benchmark darf keine Telegram-Nachrichten verschicken
+			"send_new_without_description_notification": lambda items: True,
+		}
+		if args.rate is not None:
+			overrides["RATE_INITIAL_PER_SECOND"] = args.rate
+
+		results: List[Dict] = []
+		try:
+			with patchedAttributes(scraper, overrides):
+				results.append(runOnce("kalt", server, args.scraper_args, args.verbose))
+				for run in range(args.warm_runs):
+					results.append(runOnce(f"warm{run + 1}" if args.warm_runs > 1 else "warm", server, args.scraper_args, args.verbose))
+		finally:
+			server.shutdown()
+			server.server_close()
+
+	printTable(results)
+	if args.json is not None:
+		args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+		print(f"\nErgebnisse: {args.json}")
+	return 0 if all(result["exit_code"] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark für das Parsen der Dokumentenseite
+
+Vergleicht die Parse-Zeit von html.parser und lxml jeweils auf der kompletten Seite
+und mit dem TabStrainer, der nur Tab-Navigation und Tab-Inhalte aufbaut. Weichen die
+gefundenen Dokumente einer Variante vom Standard (html.parser, komplette Seite) ab,
+wird das gemeldet. Nur ohne Abweichung auf der echten Seite taugt sie als Standard.
+
+Aufruf mit einer gespeicherten Kopie der echten Seite:
+	python benchmarks/bench_parser.py dokumente-downloads.html
+Ohne Argument wird eine synthetische Seite mit Kopf, Navigation und Fußzeile erzeugt.
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+from bs4 import BeautifulSoup
+
+import scripts.scraper_dokumente as scraper
+
+BASE_URL = scraper.BASE_URL
+REPEAT = 7
+
+
+def buildSyntheticPage(tabs: int = 6, sections: int = 25) -> str:
+	"""
+	Erzeugt eine Dokumentenseite mit viel Rahmen-HTML um die Tabs herum
+
+	Args:
+		tabs (int): Anzahl der Tabs
+		sections (int): Anzahl Zwischenüberschriften je Tab
+
+	Returns:
+		str: HTML-Quelltext
+	"""
+	navigation = "".join(
+		f"<li><a href='/bereich-{i}'>Bereich {i}</a><ul>"
+		+ "".join(f"<li><a href='/bereich-{i}/{j}'>Unterseite {j}</a></li>" for j in range(30))
+		+ "</ul></li>"
+		for i in range(40)
+	)
+	tab_items = "".join(
+		f"<li class='nav-link' id='tab{i}'><a data-href='#c{i}'>Kategorie {i}</a></li>" for i in range(tabs)
+	)
+	panes = []
+	for i in range(tabs):
+		blocks = []
+		for j in range(sections):
+			blocks.append(f"<h2>Abschnitt {i}.{j}</h2><ul>")
+			for k in range(5):
+				blocks.append(
+					f"<li><a href='/fileadmin/docs/{i}_{j}_{k}.pdf' title='Dokument {i}.{j}.{k}'>Dokument</a>"
+					f"<div class='ce-uploads-description'>Beschreibung {k}</div></li>"
+				)
+			blocks.append("</ul>")
+		panes.append(f"<div id='c{i}' class='tab-pane'>{''.join(blocks)}</div>")
+	footer = "".join(f"<p>Fußzeile {i} <a href='/impressum'>Impressum</a></p>" for i in range(200))
+	return (
+		"<html><head><title>Dokumente</title>"
+		+ "".join(f"<script>var x{i} = {i};</script>" for i in range(50))
+		+ f"</head><body><header><nav><ul class='nav'>{navigation}</ul></nav></header>"
+		+ f"<main><div id='content'><ul class='nav nav-tabs'>{tab_items}</ul>{''.join(panes)}</div></main>"
+		+ f"<footer>{footer}</footer></body></html>"
+	)
+
+
+def measure(action: Callable[[], object]) -> float:
+	"""
+	Misst den Median mehrerer Durchläufe in Millisekunden
+
+	Args:
+		action (Callable[[], object]): Zu messende Aktion
+
+	Returns:
+		float: Median der Laufzeit in Millisekunden
+	"""
+	timings: List[float] = []
+	for _ in range(REPEAT):
+		started = time.perf_counter()
+		action()
+		timings.append((time.perf_counter() - started) * 1000)
+	return statistics.median(timings)
+
+
+def main() -> int:
+	"""
+	Führt den Benchmark aus und gibt eine Tabelle aus
+
+	Returns:
+		int: 0 bei Erfolg
+	"""
+	if len(sys.argv) > 1:
+		html = Path(sys.argv[1]).read_text(encoding="utf-8")
+		source = sys.argv[1]
+	else:
+		html = buildSyntheticPage()
+		source = "synthetische Seite"
+
+	parsers = ["html.parser"]
+	try:
+		import lxml  # noqa: F401
+		parsers.append("lxml")
+	except ImportError:
+		print("Hinweis: lxml ist nicht installiert, nur html.parser wird gemessen")
+
+	print(f"Quelle: {source} ({len(html) / 1024:.0f} KiB), Median aus {REPEAT} Läufen\n")
+	print(f"{'Parser':<12} {'komplett':>12} {'TabStrainer':>12} {'Extraktion':>12} {'nur Tabs':>12}")
+
+	reference = scraper.extractDocumentsFromHtml(BASE_URL, html, parser="html.parser")
+	for parser in parsers:
+		full = measure(lambda: BeautifulSoup(html, parser))
+		strained = measure(lambda: BeautifulSoup(html, parser, parse_only=scraper.TabStrainer(html)))
+		extraction = measure(lambda: scraper.extractDocumentsFromHtml(BASE_URL, html, parser=parser))
+		tabs_only = measure(lambda: scraper.extractDocumentsFromHtml(BASE_URL, html, parser=parser, tabs_only=True))
+		print(f"{parser:<12} {full:>10.1f}ms {strained:>10.1f}ms {extraction:>10.1f}ms {tabs_only:>10.1f}ms")
+
+		for restricted in (False, True):
+			if scraper.extractDocumentsFromHtml(BASE_URL, html, parser=parser, tabs_only=restricted) != reference:
+				variant = f"{parser} (nur Tabs)" if restricted else parser
+				print(f"Warnung: {variant} liefert andere Dokumente als html.parser auf der kompletten Seite")
+
+	print(f"\nGefundene Dokumente: {len(reference[0])}")
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
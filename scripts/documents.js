@@ -93,6 +93,17 @@ function createDocumentItem(documentData) {
     // link.target = '_blank';
     // link.rel = 'noopener noreferrer';
 
+    if (documentData.thumbnail) {
+        // Bilddokumente zeigen ein verkleinertes Vorschaubild statt das Original zu laden
+        const preview = document.createElement('img');
+        preview.className = 'document-thumbnail';
+        preview.src = buildDownloadUrl(documentData.thumbnail);
+        preview.alt = '';
+        preview.loading = 'lazy';
+        preview.decoding = 'async';
+        article.append(preview);
+    }
+
     article.append(title, description, link);
     return article;
 }
@@ -169,8 +180,8 @@ export async function initDocuments(rootElement = document) {
 
         updateToggleLabel();
 
-        // Die Metadaten werden direkt vom Backend geladen dass die Ansicht aktuell bleibt
-        const response = await fetch('/api/documents', { cache: 'no-store' });
+        // Die Metadaten werden immer beim Backend revalidiert, unverändert kommt nur ein 304 zurück
+        const response = await fetch('/api/documents', { cache: 'no-cache' });
         if (!response.ok) {
             throw new Error('Dokument-Metadaten konnten nicht geladen werden.');
         }
@@ -0,0 +1,1219 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer HTTP-Client für die Python-Skripte
+
+Stellt eine Requests-Session mit passend großem Verbindungspool, Keep-Alive,
+Wiederholungen mit exponentiellem Backoff (urllib3 Retry) und einem Circuit Breaker
+pro Host bereit. Zähler für Anfragen, wiederverwendete Verbindungen, Wiederholungen
+und übertragene Bytes zeigen, ob der Pool tatsächlich genutzt wird.
+
+Ein HTTP-Archiv (ZIP mit Index) kann alle Anfragen und Antworten einer Session
+aufzeichnen und später ohne Netzwerk wieder ausliefern.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 12
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+# Heuristische Frische nach RFC 9111 4.2.2: Anteil am Alter seit Last-Modified, gedeckelt
+CACHE_HEURISTIC_FRACTION = 0.1
+CACHE_HEURISTIC_MAX_SECONDS = 86400.0
+CACHEABLE_STATUS = (200, 203, 300, 301, 308, 404, 410)
+# Diese Header beschreiben die Übertragung und nicht den gespeicherten (dekodierten) Inhalt
+CACHE_SKIPPED_HEADERS = {"content-encoding", "transfer-encoding", "connection", "keep-alive", "content-length"}
+# Obergrenze gespeicherter Latenzen, ältere Messwerte fallen bei langen Daemon-Läufen heraus
+LATENCY_SAMPLE_LIMIT = 20000
+ARCHIVE_VERSION = 1
+ARCHIVE_INDEX_NAME = "index.json"
+# Diese Anfrage-Header entscheiden, welche aufgezeichnete Antwort zu einer Anfrage passt
+ARCHIVE_REQUEST_HEADERS = ("If-None-Match", "If-Modified-Since", "Range")
+# Content-Length bleibt erhalten, bei HEAD ist sie die einzige Größenangabe
+ARCHIVE_SKIPPED_HEADERS = CACHE_SKIPPED_HEADERS - {"content-length"}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+	"""
+	Wird geworfen, wenn der Circuit Breaker für einen Host offen ist
+	"""
+
+
+class ArchiveMissError(requests.exceptions.ConnectionError):
+	"""
+	Fehler, wenn eine Anfrage im Replay-Archiv nicht aufgezeichnet ist
+	"""
+
+
+class CircuitBreaker:
+	"""
+	Sperrt einen Host nach mehreren Fehlern in Folge für eine Abklingzeit
+
+	Nach Ablauf der Abklingzeit wird genau eine Probeanfrage durchgelassen.
+	Gelingt sie, ist der Host wieder frei, sonst beginnt die Sperre von vorn.
+	"""
+
+	def __init__(
+		self,
+		failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+		reset_seconds: float = BREAKER_RESET_SECONDS,
+		clock: Optional[Callable[[], float]] = None,
+	):
+		"""
+		Initialisiert den Circuit Breaker
+
+		Args:
+			failure_threshold (int): Anzahl Fehler in Folge bis zur Sperre
+			reset_seconds (float): Dauer der Sperre in Sekunden
+			clock (Optional[Callable[[], float]]): Monotone Uhr, Standard ist time.monotonic
+		"""
+		self.failure_threshold = max(1, failure_threshold)
+		self.reset_seconds = reset_seconds
+		self._clock = clock or time.monotonic
+		self._lock = threading.Lock()
+		self._failures: Dict[str, int] = {}
+		self._opened_at: Dict[str, float] = {}
+		self._probing: Dict[str, bool] = {}
+
+	def before(self, url: str) -> None:
+		"""
+		Prüft vor einer Anfrage, ob der Host erreichbar sein darf
+
+		Args:
+			url (str): URL der anstehenden Anfrage
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+
+		Raises:
+			CircuitOpenError: Wenn der Host gesperrt ist
+		"""
+		host = urlparse(url).netloc.lower()
+		with self._lock:
+			opened_at = self._opened_at.get(host)
+			if opened_at is None:
+				return
+			if self._clock() - opened_at < self.reset_seconds or self._probing.get(host):
+				raise CircuitOpenError(f"Circuit Breaker offen für {host}")
+			# Abklingzeit vorbei: eine einzelne Probeanfrage darf durch
+			self._probing[host] = True
+
+	def success(self, url: str) -> None:
+		"""
+		Meldet eine erfolgreiche Anfrage und schließt den Breaker
+
+		Args:
+			url (str): URL der Anfrage
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		host = urlparse(url).netloc.lower()
+		with self._lock:
+			self._failures.pop(host, None)
+			self._opened_at.pop(host, None)
+			self._probing.pop(host, None)
+
+	def failure(self, url: str) -> None:
+		"""
+		Meldet eine fehlgeschlagene Anfrage und öffnet den Breaker bei Erreichen der Schwelle
+
+		Args:
+			url (str): URL der Anfrage
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		host = urlparse(url).netloc.lower()
+		with self._lock:
+			failures = self._failures.get(host, 0) + 1
+			self._failures[host] = failures
+			if failures >= self.failure_threshold or self._probing.get(host):
+				self._opened_at[host] = self._clock()
+				self._probing.pop(host, None)
+
+	def isOpen(self, url: str) -> bool:
+		"""
+		Prüft, ob der Host einer URL aktuell gesperrt ist
+
+		Args:
+			url (str): URL des Hosts
+
+		Returns:
+			bool: True solange die Abklingzeit läuft
+		"""
+		host = urlparse(url).netloc.lower()
+		with self._lock:
+			opened_at = self._opened_at.get(host)
+			return opened_at is not None and self._clock() - opened_at < self.reset_seconds
+
+
+class HttpCounters:
+	"""
+	Threadsichere Zähler für Anfragen, Wiederholungen und Bytes
+	"""
+
+	def __init__(self):
+		"""
+		Initialisiert alle Zähler mit 0
+		"""
+		self._lock = threading.Lock()
+		self._values: Dict[str, int] = {
+			"requests": 0,
+			"retries": 0,
+			"failures": 0,
+			"circuit_open": 0,
+			"bytes_received": 0,
+			"cache_hits": 0,
+			"cache_revalidated": 0,
+			"cache_stored": 0,
+		}
+		self._latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLE_LIMIT)
+		self._host_errors: Dict[str, int] = {}
+
+	def add(self, name: str, amount: int = 1) -> None:
+		"""
+		Erhöht einen Zähler
+
+		Args:
+			name (str): Name des Zählers
+			amount (int): Betrag der Erhöhung
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			self._values[name] = self._values.get(name, 0) + amount
+
+	def snapshot(self) -> Dict[str, int]:
+		"""
+		Liefert eine Kopie aller Zählerstände
+
+		Returns:
+			Dict[str, int]: Zählerstände nach Name
+		"""
+		with self._lock:
+			return dict(self._values)
+
+	def observe(self, url: str, seconds: float, failed: bool) -> None:
+		"""
+		Hält die Latenz einer Anfrage und gegebenenfalls einen Fehler für ihren Host fest
+
+		Args:
+			url (str): URL der Anfrage
+			seconds (float): Zeit bis zu den Antwort-Headern inklusive Wiederholungen
+			failed (bool): True bei Verbindungsfehler oder Status ab 400
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			self._latencies.append(seconds)
+			if failed:
+				host = urlparse(url).netloc
+				self._host_errors[host] = self._host_errors.get(host, 0) + 1
+
+	def latencies(self) -> List[float]:
+		"""
+		Liefert die gespeicherten Latenzen
+
+		Returns:
+			List[float]: Latenzen in Sekunden in Messreihenfolge
+		"""
+		with self._lock:
+			return list(self._latencies)
+
+	def hostErrors(self) -> Dict[str, int]:
+		"""
+		Liefert die Anzahl fehlgeschlagener Anfragen pro Host
+
+		Returns:
+			Dict[str, int]: Fehler nach Host
+		"""
+		with self._lock:
+			return dict(self._host_errors)
+
+
+def buildRetry(
+	total: int = RETRY_TOTAL,
+	backoff_factor: float = RETRY_BACKOFF_FACTOR,
+	status_forcelist: Iterable[int] = RETRY_STATUS_FORCELIST,
+) -> Retry:
+	"""
+	Erstellt die Wiederholungsstrategie mit exponentiellem Backoff
+
+	Args:
+		total (int): Maximale Anzahl Wiederholungen
+		backoff_factor (float): Basis für die exponentiell wachsende Wartezeit
+		status_forcelist (Iterable[int]): HTTP-Status, die wiederholt werden
+
+	Returns:
+		Retry: Konfigurierte urllib3-Retry-Instanz
+	"""
+	# POST wird nicht wiederholt (Standard von urllib3), damit Nachrichten nicht doppelt ankommen
+	return Retry(
+		total=total,
+		backoff_factor=backoff_factor,
+		status_forcelist=tuple(status_forcelist),
+		respect_retry_after_header=True,
+		raise_on_status=False,
+	)
+
+
+def parseCacheControl(value: Optional[str]) -> Dict[str, Optional[str]]:
+	"""
+	Zerlegt einen Cache-Control-Header in seine Direktiven
+
+	Args:
+		value (Optional[str]): Header-Wert
+
+	Returns:
+		Dict[str, Optional[str]]: Direktiven in Kleinschreibung mit optionalem Wert
+	"""
+	directives: Dict[str, Optional[str]] = {}
+	for part in (value or "").split(","):
+		name, _, argument = part.strip().partition("=")
+		if name:
+			directives[name.strip().lower()] = argument.strip().strip('"') or None
+	return directives
+
+
+def parseHttpDate(value: Optional[str]) -> Optional[float]:
+	"""
+	Wandelt ein HTTP-Datum in einen Unix-Zeitstempel um
+
+	Args:
+		value (Optional[str]): Header-Wert wie bei Date, Expires oder Last-Modified
+
+	Returns:
+		Optional[float]: Zeitstempel oder None wenn nicht auswertbar
+	"""
+	if not value:
+		return None
+	try:
+		return parsedate_to_datetime(value).timestamp()
+	except (TypeError, ValueError):
+		return None
+
+
+def directiveSeconds(directives: Dict[str, Optional[str]], name: str) -> Optional[float]:
+	"""
+	Liest eine Sekundenangabe wie max-age aus Cache-Control-Direktiven
+
+	Args:
+		directives (Dict[str, Optional[str]]): Ergebnis von parseCacheControl
+		name (str): Name der Direktive
+
+	Returns:
+		Optional[float]: Sekunden oder None wenn nicht vorhanden oder ungültig
+	"""
+	value = directives.get(name)
+	if value is None or not value.isdigit():
+		return None
+	return float(value)
+
+
+class HttpCache:
+	"""
+	Privater HTTP-Cache auf der Festplatte nach RFC 9111
+
+	Gespeichert werden GET-Antworten ohne Streaming, die ETag, Last-Modified oder eine
+	Frische-Angabe haben. Frische Einträge werden ohne Netzwerk beantwortet, abgelaufene
+	automatisch mit If-None-Match/If-Modified-Since revalidiert.
+
+	Abgedeckt sind damit nur nicht gestreamte GETs. HEAD- und Range-Anfragen gehen
+	unverändert an den Server, gestreamte Antworten werden nicht gespeichert und daher
+	auch nie aus dem Cache revalidiert. Große Dokumente liegen so nicht doppelt neben dem
+	Blob-Store, ihre Revalidierung übernimmt der Aufrufer mit eigenen Validatoren.
+	"""
+
+	def __init__(
+		self,
+		directory: Path,
+		clock: Optional[Callable[[], float]] = None,
+		heuristic_max_seconds: float = CACHE_HEURISTIC_MAX_SECONDS,
+	):
+		"""
+		Initialisiert den Cache
+
+		Args:
+			directory (Path): Verzeichnis für Metadaten und Inhalte
+			clock (Optional[Callable[[], float]]): Uhr in Unix-Sekunden, Standard ist time.time
+			heuristic_max_seconds (float): Obergrenze der heuristischen Frische, 0 revalidiert Antworten ohne Frische-Angabe immer
+		"""
+		self.directory = Path(directory)
+		self._clock = clock or time.time
+		self.heuristic_max_seconds = heuristic_max_seconds
+
+	def paths(self, url: str) -> Tuple[Path, Path]:
+		"""
+		Liefert die Dateipfade eines Cache-Eintrags
+
+		Args:
+			url (str): URL der Anfrage
+
+		Returns:
+			Tuple[Path, Path]: Pfad der Metadaten-Datei und Pfad der Inhaltsdatei
+		"""
+		key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+		base = self.directory / key[:2] / key
+		return base.with_suffix(".json"), base.with_suffix(".body")
+
+	def load(self, request) -> Optional[Dict]:
+		"""
+		Lädt den passenden Eintrag für eine Anfrage
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+
+		Returns:
+			Optional[Dict]: Gespeicherte Metadaten oder None
+		"""
+		meta_path, body_path = self.paths(request.url)
+		try:
+			with meta_path.open("r", encoding="utf-8") as handle:
+				entry = json.load(handle)
+		except (OSError, ValueError):
+			return None
+		if not body_path.is_file():
+			return None
+		# Vary: Anfrage-Header, nach denen der Server unterscheidet, müssen übereinstimmen
+		for name, value in entry.get("vary", {}).items():
+			if request.headers.get(name, "") != value:
+				return None
+		return entry
+
+	def freshnessLifetime(self, entry: Dict) -> float:
+		"""
+		Berechnet die Frische-Dauer eines Eintrags
+
+		Args:
+			entry (Dict): Gespeicherte Metadaten
+
+		Returns:
+			float: Frische-Dauer in Sekunden, 0 bei Pflicht zur Revalidierung
+		"""
+		headers = CaseInsensitiveDict(entry.get("headers", {}))
+		directives = parseCacheControl(headers.get("Cache-Control"))
+		if "no-cache" in directives:
+			return 0.0
+		max_age = directiveSeconds(directives, "max-age")
+		if max_age is not None:
+			return max_age
+		date = parseHttpDate(headers.get("Date")) or entry.get("stored_at", 0.0)
+		expires = parseHttpDate(headers.get("Expires"))
+		if "Expires" in headers:
+			# Ungültige Expires-Werte gelten nach RFC als bereits abgelaufen
+			return max(expires - date, 0.0) if expires is not None else 0.0
+		last_modified = parseHttpDate(headers.get("Last-Modified"))
+		if last_modified is not None and entry.get("status") in CACHEABLE_STATUS:
+			return min(max(date - last_modified, 0.0) * CACHE_HEURISTIC_FRACTION, self.heuristic_max_seconds)
+		return 0.0
+
+	def currentAge(self, entry: Dict) -> float:
+		"""
+		Berechnet das aktuelle Alter eines Eintrags
+
+		Args:
+			entry (Dict): Gespeicherte Metadaten
+
+		Returns:
+			float: Alter in Sekunden
+		"""
+		headers = CaseInsensitiveDict(entry.get("headers", {}))
+		initial_age = headers.get("Age", "")
+		initial = float(initial_age) if initial_age.isdigit() else 0.0
+		return initial + max(self._clock() - entry.get("stored_at", 0.0), 0.0)
+
+	def isFresh(self, entry: Dict, request) -> bool:
+		"""
+		Prüft, ob ein Eintrag ohne Rückfrage beim Server verwendet werden darf
+
+		Args:
+			entry (Dict): Gespeicherte Metadaten
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+
+		Returns:
+			bool: True wenn der Eintrag frisch ist
+		"""
+		directives = parseCacheControl(request.headers.get("Cache-Control"))
+		if "no-cache" in directives:
+			return False
+		lifetime = self.freshnessLifetime(entry)
+		request_max_age = directiveSeconds(directives, "max-age")
+		if request_max_age is not None:
+			lifetime = min(lifetime, request_max_age)
+		return self.currentAge(entry) < lifetime
+
+	def store(self, request, response, body: bytes) -> bool:
+		"""
+		Speichert eine Antwort, sofern sie nach RFC 9111 speicherbar ist
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			response (requests.Response): Antwort des Servers
+			body (bytes): Dekodierter Inhalt der Antwort
+
+		Returns:
+			bool: True wenn die Antwort gespeichert wurde
+		"""
+		response_directives = parseCacheControl(response.headers.get("Cache-Control"))
+		request_directives = parseCacheControl(request.headers.get("Cache-Control"))
+		vary = [name.strip() for name in response.headers.get("Vary", "").split(",") if name.strip()]
+		if (
+			response.status_code not in CACHEABLE_STATUS
+			or "no-store" in response_directives
+			or "no-store" in request_directives
+			or "*" in vary
+		):
+			return False
+
+		headers = {
+			name: value
+			for name, value in response.headers.items()
+			if name.lower() not in CACHE_SKIPPED_HEADERS
+		}
+		headers["Content-Length"] = str(len(body))
+		entry = {
+			"url": response.url or request.url,
+			"status": response.status_code,
+			"reason": response.reason or "",
+			"headers": headers,
+			"stored_at": self._clock(),
+			"vary": {name: request.headers.get(name, "") for name in vary if name.lower() != "accept-encoding"},
+		}
+		has_validator = bool(headers.get("ETag") or headers.get("Last-Modified"))
+		if not has_validator and self.freshnessLifetime(entry) <= 0:
+			# Ohne Validator und ohne Frische wäre der Eintrag nie nutzbar
+			return False
+
+		meta_path, body_path = self.paths(request.url)
+		meta_path.parent.mkdir(parents=True, exist_ok=True)
+		writeAtomically(body_path, body)
+		writeAtomically(meta_path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+		return True
+
+	def refresh(self, entry: Dict, request, not_modified) -> None:
+		"""
+		Übernimmt die Header einer 304-Antwort in einen gespeicherten Eintrag
+
+		Args:
+			entry (Dict): Gespeicherte Metadaten
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			not_modified (requests.Response): 304-Antwort des Servers
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		for name, value in not_modified.headers.items():
+			if name.lower() not in CACHE_SKIPPED_HEADERS:
+				entry["headers"][name] = value
+		entry["stored_at"] = self._clock()
+		meta_path, _ = self.paths(request.url)
+		writeAtomically(meta_path, json.dumps(entry, ensure_ascii=False).encode("utf-8"))
+
+	def matchesConditional(self, entry: Dict, request) -> bool:
+		"""
+		Prüft, ob die Validatoren des Aufrufers zum gespeicherten Eintrag passen
+
+		Args:
+			entry (Dict): Gespeicherte Metadaten
+			request (requests.PreparedRequest): Vorbereitete Anfrage mit eigenen Validatoren
+
+		Returns:
+			bool: True wenn der Aufrufer den gespeicherten Stand bereits hat
+		"""
+		headers = CaseInsensitiveDict(entry.get("headers", {}))
+		if_none_match = request.headers.get("If-None-Match")
+		if if_none_match:
+			etag = headers.get("ETag", "")
+			candidates = [item.strip() for item in if_none_match.split(",")]
+			return bool(etag) and (etag in candidates or "*" in candidates)
+		if_modified_since = parseHttpDate(request.headers.get("If-Modified-Since"))
+		last_modified = parseHttpDate(headers.get("Last-Modified"))
+		return if_modified_since is not None and last_modified is not None and last_modified <= if_modified_since
+
+	def buildResponse(self, entry: Dict, request, status: Optional[int] = None) -> requests.Response:
+		"""
+		Baut eine Response aus einem gespeicherten Eintrag
+
+		Args:
+			entry (Dict): Gespeicherte Metadaten
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			status (Optional[int]): Abweichender Status, z.B. 304 für bedingte Anfragen
+
+		Returns:
+			requests.Response: Antwort aus dem Cache
+		"""
+		_, body_path = self.paths(request.url)
+		body = b"" if status == 304 else body_path.read_bytes()
+		response = requests.Response()
+		response.status_code = status or entry["status"]
+		response.reason = "Not Modified" if status == 304 else entry.get("reason", "")
+		response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+		response.headers["Age"] = str(int(self.currentAge(entry)))
+		if status == 304:
+			response.headers.pop("Content-Length", None)
+		response.url = entry.get("url") or request.url
+		response.request = request
+		response.encoding = get_encoding_from_headers(response.headers)
+		response.raw = io.BytesIO(body)
+		response._content = body
+		response._content_consumed = True
+		return response
+
+	def send(self, request, transmit: Callable[[object], requests.Response], stream: bool, counters: HttpCounters) -> requests.Response:
+		"""
+		Beantwortet eine Anfrage aus dem Cache oder über das Netzwerk mit Revalidierung
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			transmit (Callable[[object], requests.Response]): Sendet die Anfrage über das Netzwerk
+			stream (bool): True wenn der Aufrufer den Inhalt streamen will
+			counters (HttpCounters): Zähler für Treffer und Revalidierungen
+
+		Returns:
+			requests.Response: Antwort aus dem Cache oder vom Server
+		"""
+		# HEAD und Teilbereiche umgehen den Cache vollständig
+		if request.method != "GET" or "Range" in request.headers:
+			return transmit(request)
+
+		entry = self.load(request)
+		conditional = "If-None-Match" in request.headers or "If-Modified-Since" in request.headers
+		if entry is not None and self.isFresh(entry, request):
+			counters.add("cache_hits")
+			if conditional and self.matchesConditional(entry, request):
+				return self.buildResponse(entry, request, status=304)
+			return self.buildResponse(entry, request)
+
+		added_validators = False
+		if entry is not None and not conditional:
+			# Abgelaufene Einträge werden mit den gespeicherten Validatoren revalidiert
+			headers = CaseInsensitiveDict(entry.get("headers", {}))
+			if headers.get("ETag"):
+				request.headers["If-None-Match"] = headers["ETag"]
+				added_validators = True
+			if headers.get("Last-Modified"):
+				request.headers["If-Modified-Since"] = headers["Last-Modified"]
+				added_validators = True
+
+		response = transmit(request)
+		if response.status_code == 304 and entry is not None and (added_validators or self.matchesConditional(entry, request)):
+			# Leeren Rumpf lesen, damit die Verbindung in den Pool zurückgeht
+			response.content
+			counters.add("cache_revalidated")
+			self.refresh(entry, request, response)
+			if added_validators:
+				# Der Aufrufer hat nicht bedingt gefragt und bekommt den vollständigen Inhalt
+				return self.buildResponse(entry, request)
+			return response
+
+		# Gestreamte Inhalte liest der Aufrufer selbst, gespeichert wird nur ein vollständig gelesener Rumpf
+		if not stream and response.status_code in CACHEABLE_STATUS:
+			if self.store(request, response, response.content):
+				counters.add("cache_stored")
+		return response
+
+
+def writeAtomically(path: Path, data: bytes) -> None:
+	"""
+	Schreibt eine Datei über eine temporäre Datei und ersetzt das Ziel atomar
+
+	Args:
+		path (Path): Zieldatei
+		data (bytes): Inhalt
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+	temporary.write_bytes(data)
+	os.replace(temporary, path)
+
+
+def archiveRequestHeaders(request) -> Dict[str, str]:
+	"""
+	Liest die für die Zuordnung im Archiv relevanten Anfrage-Header
+
+	Args:
+		request (requests.PreparedRequest): Vorbereitete Anfrage
+
+	Returns:
+		Dict[str, str]: Gesetzte Header aus ARCHIVE_REQUEST_HEADERS
+	"""
+	return {name: request.headers[name] for name in ARCHIVE_REQUEST_HEADERS if name in request.headers}
+
+
+class HttpArchiveRecorder:
+	"""
+	Zeichnet Anfragen und Antworten in einem ZIP-Archiv auf
+
+	Inhalte liegen einmal pro sha256 unter bodies/, der Index mit allen Anfragen in
+	Aufzeichnungsreihenfolge wird beim Schließen geschrieben. Erst dann ersetzt das
+	Archiv die Zieldatei, ein abgebrochener Lauf hinterlässt kein halbes Archiv.
+	"""
+
+	def __init__(self, path: Path):
+		"""
+		Öffnet eine temporäre Archivdatei neben dem Ziel
+
+		Args:
+			path (Path): Zieldatei des Archivs
+		"""
+		self.path = Path(path)
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self._temporary = self.path.with_name(f".{self.path.name}.tmp")
+		self._zip: Optional[zipfile.ZipFile] = zipfile.ZipFile(self._temporary, "w", compression=zipfile.ZIP_DEFLATED)
+		self._lock = threading.Lock()
+		self._bodies: Set[str] = set()
+		self.exchanges: List[Dict] = []
+
+	def _append(self, request, request_headers: Dict[str, str], fields: Dict, body: Optional[bytes] = None) -> None:
+		with self._lock:
+			if self._zip is None:
+				return
+			if body:
+				digest = hashlib.sha256(body).hexdigest()
+				fields["body"] = digest
+				if digest not in self._bodies:
+					self._zip.writestr(f"bodies/{digest}", body)
+					self._bodies.add(digest)
+			self.exchanges.append({
+				"method": request.method,
+				"url": request.url,
+				"request_headers": request_headers,
+				"recorded_at": time.time(),
+				**fields,
+			})
+
+	def record(self, request, request_headers: Dict[str, str], response: requests.Response) -> requests.Response:
+		"""
+		Zeichnet eine Antwort auf, gestreamte Inhalte werden dafür vollständig gelesen
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			request_headers (Dict[str, str]): Zuordnungs-Header, wie sie der Aufrufer gesetzt hat
+			response (requests.Response): Antwort
+
+		Returns:
+			requests.Response: Dieselbe Antwort, der Inhalt bleibt über iter_content lesbar
+		"""
+		body = response.content or b""
+		headers = {
+			name: value
+			for name, value in response.headers.items()
+			if name.lower() not in ARCHIVE_SKIPPED_HEADERS
+		}
+		if request.method != "HEAD" and response.status_code != 304:
+			# Gespeichert wird der dekodierte Inhalt, die Länge muss dazu passen
+			headers["Content-Length"] = str(len(body))
+		fields = {"status": response.status_code, "reason": response.reason or "", "headers": headers}
+		self._append(request, request_headers, fields, body)
+		return response
+
+	def recordError(self, request, request_headers: Dict[str, str], error: Exception) -> None:
+		"""
+		Zeichnet einen Verbindungsfehler auf, damit ihn die Wiedergabe erneut auslöst
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			request_headers (Dict[str, str]): Zuordnungs-Header, wie sie der Aufrufer gesetzt hat
+			error (Exception): Aufgetretener Fehler
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		self._append(request, request_headers, {"error": f"{type(error).__name__}: {error}"})
+
+	def close(self) -> None:
+		"""
+		Schreibt den Index und ersetzt die Zieldatei, weitere Aufrufe haben keine Wirkung
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			if self._zip is None:
+				return
+			index = {"version": ARCHIVE_VERSION, "exchanges": self.exchanges}
+			self._zip.writestr(ARCHIVE_INDEX_NAME, json.dumps(index, ensure_ascii=False))
+			self._zip.close()
+			self._zip = None
+			os.replace(self._temporary, self.path)
+
+
+class HttpArchive:
+	"""
+	Liest ein mit HttpArchiveRecorder aufgezeichnetes Archiv für die Wiedergabe
+	"""
+
+	def __init__(self, path: Path):
+		"""
+		Öffnet das Archiv und lädt den Index
+
+		Args:
+			path (Path): Archivdatei
+
+		Raises:
+			ValueError: Wenn die Datei kein lesbares Archiv dieser Version ist
+		"""
+		self.path = Path(path)
+		try:
+			self._zip = zipfile.ZipFile(self.path)
+			index = json.loads(self._zip.read(ARCHIVE_INDEX_NAME))
+		except (OSError, KeyError, zipfile.BadZipFile) as exc:
+			raise ValueError(f"HTTP-Archiv nicht lesbar ({self.path}): {exc}") from exc
+		if index.get("version") != ARCHIVE_VERSION:
+			raise ValueError(f"HTTP-Archiv hat eine unbekannte Version ({self.path}): {index.get('version')}")
+		self._lock = threading.Lock()
+		self._served: Dict[Tuple, int] = {}
+		self.exchanges: List[Dict] = index.get("exchanges", [])
+		self._by_request: Dict[Tuple[str, str], List[Dict]] = {}
+		for exchange in self.exchanges:
+			self._by_request.setdefault((exchange["method"], exchange["url"]), []).append(exchange)
+
+	def lookup(self, request) -> Dict:
+		"""
+		Sucht die aufgezeichnete Antwort zu einer Anfrage
+
+		Gleiche Anfragen bekommen ihre Antworten in Aufzeichnungsreihenfolge, danach
+		immer die letzte. Ohne exakt passende Aufzeichnung wird für eine Anfrage ohne
+		Range die letzte vollständige Antwort derselben URL verwendet, auch ein Server
+		darf Validatoren ignorieren und den ganzen Inhalt senden.
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+
+		Returns:
+			Dict: Indexeintrag mit status, headers und body oder error
+
+		Raises:
+			ArchiveMissError: Wenn keine passende Antwort aufgezeichnet ist
+		"""
+		request_headers = archiveRequestHeaders(request)
+		candidates = self._by_request.get((request.method, request.url), [])
+		exact = [exchange for exchange in candidates if exchange.get("request_headers", {}) == request_headers]
+		if exact:
+			key = (request.method, request.url, tuple(sorted(request_headers.items())))
+			with self._lock:
+				position = self._served.get(key, 0)
+				self._served[key] = position + 1
+			return exact[min(position, len(exact) - 1)]
+
+		if "Range" not in request_headers:
+			complete = [
+				exchange
+				for exchange in candidates
+				if exchange.get("status") not in (None, 206, 304) and "Range" not in exchange.get("request_headers", {})
+			]
+			if complete:
+				return complete[-1]
+		raise ArchiveMissError(f"Nicht im HTTP-Archiv: {request.method} {request.url}", request=request)
+
+	def body(self, exchange: Dict) -> bytes:
+		"""
+		Liest den Inhalt einer aufgezeichneten Antwort
+
+		Args:
+			exchange (Dict): Indexeintrag
+
+		Returns:
+			bytes: Dekodierter Inhalt, leer wenn keiner aufgezeichnet wurde
+		"""
+		digest = exchange.get("body")
+		if not digest:
+			return b""
+		with self._lock:
+			return self._zip.read(f"bodies/{digest}")
+
+	def buildResponse(self, exchange: Dict, request) -> requests.Response:
+		"""
+		Baut eine Response aus einem Indexeintrag
+
+		Args:
+			exchange (Dict): Indexeintrag mit Status und Headern
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+
+		Returns:
+			requests.Response: Wiedergegebene Antwort
+		"""
+		body = self.body(exchange)
+		response = requests.Response()
+		response.status_code = exchange["status"]
+		response.reason = exchange.get("reason", "")
+		response.headers = CaseInsensitiveDict(exchange.get("headers", {}))
+		response.url = request.url
+		response.request = request
+		response.encoding = get_encoding_from_headers(response.headers)
+		response.raw = io.BytesIO(body)
+		response._content = body
+		response._content_consumed = True
+		return response
+
+	def close(self) -> None:
+		"""
+		Schließt die Archivdatei
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		self._zip.close()
+
+
+class PooledAdapter(HTTPAdapter):
+	"""
+	Transport-Adapter mit Retry, Circuit Breaker und Zählern
+	"""
+
+	def __init__(
+		self,
+		pool_connections: int = POOL_CONNECTIONS,
+		pool_maxsize: int = POOL_MAXSIZE,
+		retry: Optional[Retry] = None,
+		breaker: Optional[CircuitBreaker] = None,
+		counters: Optional[HttpCounters] = None,
+		cache: Optional[HttpCache] = None,
+		recorder: Optional[HttpArchiveRecorder] = None,
+		**kwargs,
+	):
+		"""
+		Initialisiert den Adapter
+
+		Args:
+			pool_connections (int): Anzahl gepufferter Host-Pools
+			pool_maxsize (int): Verbindungen pro Host, sollte der Anzahl paralleler Worker entsprechen
+			retry (Optional[Retry]): Wiederholungsstrategie, Standard ist buildRetry()
+			breaker (Optional[CircuitBreaker]): Circuit Breaker, sonst ein neuer
+			counters (Optional[HttpCounters]): Zähler, sonst neue
+			cache (Optional[HttpCache]): Optionaler HTTP-Cache auf der Festplatte
+			recorder (Optional[HttpArchiveRecorder]): Zeichnet alle Anfragen und Antworten auf
+			**kwargs: Weitere Argumente für HTTPAdapter
+		"""
+		self.breaker = breaker or CircuitBreaker()
+		self.counters = counters or HttpCounters()
+		self.cache = cache
+		self.recorder = recorder
+		super().__init__(
+			pool_connections=pool_connections,
+			pool_maxsize=pool_maxsize,
+			max_retries=retry or buildRetry(),
+			**kwargs,
+		)
+
+	def send(self, request, **kwargs):
+		"""
+		Sendet eine Anfrage und zeichnet sie bei aktivem Archiv auf
+
+		Aufgezeichnet wird, was der Aufrufer sieht, also oberhalb des HTTP-Caches.
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			**kwargs: Argumente für HTTPAdapter.send
+
+		Returns:
+			requests.Response: Antwort aus dem Cache oder vom Server
+		"""
+		if self.recorder is None:
+			return self.sendCached(request, **kwargs)
+		# Validatoren, die erst der Cache ergänzt, gehören nicht zur Anfrage des Aufrufers
+		request_headers = archiveRequestHeaders(request)
+		try:
+			response = self.sendCached(request, **kwargs)
+		except requests.exceptions.RequestException as exc:
+			self.recorder.recordError(request, request_headers, exc)
+			raise
+		return self.recorder.record(request, request_headers, response)
+
+	def sendCached(self, request, **kwargs):
+		"""
+		Sendet eine Anfrage, bei aktivem Cache zuerst über den HTTP-Cache
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			**kwargs: Argumente für HTTPAdapter.send
+
+		Returns:
+			requests.Response: Antwort aus dem Cache oder vom Server
+		"""
+		if self.cache is None:
+			return self.sendNetwork(request, **kwargs)
+		return self.cache.send(
+			request,
+			lambda prepared: self.sendNetwork(prepared, **kwargs),
+			bool(kwargs.get("stream")),
+			self.counters,
+		)
+
+	def sendNetwork(self, request, **kwargs):
+		"""
+		Sendet eine Anfrage über den Pool und aktualisiert Breaker und Zähler
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			**kwargs: Argumente für HTTPAdapter.send
+
+		Returns:
+			requests.Response: Antwort des Servers
+		"""
+		try:
+			self.breaker.before(request.url)
+		except CircuitOpenError:
+			self.counters.add("circuit_open")
+			raise
+
+		self.counters.add("requests")
+		started = time.perf_counter()
+		try:
+			response = super().send(request, **kwargs)
+		except requests.exceptions.RequestException:
+			self.counters.add("failures")
+			self.counters.observe(request.url, time.perf_counter() - started, True)
+			self.breaker.failure(request.url)
+			raise
+
+		self.counters.observe(request.url, time.perf_counter() - started, response.status_code >= 400)
+		self.counters.add("retries", retryCount(response.raw))
+		if response.status_code >= 500:
+			self.breaker.failure(request.url)
+		else:
+			self.breaker.success(request.url)
+		countBodyBytes(response.raw, self.counters)
+		return response
+
+	def connectionStats(self) -> Dict[str, int]:
+		"""
+		Summiert die Verbindungsstatistik der aktiven urllib3-Pools
+
+		Returns:
+			Dict[str, int]: Neu aufgebaute und wiederverwendete Verbindungen
+		"""
+		opened = 0
+		served = 0
+		pools = self.poolmanager.pools
+		for key in list(pools.keys()):
+			pool = pools.get(key)
+			if pool is None:
+				continue
+			opened += pool.num_connections
+			served += pool.num_requests
+		return {"connections_opened": opened, "connections_reused": max(served - opened, 0)}
+
+	def stats(self) -> Dict[str, int]:
+		"""
+		Liefert alle Zähler inklusive Verbindungsstatistik
+
+		Returns:
+			Dict[str, int]: Zählerstände nach Name
+		"""
+		values = self.counters.snapshot()
+		values.update(self.connectionStats())
+		return values
+
+	def close(self):
+		"""
+		Schließt die Verbindungen und ein offenes Archiv
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		super().close()
+		if self.recorder is not None:
+			self.recorder.close()
+
+
+class ReplayAdapter(PooledAdapter):
+	"""
+	Adapter, der Antworten ausschließlich aus einem HTTP-Archiv liefert
+
+	Es wird keine Verbindung aufgebaut, die Zähler der Session funktionieren aber wie gewohnt.
+	"""
+
+	def __init__(self, archive: HttpArchive, **kwargs):
+		"""
+		Initialisiert den Adapter
+
+		Args:
+			archive (HttpArchive): Geöffnetes Archiv
+			**kwargs: Weitere Argumente für PooledAdapter
+		"""
+		self.archive = archive
+		super().__init__(**kwargs)
+
+	def sendNetwork(self, request, **kwargs):
+		"""
+		Beantwortet eine Anfrage aus dem Archiv
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			**kwargs: Argumente von HTTPAdapter.send, werden ignoriert
+
+		Returns:
+			requests.Response: Aufgezeichnete Antwort
+
+		Raises:
+			requests.exceptions.ConnectionError: Bei fehlender Aufzeichnung oder aufgezeichnetem Fehler
+		"""
+		self.counters.add("requests")
+		started = time.perf_counter()
+		try:
+			exchange = self.archive.lookup(request)
+			if "error" in exchange:
+				raise requests.exceptions.ConnectionError(exchange["error"], request=request)
+		except requests.exceptions.RequestException:
+			self.counters.add("failures")
+			self.counters.observe(request.url, time.perf_counter() - started, True)
+			raise
+		response = self.archive.buildResponse(exchange, request)
+		self.counters.add("bytes_received", len(response.content))
+		self.counters.observe(request.url, time.perf_counter() - started, response.status_code >= 400)
+		return response
+
+	def close(self):
+		"""
+		Schließt das Archiv
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		super().close()
+		self.archive.close()
+
+
+def retryCount(raw: object) -> int:
+	"""
+	Liest die Anzahl der urllib3-Wiederholungen aus einer Rohantwort
+
+	Args:
+		raw (object): urllib3-Antwort aus response.raw
+
+	Returns:
+		int: Anzahl durchgeführter Wiederholungen
+	"""
+	history = getattr(getattr(raw, "retries", None), "history", ())
+	return len(history) if isinstance(history, tuple) else 0
+
+
+def countBodyBytes(raw: object, counters: HttpCounters) -> None:
+	"""
+	Zählt die gelesenen Bytes einer Antwort, auch wenn sie gestreamt wird
+
+	Args:
+		raw (object): urllib3-Antwort aus response.raw
+		counters (HttpCounters): Zähler, in die die Bytes eingehen
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	read = getattr(raw, "read", None)
+	read_chunked = getattr(raw, "read_chunked", None)
+	if not callable(read):
+		return
+
+	def countingRead(*args, **kwargs):
+		data = read(*args, **kwargs)
+		counters.add("bytes_received", len(data or b""))
+		return data
+
+	raw.read = countingRead
+	if callable(read_chunked):
+		# Chunked-Antworten umgehen read() und werden separat gezählt
+		def countingReadChunked(*args, **kwargs):
+			for chunk in read_chunked(*args, **kwargs):
+				counters.add("bytes_received", len(chunk))
+				yield chunk
+
+		raw.read_chunked = countingReadChunked
+
+
+def buildSession(user_agent: Optional[str] = None, adapter: Optional[PooledAdapter] = None) -> requests.Session:
+	"""
+	Erstellt eine Session, die für HTTP und HTTPS denselben Pool-Adapter nutzt
+
+	Args:
+		user_agent (Optional[str]): User-Agent für alle Anfragen
+		adapter (Optional[PooledAdapter]): Eigener Adapter, sonst ein PooledAdapter mit Standardwerten
+
+	Returns:
+		requests.Session: Konfigurierte HTTP-Session
+	"""
+	session = requests.Session()
+	if user_agent:
+		session.headers.update({"User-Agent": user_agent})
+	adapter = adapter or PooledAdapter()
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	return session
+
+
+def sessionStats(session: requests.Session) -> Dict[str, int]:
+	"""
+	Liefert die Zähler des Adapters einer Session
+
+	Args:
+		session (requests.Session): Mit buildSession() erstellte Session
+
+	Returns:
+		Dict[str, int]: Zählerstände oder leeres Dictionary bei fremden Adaptern
+	"""
+	get_adapter = getattr(session, "get_adapter", None)
+	adapter = get_adapter("https://") if callable(get_adapter) else None
+	return adapter.stats() if isinstance(adapter, PooledAdapter) else {}
+
+
+def sessionObservations(session: requests.Session) -> Tuple[List[float], Dict[str, int]]:
+	"""
+	Liefert Latenzen und Fehler pro Host des Adapters einer Session
+
+	Args:
+		session (requests.Session): Mit buildSession() erstellte Session
+
+	Returns:
+		Tuple[List[float], Dict[str, int]]: Latenzen in Sekunden und Fehler nach Host, leer bei fremden Adaptern
+	"""
+	get_adapter = getattr(session, "get_adapter", None)
+	adapter = get_adapter("https://") if callable(get_adapter) else None
+	if not isinstance(adapter, PooledAdapter):
+		return [], {}
+	return adapter.counters.latencies(), adapter.counters.hostErrors()
+
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def sharedSession() -> requests.Session:
+	"""
+	Liefert eine prozessweit geteilte Session, damit Verbindungen wiederverwendet werden
+
+	Returns:
+		requests.Session: Geteilte HTTP-Session
+	"""
+	global _shared_session
+	with _shared_lock:
+		if _shared_session is None:
+			_shared_session = buildSession()
+		return _shared_session
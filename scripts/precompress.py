@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Vorkomprimierte gzip- und brotli-Varianten für statisch ausgelieferte Dateien
+
+Neben einer Datei wie data/dokumente_metadata.json werden die Geschwister
+dokumente_metadata.json.gz und (mit installiertem brotli-Paket) .br geschrieben.
+Ein statischer Server kann sie direkt ausliefern und muss pro Anfrage nichts komprimieren.
+
+Ein Manifest merkt sich den sha256 jeder Quelldatei, komprimiert wird nur wenn sich
+der Inhalt geändert hat oder eine Variante fehlt.
+
+Dateien, die nicht von den Python-Scrapern geschrieben werden (z.B. data/kontakte/kontakte.json
+aus dem Node-Scraper), lassen sich nach deren Lauf manuell aktualisieren:
+	python scripts/precompress.py data/kontakte/kontakte.json
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+try:
+	# brotli ist optional, ohne das Paket entstehen nur gzip-Varianten
+	import brotli
+except ImportError:
+	brotli = None
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = (SCRIPT_DIR / ".." / "data").resolve()
+MANIFEST_FILE = DATA_DIR / "precompressed_manifest.json"
+# Kleine Dateien passen ohnehin in wenige Pakete, Komprimieren lohnt dort nicht
+MIN_SIZE_BYTES = 1024
+# Varianten, die weniger als 10% sparen, werden nicht abgelegt
+MAX_RATIO = 0.9
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+VARIANT_SUFFIXES = (".gz", ".br")
+
+
+def encoders() -> Dict[str, Callable[[bytes], bytes]]:
+	"""
+	Liefert die verfügbaren Kompressionsverfahren je Dateiendung
+
+	Returns:
+		Dict[str, Callable[[bytes], bytes]]: Endung der Variante und Kompressionsfunktion
+	"""
+	# mtime=0 hält die gzip-Ausgabe für gleichen Inhalt byte-identisch
+	available: Dict[str, Callable[[bytes], bytes]] = {
+		".gz": lambda data: gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0),
+	}
+	if brotli is not None:
+		available[".br"] = lambda data: brotli.compress(data, quality=BROTLI_QUALITY)
+	return available
+
+
+def writeBytesAtomically(path: Path, data: bytes) -> None:
+	"""
+	Schreibt Bytes über eine temporäre Datei, damit der Server nie eine halbe Variante liest
+
+	Args:
+		path (Path): Zieldatei
+		data (bytes): Inhalt
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	temporary = path.with_name(f".{path.name}.tmp")
+	temporary.write_bytes(data)
+	os.replace(temporary, path)
+
+
+class Precompressor:
+	"""
+	Erzeugt komprimierte Geschwister von Dateien und merkt sich deren Quell-Hash im Manifest
+	"""
+
+	def __init__(self, manifest_path: Optional[Path] = None, base_dir: Optional[Path] = None):
+		"""
+		Lädt das Manifest, ein fehlendes oder defektes Manifest gilt als leer
+
+		Args:
+			manifest_path (Optional[Path]): Manifest-Datei, Standard ist MANIFEST_FILE
+			base_dir (Optional[Path]): Basis für die Schlüssel im Manifest, Standard ist DATA_DIR
+		"""
+		self.manifest_path = Path(manifest_path or MANIFEST_FILE)
+		self.base_dir = Path(base_dir or DATA_DIR)
+		self.stats = {"compressed": 0, "unchanged": 0, "skipped": 0, "bytes_saved": 0}
+		try:
+			loaded = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+			self.files: Dict[str, Dict] = loaded.get("files", {}) if isinstance(loaded, dict) else {}
+		except (OSError, ValueError):
+			self.files = {}
+
+	def key(self, path: Path) -> str:
+		"""
+		Bildet den Manifest-Schlüssel einer Datei
+
+		Args:
+			path (Path): Quelldatei
+
+		Returns:
+			str: Pfad relativ zu base_dir, außerhalb davon der absolute Pfad
+		"""
+		resolved = path.resolve()
+		try:
+			return resolved.relative_to(self.base_dir.resolve()).as_posix()
+		except ValueError:
+			return resolved.as_posix()
+
+	def compress(self, path: Path, sha256: Optional[str] = None) -> bool:
+		"""
+		Aktualisiert die komprimierten Varianten einer Datei, wenn sich ihr Inhalt geändert hat
+
+		Args:
+			path (Path): Quelldatei
+			sha256 (Optional[str]): Bereits bekannter Hash, spart das erneute Lesen bei unveränderten Dateien
+
+		Returns:
+			bool: True wenn Varianten neu geschrieben wurden
+		"""
+		path = Path(path)
+		key = self.key(path)
+		available = encoders()
+		data: Optional[bytes] = None
+		if not sha256:
+			try:
+				data = path.read_bytes()
+			except OSError:
+				self.forget(path)
+				return False
+			sha256 = hashlib.sha256(data).hexdigest()
+
+		known = self.files.get(key, {})
+		variants = known.get("variants", [])
+		if (
+			known.get("sha256") == sha256
+			and set(known.get("encoders", [])) == set(available)
+			and all(path.with_name(path.name + suffix).is_file() for suffix in variants)
+		):
+			# Auch bei gleichem Inhalt kann die Quelle neu geschrieben worden sein (z.B. als Hardlink aus dem Blob-Store)
+			self.touchVariants(path, variants)
+			self.stats["unchanged"] += 1
+			return False
+
+		if data is None:
+			try:
+				data = path.read_bytes()
+			except OSError:
+				self.forget(path)
+				return False
+
+		written: List[str] = []
+		for suffix in VARIANT_SUFFIXES:
+			sibling = path.with_name(path.name + suffix)
+			encoded = available[suffix](data) if suffix in available and len(data) >= MIN_SIZE_BYTES else None
+			if encoded is None or len(encoded) > len(data) * MAX_RATIO:
+				# Veraltete Varianten dürfen nicht neben einem neuen Inhalt liegen bleiben
+				sibling.unlink(missing_ok=True)
+				continue
+			writeBytesAtomically(sibling, encoded)
+			written.append(suffix)
+			self.stats["bytes_saved"] += len(data) - len(encoded)
+
+		self.files[key] = {"sha256": sha256, "variants": written, "encoders": sorted(available)}
+		self.stats["compressed" if written else "skipped"] += 1
+		return bool(written)
+
+	def touchVariants(self, path: Path, variants: Iterable[str]) -> None:
+		"""
+		Zieht die mtime der Varianten auf die der Quelldatei nach, wenn sie älter sind
+
+		server.js liefert eine Variante nur aus, wenn sie nicht älter als das Original ist.
+
+		Args:
+			path (Path): Quelldatei mit unverändertem Inhalt
+			variants (Iterable[str]): Endungen der vorhandenen Varianten
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		try:
+			source_mtime = path.stat().st_mtime_ns
+		except OSError:
+			return
+		for suffix in variants:
+			sibling = path.with_name(path.name + suffix)
+			try:
+				stat = sibling.stat()
+				if stat.st_mtime_ns < source_mtime:
+					os.utime(sibling, ns=(stat.st_atime_ns, source_mtime))
+			except OSError as exc:
+				print(f"Warnung: Zeitstempel der Variante konnte nicht aktualisiert werden ({sibling}): {exc}")
+
+	def variantPaths(self) -> Set[str]:
+		"""
+		Liefert alle Varianten, die laut Manifest vom Precompressor geschrieben wurden
+
+		Returns:
+			Set[str]: Manifest-Schlüssel der Quelle mit angehängter Endung, z.B. "documents/A/liste.csv.gz"
+		"""
+		return {key + suffix for key, known in self.files.items() for suffix in known.get("variants", [])}
+
+	def forget(self, path: Path) -> None:
+		"""
+		Entfernt die Varianten einer Datei und ihren Manifest-Eintrag
+
+		Args:
+			path (Path): Quelldatei, die nicht mehr ausgeliefert wird
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		path = Path(path)
+		for suffix in VARIANT_SUFFIXES:
+			path.with_name(path.name + suffix).unlink(missing_ok=True)
+		self.files.pop(self.key(path), None)
+
+	def retain(self, paths: Iterable[Path], within: Path) -> int:
+		"""
+		Vergisst alle Manifest-Einträge unterhalb eines Ordners, deren Quelldatei nicht in der Liste steht
+
+		Args:
+			paths (Iterable[Path]): Dateien, deren Varianten erhalten bleiben sollen
+			within (Path): Ordner, auf den sich die Liste bezieht, andere Einträge bleiben unberührt
+
+		Returns:
+			int: Anzahl entfernter Einträge
+		"""
+		keep = {self.key(Path(path)) for path in paths}
+		prefix = self.key(Path(within)).rstrip("/") + "/"
+		stale = [key for key in self.files if key.startswith(prefix) and key not in keep]
+		for key in stale:
+			source = Path(key) if Path(key).is_absolute() else self.base_dir / key
+			self.forget(source)
+		return len(stale)
+
+	def save(self) -> None:
+		"""
+		Schreibt das Manifest atomar
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+		payload = json.dumps({"files": self.files}, ensure_ascii=False, indent=1, sort_keys=True)
+		writeBytesAtomically(self.manifest_path, payload.encode("utf-8"))
+
+
+def main() -> int:
+	"""
+	Komprimiert die übergebenen Dateien und speichert das Manifest
+
+	Returns:
+		int: 0 bei Erfolg, 1 ohne Dateiangabe oder bei fehlenden Dateien
+	"""
+	if len(sys.argv) < 2:
+		print(f"Verwendung: {sys.argv[0]} DATEI [DATEI ...]")
+		return 1
+
+	precompressor = Precompressor()
+	missing = 0
+	for argument in sys.argv[1:]:
+		path = Path(argument)
+		if not path.is_file():
+			print(f"Nicht gefunden: {path}")
+			missing += 1
+			continue
+		precompressor.compress(path)
+	precompressor.save()
+	stats = precompressor.stats
+	print(
+		f"{stats['compressed']} komprimiert, {stats['unchanged']} unverändert, {stats['skipped']} zu klein, "
+		f"{stats['bytes_saved'] / 1024:.1f} KiB gespart"
+	)
+	return 1 if missing else 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
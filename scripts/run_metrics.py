@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Laufzeit- und Durchsatzmetriken eines Scraper-Laufs
+
+Sammelt die Dauer einzelner Phasen (Crawlen, Parsen, Prüfen, Herunterladen, Hashen,
+Speichern) und schreibt sie zusammen mit Zählern, Latenz-Perzentilen und Fehlern pro
+Host als JSON-Zusammenfassung und als Datei für den Textfile-Collector des node_exporter.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+# Präfix aller Prometheus-Metriken
+METRIC_PREFIX = "dhbw_dokumente"
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+LABEL_ESCAPE_PATTERN = re.compile(r'(["\\\n])')
+
+
+def percentile(values: Sequence[float], quantile: float) -> float:
+	"""
+	Berechnet ein Perzentil mit linearer Interpolation
+
+	Args:
+		values (Sequence[float]): Messwerte in beliebiger Reihenfolge
+		quantile (float): Gesuchtes Quantil zwischen 0 und 1
+
+	Returns:
+		float: Perzentil oder 0 bei leerer Liste
+	"""
+	if not values:
+		return 0.0
+	ordered = sorted(values)
+	position = (len(ordered) - 1) * quantile
+	lower = math.floor(position)
+	upper = math.ceil(position)
+	return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def latencySummary(samples: Sequence[float]) -> Dict[str, float]:
+	"""
+	Fasst Latenzen zu Anzahl, Summe, Maximum und Perzentilen zusammen
+
+	Args:
+		samples (Sequence[float]): Latenzen in Sekunden
+
+	Returns:
+		Dict[str, float]: count, sum, max sowie p50, p95 und p99
+	"""
+	summary = {"count": len(samples), "sum": float(sum(samples)), "max": max(samples, default=0.0)}
+	for quantile in LATENCY_QUANTILES:
+		summary[f"p{int(quantile * 100)}"] = percentile(samples, quantile)
+	return summary
+
+
+def escapeLabel(value: str) -> str:
+	"""
+	Maskiert einen Label-Wert für das Prometheus-Textformat
+
+	Args:
+		value (str): Roher Label-Wert
+
+	Returns:
+		str: Wert mit maskierten Anführungszeichen, Backslashes und Zeilenumbrüchen
+	"""
+	return LABEL_ESCAPE_PATTERN.sub(lambda match: "\\n" if match.group(1) == "\n" else "\\" + match.group(1), value)
+
+
+class RunMetrics:
+	"""
+	Sammelt Phasendauern und Zähler eines Laufs, threadsicher für Worker-Threads
+	"""
+
+	def __init__(self, clock=time.perf_counter):
+		"""
+		Startet die Gesamtmessung des Laufs
+
+		Args:
+			clock (Callable[[], float]): Monotone Zeitquelle in Sekunden
+		"""
+		self._clock = clock
+		self._lock = threading.Lock()
+		self._started = clock()
+		self._lap_started = self._started
+		self.started_at = time.time()
+		self.phases: Dict[str, float] = {}
+		self.counters: Dict[str, float] = {}
+
+	def lap(self, name: str) -> None:
+		"""
+		Schließt eine Phase ab, die mit dem vorherigen lap()-Aufruf bzw. dem Start begonnen hat
+
+		Args:
+			name (str): Name der abgeschlossenen Phase
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		now = self._clock()
+		self.addPhase(name, now - self._lap_started)
+		self._lap_started = now
+
+	def addPhase(self, name: str, seconds: float) -> None:
+		"""
+		Addiert eine außerhalb gemessene Dauer zu einer Phase
+
+		Args:
+			name (str): Name der Phase
+			seconds (float): Dauer in Sekunden
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+	def add(self, name: str, amount: float = 1) -> None:
+		"""
+		Erhöht einen Zähler
+
+		Args:
+			name (str): Name des Zählers
+			amount (float): Betrag der Erhöhung
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			self.counters[name] = self.counters.get(name, 0) + amount
+
+	def elapsed(self) -> float:
+		"""
+		Liefert die bisherige Gesamtdauer des Laufs
+
+		Returns:
+			float: Sekunden seit Erstellung
+		"""
+		return self._clock() - self._started
+
+	def summary(
+		self,
+		stats: Mapping[str, int],
+		http_stats: Mapping[str, int],
+		latencies: Sequence[float],
+		host_errors: Mapping[str, int],
+		success: bool,
+	) -> Dict:
+		"""
+		Baut die maschinenlesbare Zusammenfassung des Laufs
+
+		Args:
+			stats (Mapping[str, int]): Dokument-Zähler des Laufs
+			http_stats (Mapping[str, int]): Zähler der HTTP-Session
+			latencies (Sequence[float]): Latenzen der HTTP-Anfragen in Sekunden
+			host_errors (Mapping[str, int]): Fehlgeschlagene Anfragen pro Host
+			success (bool): True wenn der Lauf ohne Fehler endete
+
+		Returns:
+			Dict: Zusammenfassung mit phases, throughput, documents, http und errors_by_host
+		"""
+		# Bedingte GETs übertragen geänderte Inhalte schon in der Prüf-Phase, deren Bytes zählen mit
+		transfer_seconds = self.phases.get("revalidate", 0.0) + self.phases.get("download", 0.0)
+		downloaded_bytes = self.counters.get("download_bytes", 0)
+		return {
+			"started_at": self.started_at,
+			"duration_seconds": self.elapsed(),
+			"success": success,
+			"phases": dict(sorted(self.phases.items())),
+			"throughput": {
+				"download_bytes": downloaded_bytes,
+				"download_bytes_per_second": downloaded_bytes / transfer_seconds if transfer_seconds > 0 else 0.0,
+				"http_bytes_received": http_stats.get("bytes_received", 0),
+			},
+			"documents": dict(stats),
+			"http": {**http_stats, "latency_seconds": latencySummary(latencies)},
+			"errors_by_host": dict(sorted(host_errors.items())),
+		}
+
+
+def prometheusText(summary: Mapping) -> str:
+	"""
+	Formatiert eine Zusammenfassung im Prometheus-Textformat
+
+	Args:
+		summary (Mapping): Ergebnis von RunMetrics.summary
+
+	Returns:
+		str: Inhalt für eine .prom-Datei des Textfile-Collectors
+	"""
+	lines: List[str] = []
+
+	def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+		full_name = f"{METRIC_PREFIX}_{name}"
+		lines.append(f"# HELP {full_name} {help_text}")
+		lines.append(f"# TYPE {full_name} {kind}")
+		for labels, value, *suffix in samples:
+			label_text = ",".join(f'{key}="{escapeLabel(str(label))}"' for key, label in labels.items())
+			sample_name = full_name + (suffix[0] if suffix else "")
+			# repr() behält die volle Genauigkeit, wichtig für Zeitstempel
+			lines.append(f"{sample_name}{{{label_text}}} {float(value)!r}" if label_text else f"{sample_name} {float(value)!r}")
+
+	metric("last_run_timestamp_seconds", "gauge", "Startzeitpunkt des letzten Laufs", [({}, summary["started_at"])])
+	metric("last_run_success", "gauge", "1 wenn der letzte Lauf ohne Fehler endete", [({}, 1 if summary["success"] else 0)])
+	metric("run_duration_seconds", "gauge", "Gesamtdauer des letzten Laufs", [({}, summary["duration_seconds"])])
+	metric(
+		"phase_duration_seconds", "gauge", "Dauer pro Phase im letzten Lauf (parse liegt in crawl, hash in revalidate und download)",
+		[({"phase": name}, seconds) for name, seconds in summary["phases"].items()],
+	)
+	metric(
+		"documents", "gauge", "Dokumente pro Ergebnis im letzten Lauf",
+		[({"state": name}, value) for name, value in sorted(summary["documents"].items())],
+	)
+	throughput = summary["throughput"]
+	metric("download_bytes", "gauge", "Heruntergeladene Bytes im letzten Lauf", [({}, throughput["download_bytes"])])
+	metric(
+		"download_bytes_per_second", "gauge", "Download-Durchsatz über Prüf- und Download-Phase im letzten Lauf",
+		[({}, throughput["download_bytes_per_second"])],
+	)
+
+	http = dict(summary["http"])
+	latency = http.pop("latency_seconds")
+	metric(
+		"http", "gauge", "HTTP-Zähler des letzten Laufs",
+		[({"counter": name}, value) for name, value in sorted(http.items())],
+	)
+	metric(
+		"http_request_duration_seconds", "summary", "Latenz der HTTP-Anfragen bis zu den Antwort-Headern",
+		[({"quantile": str(quantile)}, latency[f"p{int(quantile * 100)}"]) for quantile in LATENCY_QUANTILES]
+		+ [({}, latency["sum"], "_sum"), ({}, latency["count"], "_count")],
+	)
+	metric(
+		"http_errors", "gauge", "Fehlgeschlagene HTTP-Anfragen pro Host im letzten Lauf",
+		[({"host": host}, count) for host, count in summary["errors_by_host"].items()],
+	)
+	return "\n".join(lines) + "\n"
+
+
+def writeAtomically(path: Path, content: str) -> None:
+	"""
+	Schreibt Text über eine temporäre Datei, damit Leser nie eine halbe Datei sehen
+
+	Args:
+		path (Path): Zieldatei
+		content (str): Inhalt
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	path.parent.mkdir(parents=True, exist_ok=True)
+	# Der node_exporter liest nur *.prom, die temporäre Datei wird deshalb nicht erfasst
+	temporary = path.with_name(f".{path.name}.tmp")
+	temporary.write_text(content, encoding="utf-8")
+	os.replace(temporary, path)
+
+
+def exportMetrics(summary: Mapping, json_path: Path, textfile_path: Optional[Path] = None) -> None:
+	"""
+	Schreibt die Zusammenfassung als JSON und optional als Prometheus-Textdatei
+
+	Args:
+		summary (Mapping): Ergebnis von RunMetrics.summary
+		json_path (Path): Ziel der JSON-Zusammenfassung
+		textfile_path (Optional[Path]): Ziel der .prom-Datei
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	writeAtomically(json_path, json.dumps(summary, ensure_ascii=False, indent=2))
+	if textfile_path is not None:
+		writeAtomically(textfile_path, prometheusText(summary))
@@ -9,27 +9,56 @@ da es unnötig ist jedes mal die Dokumente neu zu laden wenn die Seite aufgerufe
 da sich die Dokumente nur selten ändern, 
 und der Vorgang sowieso (abhänig von der Internetgeschwindigkeit) etwas länger dauert.
 Das Programm lässt sich natürlich manuell noch ganz normal ausführen, falls sie es selbst testen möchten.
+Alternativ zum zyklischen Aufruf läuft es mit --daemon dauerhaft und prüft jede Kategorie
+so oft, wie sie sich bisher tatsächlich geändert hat (Plan in data/dokumente_schedule.json).
+Mit --record ARCHIV werden alle HTTP-Antworten eines Laufs aufgezeichnet, --replay ARCHIV
+wiederholt den Lauf danach ohne Netzwerk, z.B. zum Profilieren oder Nachstellen eines Fehlers.
+--plan crawlt nur und schreibt nach HEAD-Prüfung in data/dokumente_plan.json, was ein Lauf
+laden, aktualisieren oder entfernen würde, samt geschätzter Größe.
 Im unwahrscheinlichen Fall dass die DHBW Ravensburg die Struktur ihrer Dokumentenseite verändert,
 könnte dieses Skript fehlschlagen da es stark auf die aktuelle HTML-Struktur abgestimmt ist.
 """
 
 from __future__ import annotations
 
+import argparse
 import hashlib
 import json
 import os
 import re
+import shutil
+import signal
+import sqlite3
+import struct
 import subprocess
 import sys
+import threading
 import time
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set, Tuple
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypeVar
 from urllib.parse import urljoin, urlparse
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+if __package__:
+	from . import http_client, precompress, run_metrics, search_index, thumbnails
+else:
+	import http_client
+	import precompress
+	import run_metrics
+	import search_index
+	import thumbnails
+
+# lxml ist schneller, repariert fehlerhaftes Markup aber anders und kann so Titel, Abschnitte
+# und Entry-Keys verschieben. Ohne Vergleich auf einer gespeicherten Originalseite bleibt html.parser Standard
+HTML_PARSER = "html.parser"
 
 
 BASE_URL = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
@@ -37,10 +66,58 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 DATA_DIR = (SCRIPT_DIR / ".." / "data").resolve()
 DOCUMENTS_DIR = DATA_DIR / "documents"
 METADATA_FILE = DATA_DIR / "dokumente_metadata.json"
+PAGE_CACHE_FILE = DATA_DIR / "dokumente_page_cache.json"
+METADATA_DB_FILE = DATA_DIR / "dokumente_metadata.sqlite"
+JOURNAL_FILE = DATA_DIR / "dokumente_journal.jsonl"
+CHANGES_FILE = DATA_DIR / "dokumente_changes.jsonl"
+CHANGES_INDEX_FILE = DATA_DIR / "dokumente_changes.idx"
+# Ein Indexeintrag ist der Byte-Offset eines Feed-Eintrags als 8-Byte-Zahl (big endian)
+CHANGES_INDEX_RECORD = struct.Struct(">Q")
+DAEMON_SCHEDULE_FILE = DATA_DIR / "dokumente_schedule.json"
+METRICS_FILE = DATA_DIR / "dokumente_metrics.json"
+METRICS_TEXTFILE = DATA_DIR / "dokumente_metrics.prom"
+PLAN_FILE = DATA_DIR / "dokumente_plan.json"
+# Prüfabstände pro Top-Kategorie im Daemon-Betrieb
+DAEMON_INITIAL_INTERVAL_SECONDS = 3600.0
+DAEMON_MIN_INTERVAL_SECONDS = 900.0
+DAEMON_MAX_INTERVAL_SECONDS = 3 * 24 * 3600.0
+DAEMON_BACKOFF_FACTOR = 1.5
+DAEMON_SPEEDUP_FACTOR = 0.5
+# Die Seiten selbst werden bedingt geladen und spätestens so oft auf neue Dokumente geprüft
+DAEMON_PAGE_INTERVAL_SECONDS = 3600.0
+DAEMON_RETRY_SECONDS = 300.0
+# Felder, die sich bei jedem Lauf ändern und keine inhaltliche Änderung bedeuten
+CHANGE_IGNORED_FIELDS = {"last_seen", "downloaded_at"}
+HTTP_CACHE_DIR = DATA_DIR / "http_cache"
+# Seiten und Dokumente tragen meist nur Last-Modified, ohne Frische-Angabe des Servers wird immer revalidiert
+HTTP_CACHE_HEURISTIC_SECONDS = 0.0
+QUARANTINE_DIR = DATA_DIR / "quarantine"
+DOCUMENTS_INDEX_FILE = DATA_DIR / "documents_index.json"
+DOCUMENTS_INDEX_VERSION = 1
+SEARCH_INDEX_DIR = DATA_DIR / "search_index"
+THUMBNAILS_DIR = DATA_DIR / "thumbnails"
+PRECOMPRESS_MANIFEST_FILE = DATA_DIR / "precompressed_manifest.json"
+# Textartige Dokumente, die neben dem Original als .gz/.br abgelegt werden
+PRECOMPRESS_EXTENSIONS = {".txt", ".csv", ".rtf"}
+BLOBS_DIR = DATA_DIR / "blobs"
+# Muss erhöht werden, wenn sich die Extraktionslogik ändert, sonst bleiben alte Ergebnisse gültig
+PAGE_CACHE_VERSION = 3
 
 REQUEST_TIMEOUT = 45
 HEAD_TIMEOUT = 20
-REQUEST_DELAY_SECONDS = 0.12
+PROBE_WORKERS = 12
+CRAWL_WORKERS = 4
+PER_HOST_CONCURRENCY = 6
+# Token-Bucket pro Host: Startrate entspricht der früheren festen Pause von 0.12 s
+RATE_INITIAL_PER_SECOND = 8.0
+RATE_MIN_PER_SECOND = 0.5
+RATE_BURST = 4.0
+RATE_INCREASE_STEP = 0.5
+RATE_BACKOFF_FACTOR = 0.5
+RATE_FAST_RESPONSE_SECONDS = 0.5
+RATE_SLOW_RESPONSE_SECONDS = 3.0
+RATE_LIMIT_RETRIES = 3
+RETRY_AFTER_MAX_SECONDS = 300.0
 
 USER_AGENT = (
 	"Mozilla/5.0 (X11; Linux x86_64) "
@@ -82,6 +159,14 @@ DOCUMENT_EXTENSIONS = {
 
 NON_DOCUMENT_EXTENSIONS = {".htm", ".html", ".php", ".asp", ".aspx"}
 
+# Findet alle Tab-Ziele, bevor das HTML geparst wird
+TAB_TARGET_PATTERN = re.compile(
+	r"""data-href\s*=\s*(?:"\s*#([^"]*)"|'\s*#([^']*)'|#([^\s>]+))""",
+	re.IGNORECASE,
+)
+
+T = TypeVar("T")
+
 
 @dataclass
 class SourceDocument:
@@ -93,6 +178,31 @@ class SourceDocument:
 	category_sub: str
 
 
+@dataclass
+class DownloadResult:
+	ok: bool
+	error: str = ""
+	not_modified: bool = False
+	headers: Dict[str, str] = field(default_factory=dict)
+	sha256: str = ""
+	size: int = 0
+	hash_seconds: float = 0.0
+
+
+@dataclass
+class SweepResult:
+	files: int = 0
+	bytes_reclaimed: int = 0
+	directories: int = 0
+
+
+@dataclass
+class ScrapeResult:
+	exit_code: int
+	categories: Set[str] = field(default_factory=set)
+	changed_categories: Set[str] = field(default_factory=set)
+
+
 def nowIso() -> str:
 	"""
 	Gibt den aktuellen Zeitpunkt als ISO-8601 String in UTC zurück
@@ -123,16 +233,264 @@ def attributeToText(value: object) -> str:
 	return str(value)
 
 
-def buildSession() -> requests.Session:
+class HostConcurrencyLimiter:
+	"""
+	Begrenzt die Anzahl gleichzeitiger Anfragen pro Host
+	"""
+
+	def __init__(self, per_host: int = PER_HOST_CONCURRENCY):
+		"""
+		Initialisiert den Limiter
+
+		Args:
+			per_host (int): Maximale Anzahl paralleler Anfragen je Host
+		"""
+		self.per_host = max(1, per_host)
+		self._lock = threading.Lock()
+		self._slots: Dict[str, threading.BoundedSemaphore] = {}
+
+	@contextmanager
+	def slot(self, url: str) -> Iterator[None]:
+		"""
+		Belegt für die Dauer des Blocks einen Platz für den Host der URL
+
+		Args:
+			url (str): URL deren Host begrenzt wird
+
+		Returns:
+			Iterator[None]: Kontext, in dem die Anfrage ausgeführt werden darf
+		"""
+		host = urlparse(url).netloc.lower()
+		with self._lock:
+			semaphore = self._slots.get(host)
+			if semaphore is None:
+				semaphore = threading.BoundedSemaphore(self.per_host)
+				self._slots[host] = semaphore
+		with semaphore:
+			yield
+
+
+def parseRetryAfter(value: Optional[str]) -> Optional[float]:
+	"""
+	Wandelt einen Retry-After-Header in Sekunden um
+
+	Args:
+		value (Optional[str]): Header-Wert als Sekundenzahl oder HTTP-Datum
+
+	Returns:
+		Optional[float]: Wartezeit in Sekunden oder None wenn nicht auswertbar
+	"""
+	if not value:
+		return None
+	value = value.strip()
+	if value.isdigit():
+		seconds = float(value)
+	else:
+		try:
+			retry_at = parsedate_to_datetime(value)
+		except (TypeError, ValueError):
+			return None
+		if retry_at.tzinfo is None:
+			retry_at = retry_at.replace(tzinfo=timezone.utc)
+		seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+	# Unsinnig lange Wartezeiten werden gekappt, damit ein Lauf nicht hängen bleibt
+	return min(max(seconds, 0.0), RETRY_AFTER_MAX_SECONDS)
+
+
+@dataclass
+class HostBucket:
+	rate: float
+	tokens: float
+	updated: float
+	blocked_until: float = 0.0
+
+
+class AdaptiveRateLimiter:
+	"""
+	Token-Bucket pro Host, dessen Rate sich an den Antworten des Servers ausrichtet
+
+	Schnelle Antworten erhöhen die Rate schrittweise, 429/503 halbieren sie und
+	sperren den Host bis zum Ende von Retry-After.
+	"""
+
+	def __init__(
+		self,
+		rate: float = RATE_INITIAL_PER_SECOND,
+		burst: float = RATE_BURST,
+		clock: Optional[Callable[[], float]] = None,
+	):
+		"""
+		Initialisiert den Limiter
+
+		Args:
+			rate (float): Anfangsrate in Anfragen pro Sekunde und Host
+			burst (float): Maximale Anzahl angesparter Tokens
+			clock (Optional[Callable[[], float]]): Monotone Uhr, Standard ist time.monotonic
+		"""
+		self.initial_rate = max(rate, RATE_MIN_PER_SECOND)
+		self.burst = max(burst, 1.0)
+		self._clock = clock or time.monotonic
+		self._lock = threading.Lock()
+		self._buckets: Dict[str, HostBucket] = {}
+
+	def _bucket(self, host: str, now: float) -> HostBucket:
+		bucket = self._buckets.get(host)
+		if bucket is None:
+			bucket = HostBucket(rate=self.initial_rate, tokens=self.burst, updated=now)
+			self._buckets[host] = bucket
+		# Tokens werden seit der letzten Berechnung entsprechend der aktuellen Rate nachgefüllt
+		bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+		bucket.updated = now
+		return bucket
+
+	def rate(self, url: str) -> float:
+		"""
+		Liefert die aktuelle Rate für den Host einer URL
+
+		Args:
+			url (str): URL des Hosts
+
+		Returns:
+			float: Anfragen pro Sekunde
+		"""
+		with self._lock:
+			return self._bucket(urlparse(url).netloc.lower(), self._clock()).rate
+
+	def acquire(self, url: str) -> None:
+		"""
+		Wartet, bis für den Host der URL ein Token frei ist, und verbraucht es
+
+		Args:
+			url (str): URL der anstehenden Anfrage
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		host = urlparse(url).netloc.lower()
+		while True:
+			with self._lock:
+				now = self._clock()
+				bucket = self._bucket(host, now)
+				wait = bucket.blocked_until - now
+				if wait <= 0:
+					if bucket.tokens >= 1:
+						bucket.tokens -= 1
+						return
+					wait = (1 - bucket.tokens) / bucket.rate
+			# Gewartet wird außerhalb der Sperre, damit andere Hosts weiterlaufen
+			time.sleep(wait)
+
+	def feedback(self, url: str, status_code: int, elapsed: float, retry_after: Optional[float] = None) -> None:
+		"""
+		Passt die Rate des Hosts an die Antwort an
+
+		Args:
+			url (str): URL der beantworteten Anfrage
+			status_code (int): HTTP-Status der Antwort
+			elapsed (float): Antwortzeit bis zu den Headern in Sekunden
+			retry_after (Optional[float]): Wartezeit aus Retry-After in Sekunden
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._lock:
+			now = self._clock()
+			bucket = self._bucket(urlparse(url).netloc.lower(), now)
+			if status_code in (429, 503):
+				# Überlastung: Rate halbieren und den Host bis Retry-After pausieren
+				bucket.rate = max(RATE_MIN_PER_SECOND, bucket.rate * RATE_BACKOFF_FACTOR)
+				pause = retry_after if retry_after is not None else 1.0 / bucket.rate
+				bucket.blocked_until = max(bucket.blocked_until, now + pause)
+				bucket.tokens = 0.0
+			elif status_code >= 500 or elapsed >= RATE_SLOW_RESPONSE_SECONDS:
+				# Langsame Antworten oder Serverfehler bremsen sanft
+				bucket.rate = max(RATE_MIN_PER_SECOND, bucket.rate * 0.9)
+			elif elapsed <= RATE_FAST_RESPONSE_SECONDS:
+				# Schnelle Antworten erhöhen die Rate additiv ohne feste Obergrenze
+				bucket.rate += RATE_INCREASE_STEP
+
+
+class RateLimitedAdapter(http_client.PooledAdapter):
+	"""
+	Pool-Adapter, der jede Anfrage der Session zusätzlich über den AdaptiveRateLimiter schickt
+	"""
+
+	def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, **kwargs):
+		"""
+		Initialisiert den Adapter
+
+		Args:
+			limiter (Optional[AdaptiveRateLimiter]): Gemeinsamer Limiter, sonst ein neuer
+			**kwargs: Weitere Argumente für http_client.PooledAdapter
+		"""
+		self.limiter = limiter or AdaptiveRateLimiter()
+		super().__init__(**kwargs)
+
+	def sendNetwork(self, request, **kwargs):
+		"""
+		Sendet eine Anfrage gedrosselt und wiederholt GET/HEAD bei 429/503
+
+		Antworten aus dem HTTP-Cache kommen hier nicht an und verbrauchen daher keine Tokens.
+
+		Args:
+			request (requests.PreparedRequest): Vorbereitete Anfrage
+			**kwargs: Argumente für http_client.PooledAdapter.sendNetwork
+
+		Returns:
+			requests.Response: Antwort des Servers
+		"""
+		attempt = 0
+		while True:
+			self.limiter.acquire(request.url)
+			started = time.monotonic()
+			response = super().sendNetwork(request, **kwargs)
+			retry_after = parseRetryAfter(response.headers.get("Retry-After"))
+			self.limiter.feedback(request.url, response.status_code, time.monotonic() - started, retry_after)
+
+			retryable = response.status_code in (429, 503) and request.method in ("GET", "HEAD")
+			if not retryable or attempt >= RATE_LIMIT_RETRIES:
+				return response
+			# Die Wiederholung wartet im Limiter, bis die Sperre für den Host abgelaufen ist
+			attempt += 1
+			response.close()
+
+
+def buildSession(
+	http_cache_dir: Optional[Path] = None,
+	record_path: Optional[Path] = None,
+	replay_path: Optional[Path] = None,
+) -> requests.Session:
 	"""
 	Erstellt eine Requests-Session mit vordefiniertem User-Agent
 
+	Args:
+		http_cache_dir (Optional[Path]): Verzeichnis für den HTTP-Cache, None deaktiviert ihn
+		record_path (Optional[Path]): Alle Anfragen und Antworten in diesem HTTP-Archiv aufzeichnen
+		replay_path (Optional[Path]): Antworten ohne Netzwerk aus diesem HTTP-Archiv liefern
+
 	Returns:
-		requests.Session: Konfigurierte HTTP-Session
+		requests.Session: Konfigurierte HTTP-Session, mit Archiv erst nach session.close() vollständig
 	"""
-	session = requests.Session()
-	session.headers.update({"User-Agent": USER_AGENT})
-	return session
+	if replay_path is not None:
+		# Ohne Netzwerk gibt es nichts zu drosseln, der Lauf ist nur durch die CPU begrenzt
+		adapter = http_client.ReplayAdapter(http_client.HttpArchive(replay_path), pool_maxsize=PROBE_WORKERS)
+		return http_client.buildSession(USER_AGENT, adapter)
+
+	# Der Verbindungspool muss so groß sein wie die Anzahl paralleler Worker
+	# Alle Abrufe (Seiten, HEAD, Downloads) laufen über denselben adaptiven Limiter,
+	# 429/503 behandelt der Limiter selbst und urllib3 wiederholt nur die übrigen 5xx
+	adapter = RateLimitedAdapter(
+		pool_connections=4,
+		pool_maxsize=PROBE_WORKERS,
+		retry=http_client.buildRetry(status_forcelist=(500, 502, 504)),
+		cache=(
+			http_client.HttpCache(http_cache_dir, heuristic_max_seconds=HTTP_CACHE_HEURISTIC_SECONDS)
+			if http_cache_dir is not None
+			else None
+		),
+		recorder=http_client.HttpArchiveRecorder(record_path) if record_path is not None else None,
+	)
+	return http_client.buildSession(USER_AGENT, adapter)
 
 
 def loadMetadata() -> Dict:
@@ -171,6 +529,522 @@ def saveMetadata(metadata: Dict) -> None:
 		json.dump(metadata, handle, indent=2, ensure_ascii=False)
 
 
+def loadPageCache() -> Dict[str, Dict]:
+	"""
+	Lädt den Seiten-Cache mit Validatoren und Extraktionsergebnissen
+
+	Returns:
+		Dict[str, Dict]: Cache-Einträge nach Seiten-URL oder leeres Dictionary
+	"""
+	if not PAGE_CACHE_FILE.exists():
+		return {}
+
+	try:
+		with PAGE_CACHE_FILE.open("r", encoding="utf-8") as handle:
+			data = json.load(handle)
+	except Exception as exc:
+		print(f"Warnung: Seiten-Cache konnte nicht geladen werden: {exc}")
+		return {}
+
+	# Ein Cache aus einer älteren Extraktionsversion wird verworfen
+	if not isinstance(data, dict) or data.get("version") != PAGE_CACHE_VERSION:
+		return {}
+	pages = data.get("pages", {})
+	return pages if isinstance(pages, dict) else {}
+
+
+def savePageCache(pages: Dict[str, Dict]) -> None:
+	"""
+	Speichert den Seiten-Cache als JSON
+
+	Args:
+		pages (Dict[str, Dict]): Cache-Einträge nach Seiten-URL
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	PAGE_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+	with PAGE_CACHE_FILE.open("w", encoding="utf-8") as handle:
+		json.dump({"version": PAGE_CACHE_VERSION, "pages": pages}, handle, indent=2, ensure_ascii=False)
+
+
+class SqliteMetadataStore:
+	"""
+	Metadaten-Speicher in SQLite, der einzelne Dokumente ohne Neuschreiben der ganzen Datei aktualisiert
+	"""
+
+	def __init__(self, path: Optional[Path] = None):
+		"""
+		Öffnet die Datenbank und legt das Schema bei Bedarf an
+
+		Args:
+			path (Optional[Path]): Pfad zur SQLite-Datei, Standard ist METADATA_DB_FILE
+		"""
+		self.path = Path(path or METADATA_DB_FILE)
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self._connection = sqlite3.connect(str(self.path))
+		# WAL erlaubt Lesern (z.B. dem Server) den Zugriff, während der Scraper schreibt
+		self._connection.execute("PRAGMA journal_mode=WAL")
+		self._connection.execute("PRAGMA synchronous=NORMAL")
+		self._connection.executescript(
+			"""
+			CREATE TABLE IF NOT EXISTS documents (
+				entry_key TEXT PRIMARY KEY,
+				url TEXT NOT NULL DEFAULT '',
+				local_path TEXT NOT NULL DEFAULT '',
+				sha256 TEXT NOT NULL DEFAULT '',
+				data TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS documents_url ON documents (url);
+			CREATE INDEX IF NOT EXISTS documents_local_path ON documents (local_path);
+			CREATE TABLE IF NOT EXISTS meta (
+				key TEXT PRIMARY KEY,
+				value TEXT NOT NULL
+			);
+			"""
+		)
+		self._connection.commit()
+
+	def close(self) -> None:
+		"""
+		Schließt die Datenbankverbindung
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		self._connection.close()
+
+	def count(self) -> int:
+		"""
+		Zählt die gespeicherten Dokumente
+
+		Returns:
+			int: Anzahl der Einträge
+		"""
+		return int(self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0])
+
+	def upsert(self, entry: Dict) -> None:
+		"""
+		Schreibt einen einzelnen Dokument-Eintrag und committet sofort
+
+		Args:
+			entry (Dict): Eintrag im Format der JSON-Metadaten
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		self.upsertMany([entry])
+
+	def upsertMany(self, entries: Iterable[Dict]) -> None:
+		"""
+		Schreibt mehrere Dokument-Einträge in einer Transaktion
+
+		Args:
+			entries (Iterable[Dict]): Einträge im Format der JSON-Metadaten
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		rows = [
+			(
+				entry["entry_key"],
+				entry.get("url", ""),
+				entry.get("local_path", ""),
+				entry.get("sha256", ""),
+				json.dumps(entry, ensure_ascii=False),
+			)
+			for entry in entries
+			if entry.get("entry_key")
+		]
+		with self._connection:
+			self._connection.executemany(
+				"INSERT INTO documents (entry_key, url, local_path, sha256, data) VALUES (?, ?, ?, ?, ?) "
+				"ON CONFLICT(entry_key) DO UPDATE SET url = excluded.url, local_path = excluded.local_path, "
+				"sha256 = excluded.sha256, data = excluded.data",
+				rows,
+			)
+
+	def deleteKeys(self, entry_keys: Iterable[str]) -> int:
+		"""
+		Entfernt Einträge anhand ihrer Schlüssel
+
+		Args:
+			entry_keys (Iterable[str]): Zu löschende Eintrags-Schlüssel
+
+		Returns:
+			int: Anzahl gelöschter Einträge
+		"""
+		with self._connection:
+			cursor = self._connection.executemany(
+				"DELETE FROM documents WHERE entry_key = ?",
+				[(key,) for key in entry_keys],
+			)
+		return max(cursor.rowcount, 0)
+
+	def keys(self) -> Set[str]:
+		"""
+		Liefert alle gespeicherten Eintrags-Schlüssel
+
+		Returns:
+			Set[str]: Schlüssel aller Einträge
+		"""
+		return {row[0] for row in self._connection.execute("SELECT entry_key FROM documents")}
+
+	def get(self, entry_key: str) -> Optional[Dict]:
+		"""
+		Liest einen Eintrag über seinen Schlüssel
+
+		Args:
+			entry_key (str): Eintrags-Schlüssel
+
+		Returns:
+			Optional[Dict]: Eintrag oder None wenn unbekannt
+		"""
+		row = self._connection.execute("SELECT data FROM documents WHERE entry_key = ?", (entry_key,)).fetchone()
+		return json.loads(row[0]) if row else None
+
+	def byUrl(self, url: str) -> List[Dict]:
+		"""
+		Liest alle Einträge zu einer Dokument-URL über den Index
+
+		Args:
+			url (str): Dokument-URL
+
+		Returns:
+			List[Dict]: Passende Einträge sortiert nach Schlüssel
+		"""
+		rows = self._connection.execute(
+			"SELECT data FROM documents WHERE url = ? ORDER BY entry_key", (url,)
+		).fetchall()
+		return [json.loads(row[0]) for row in rows]
+
+	def byLocalPath(self, local_path: str) -> Optional[Dict]:
+		"""
+		Liest den Eintrag zu einem lokalen Pfad über den Index
+
+		Args:
+			local_path (str): Pfad relativ zum Datenverzeichnis
+
+		Returns:
+			Optional[Dict]: Eintrag oder None wenn unbekannt
+		"""
+		row = self._connection.execute(
+			"SELECT data FROM documents WHERE local_path = ? ORDER BY entry_key LIMIT 1", (local_path,)
+		).fetchone()
+		return json.loads(row[0]) if row else None
+
+	def setMeta(self, key: str, value: str) -> None:
+		"""
+		Speichert einen Kopfwert der Metadaten wie updated_at oder source
+
+		Args:
+			key (str): Name des Kopfwerts
+			value (str): Wert
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		with self._connection:
+			self._connection.execute(
+				"INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+				(key, value),
+			)
+
+	def exportMetadata(self) -> Dict:
+		"""
+		Baut die Metadaten im bisherigen JSON-Format aus der Datenbank auf
+
+		Returns:
+			Dict: Metadaten mit updated_at, source, document_count und documents
+		"""
+		meta = dict(self._connection.execute("SELECT key, value FROM meta").fetchall())
+		documents = [
+			json.loads(row[0])
+			for row in self._connection.execute("SELECT data FROM documents ORDER BY entry_key")
+		]
+		return {
+			"updated_at": meta.get("updated_at", ""),
+			"source": meta.get("source", BASE_URL),
+			"document_count": len(documents),
+			"documents": documents,
+		}
+
+	def importMetadata(self, metadata: Dict) -> int:
+		"""
+		Übernimmt bestehende JSON-Metadaten in die Datenbank
+
+		Args:
+			metadata (Dict): Metadaten im bisherigen JSON-Format
+
+		Returns:
+			int: Anzahl übernommener Einträge
+		"""
+		documents = [
+			item for item in metadata.get("documents", [])
+			if isinstance(item, dict) and item.get("entry_key")
+		]
+		self.upsertMany(documents)
+		for key in ("updated_at", "source"):
+			if metadata.get(key):
+				self.setMeta(key, str(metadata[key]))
+		return len(documents)
+
+
+class RunJournal:
+	"""
+	Append-only Journal der Ergebnisse pro Dokument, damit ein abgebrochener Lauf fortgesetzt werden kann
+	"""
+
+	def __init__(self, path: Optional[Path] = None, append: bool = False):
+		"""
+		Öffnet das Journal zum Schreiben
+
+		Args:
+			path (Optional[Path]): Pfad zur JSONL-Datei, Standard ist JOURNAL_FILE
+			append (bool): True setzt ein bestehendes Journal fort, False beginnt ein neues
+		"""
+		self.path = Path(path or JOURNAL_FILE)
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		self._handle = self.path.open("a" if append else "w", encoding="utf-8")
+
+	def record(self, entry_key: str, status: str, entry: Optional[Dict] = None, error: str = "") -> None:
+		"""
+		Hängt das Ergebnis eines Dokuments als eine Zeile an
+
+		Args:
+			entry_key (str): Schlüssel des Eintrags
+			status (str): "done" für fertige Einträge, "failed" für Fehler
+			entry (Optional[Dict]): Fertiger Metadaten-Eintrag
+			error (str): Fehlermeldung bei fehlgeschlagenen Einträgen
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		line: Dict[str, object] = {"entry_key": entry_key, "status": status, "at": nowIso()}
+		if entry is not None:
+			line["entry"] = entry
+		if error:
+			line["error"] = error
+		self._handle.write(json.dumps(line, ensure_ascii=False) + "\n")
+		# Nach jeder Zeile wird geleert, damit ein Abbruch höchstens die aktuelle Zeile verliert
+		self._handle.flush()
+
+	def close(self) -> None:
+		"""
+		Schließt das Journal
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		if not self._handle.closed:
+			self._handle.close()
+
+	def discard(self) -> None:
+		"""
+		Schließt und löscht das Journal, nachdem sein Inhalt in den Metadaten steht
+
+		Returns:
+			None: Diese Funktion gibt keinen Wert zurück
+		"""
+		self.close()
+		self.path.unlink(missing_ok=True)
+
+
+def loadRunJournal(path: Optional[Path] = None) -> Dict[str, Dict]:
+	"""
+	Liest die abgeschlossenen Einträge aus einem Journal
+
+	Args:
+		path (Optional[Path]): Pfad zur JSONL-Datei, Standard ist JOURNAL_FILE
+
+	Returns:
+		Dict[str, Dict]: Fertige Metadaten-Einträge nach Eintrags-Schlüssel
+	"""
+	journal_path = path or JOURNAL_FILE
+	if not journal_path.exists():
+		return {}
+
+	completed: Dict[str, Dict] = {}
+	with journal_path.open("r", encoding="utf-8") as handle:
+		for line in handle:
+			try:
+				record = json.loads(line)
+			except json.JSONDecodeError:
+				# Die letzte Zeile kann bei einem Abbruch unvollständig sein
+				continue
+			if not isinstance(record, dict) or not record.get("entry_key"):
+				continue
+			if record.get("status") == "done" and isinstance(record.get("entry"), dict):
+				completed[record["entry_key"]] = record["entry"]
+			else:
+				# Ein späterer Fehler macht einen früheren Erfolg ungültig
+				completed.pop(record["entry_key"], None)
+	return completed
+
+
+def matchesJournalEntry(doc: SourceDocument, entry: Dict) -> bool:
+	"""
+	Prüft, ob ein Journal-Eintrag noch zum aktuell gecrawlten Dokument passt
+
+	Args:
+		doc (SourceDocument): Dokumenteintrag aus dem Crawl
+		entry (Dict): Eintrag aus dem Journal
+
+	Returns:
+		bool: True wenn der Eintrag übernommen werden kann
+	"""
+	if not entry.get("local_path") or not (DATA_DIR / entry["local_path"]).is_file():
+		return False
+	return (
+		entry.get("url") == doc.url
+		and entry.get("title") == doc.title
+		and entry.get("description") == doc.description
+		and entry.get("category_top") == doc.category_top
+		and entry.get("category_sub") == doc.category_sub
+	)
+
+
+class ChangeFeed:
+	"""
+	Append-only Feed der Änderungen pro Lauf mit fortlaufender Sequenznummer
+
+	Die JSONL-Datei enthält einen Eintrag pro Lauf mit Änderungen. Die Indexdatei
+	speichert zu jeder Sequenznummer den Byte-Offset ihres Eintrags an Position
+	(seq - 1) * 8, "alles seit seq N" liest deshalb nur die neueren Einträge.
+	"""
+
+	def __init__(self, path: Optional[Path] = None, index_path: Optional[Path] = None):
+		"""
+		Legt die Pfade des Feeds fest, ohne Dateien zu öffnen
+
+		Args:
+			path (Optional[Path]): JSONL-Datei, Standard ist CHANGES_FILE
+			index_path (Optional[Path]): Offset-Index, Standard ist CHANGES_INDEX_FILE
+		"""
+		self.path = Path(path or CHANGES_FILE)
+		self.index_path = Path(index_path or CHANGES_INDEX_FILE)
+
+	def lastSeq(self) -> int:
+		"""
+		Liefert die höchste vollständig geschriebene Sequenznummer
+
+		Returns:
+			int: Sequenznummer, 0 bei leerem Feed
+		"""
+		try:
+			return self.index_path.stat().st_size // CHANGES_INDEX_RECORD.size
+		except FileNotFoundError:
+			return 0
+
+	def offset(self, seq: int) -> int:
+		"""
+		Liest den Byte-Offset des Eintrags mit der gegebenen Sequenznummer
+
+		Args:
+			seq (int): Sequenznummer ab 1
+
+		Returns:
+			int: Position des Eintrags in der JSONL-Datei
+		"""
+		with self.index_path.open("rb") as handle:
+			handle.seek((seq - 1) * CHANGES_INDEX_RECORD.size)
+			return CHANGES_INDEX_RECORD.unpack(handle.read(CHANGES_INDEX_RECORD.size))[0]
+
+	def append(self, changes: Dict[str, List[str]]) -> int:
+		"""
+		Hängt die Änderungen eines Laufs als neuen Eintrag an
+
+		Reste eines abgebrochenen Schreibvorgangs werden vorher abgeschnitten: erst die
+		JSONL-Zeile, dann der Indexeintrag, nur ein Eintrag im Index gilt als geschrieben.
+
+		Args:
+			changes (Dict[str, List[str]]): Entry-Keys je Änderungsart
+
+		Returns:
+			int: Sequenznummer des neuen Eintrags
+		"""
+		self.path.parent.mkdir(parents=True, exist_ok=True)
+		last_seq = self.lastSeq()
+		with self.index_path.open("ab") as index_handle:
+			index_handle.truncate(last_seq * CHANGES_INDEX_RECORD.size)
+
+		end = 0
+		if last_seq:
+			with self.path.open("rb") as handle:
+				handle.seek(self.offset(last_seq))
+				handle.readline()
+				end = handle.tell()
+
+		seq = last_seq + 1
+		record = {"seq": seq, "at": nowIso(), **changes}
+		with self.path.open("ab") as handle:
+			handle.truncate(end)
+			handle.write((json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8"))
+			handle.flush()
+			os.fsync(handle.fileno())
+		with self.index_path.open("ab") as index_handle:
+			index_handle.write(CHANGES_INDEX_RECORD.pack(end))
+		return seq
+
+	def since(self, seq: int) -> List[Dict]:
+		"""
+		Liefert alle Einträge mit einer Sequenznummer größer als seq
+
+		Args:
+			seq (int): Zuletzt bekannte Sequenznummer, 0 für den ganzen Feed
+
+		Returns:
+			List[Dict]: Einträge in aufsteigender Reihenfolge
+		"""
+		last_seq = self.lastSeq()
+		seq = max(seq, 0)
+		if seq >= last_seq:
+			return []
+
+		records: List[Dict] = []
+		with self.path.open("rb") as handle:
+			handle.seek(self.offset(seq + 1))
+			for line in handle:
+				if not line.endswith(b"\n"):
+					# Eine unvollständige letzte Zeile gehört zu einem abgebrochenen Lauf
+					break
+				record = json.loads(line)
+				if record.get("seq", 0) > last_seq:
+					break
+				records.append(record)
+		return records
+
+
+def computeChanges(old_by_key: Dict[str, Dict], documents: Iterable[Dict]) -> Dict[str, List[str]]:
+	"""
+	Vergleicht alte und neue Metadaten und ordnet jeden geänderten Eintrag einer Änderungsart zu
+
+	Args:
+		old_by_key (Dict[str, Dict]): Frühere Metadaten nach Entry-Key
+		documents (Iterable[Dict]): Neue Metadaten-Einträge
+
+	Returns:
+		Dict[str, List[str]]: Sortierte Entry-Keys unter added, updated, removed und metadata_changed
+	"""
+	changes: Dict[str, List[str]] = {"added": [], "updated": [], "removed": [], "metadata_changed": []}
+	current_keys: Set[str] = set()
+	for entry in documents:
+		key = entry.get("entry_key", "")
+		current_keys.add(key)
+		old = old_by_key.get(key)
+		if old is None:
+			changes["added"].append(key)
+		elif old.get("sha256") != entry.get("sha256"):
+			changes["updated"].append(key)
+		else:
+			# Fehlende und leere Felder gelten als gleich, ältere Einträge kennen nicht alle Felder
+			fields = (set(old) | set(entry)) - CHANGE_IGNORED_FIELDS
+			if any((old.get(name) or "") != (entry.get(name) or "") for name in fields):
+				changes["metadata_changed"].append(key)
+	changes["removed"] = [key for key in old_by_key if key not in current_keys]
+	return {kind: sorted(keys) for kind, keys in changes.items()}
+
+
 def sanitizePathSegment(value: str, fallback: str) -> str:
 	"""
 	Bereinigt einen Text, damit er sicher als Pfadsegment nutzbar ist
@@ -349,10 +1223,114 @@ def nearestSubHeading(link: Tag, pane: Tag) -> str:
 	return ""
 
 
+def isDescriptionNode(node: object) -> bool:
+	"""
+	Prüft, ob ein Element eine Upload-Beschreibung ist
+
+	Args:
+		node (object): Knoten aus dem HTML-Baum
+
+	Returns:
+		bool: True wenn das Element die Klasse ce-uploads-description trägt
+	"""
+	return isinstance(node, Tag) and "ce-uploads-description" in attributeToText(node.get("class"))
+
+
+def scanPaneLinks(pane: Tag) -> List[Tuple[Tag, str, str]]:
+	"""
+	Sammelt alle Links eines Tabs mit Zwischenüberschrift und Beschreibung in einem Durchlauf
+
+	Liefert dieselben Werte wie nearestSubHeading und extractDescription, durchläuft
+	den Tab aber nur einmal in Dokumentreihenfolge statt für jeden Link erneut.
+
+	Args:
+		pane (Tag): Tab-Container
+
+	Returns:
+		List[Tuple[Tag, str, str]]: Link, Zwischenüberschrift und Beschreibung in Dokumentreihenfolge
+	"""
+	current_heading = ""
+	first_description: Dict[int, Tag] = {}
+	next_description: Dict[int, Optional[Tag]] = {}
+	found: List[Tuple[Tag, str, Optional[Tag], Tag]] = []
+
+	# Jeder Stack-Eintrag kennt das nächste li (mit Vorfahrenkette) und den nächsten Textblock
+	stack: List[Tuple[Tag, Optional[Tuple], Tag]] = [(pane, None, pane)]
+	while stack:
+		node, li_chain, block = stack.pop()
+		name = node.name
+
+		if name in ("h2", "h3"):
+			heading = node.get_text(" ", strip=True)
+			if heading:
+				current_heading = heading
+
+		if li_chain is not None and isDescriptionNode(node):
+			# Die erste Beschreibung gilt für alle umgebenden li, die noch keine haben
+			chain = li_chain
+			while chain is not None and id(chain[0]) not in first_description:
+				first_description[id(chain[0])] = node
+				chain = chain[1]
+
+		if name == "a" and node.has_attr("href"):
+			found.append((node, current_heading, li_chain[0] if li_chain else None, block))
+
+		child_li_chain = (node, li_chain) if name == "li" else li_chain
+		child_block = node if name in ("div", "p", "li") else block
+
+		children: List[Tuple[Tag, Optional[Tuple], Tag]] = []
+		following_description: Optional[Tag] = None
+		# Rückwärts, damit die nächste Beschreibung unter den Geschwistern bekannt ist
+		for child in reversed(node.contents):
+			if not isinstance(child, Tag):
+				continue
+			if child.name == "a":
+				next_description[id(child)] = following_description
+			if isDescriptionNode(child):
+				following_description = child
+			children.append((child, child_li_chain, child_block))
+		stack.extend(children)
+
+	# Liegt der Tab selbst in einem li, greift der langsame Weg über extractDescription
+	outer_li = pane.find_parent("li") is not None
+	block_texts: Dict[int, str] = {}
+	links: List[Tuple[Tag, str, str]] = []
+
+	for link, heading, li, block in found:
+		if li is None and outer_li:
+			links.append((link, heading, extractDescription(link)))
+			continue
+
+		description = ""
+		li_description = first_description.get(id(li)) if li is not None else None
+		sibling_description = next_description.get(id(link))
+		if li_description is not None:
+			description = li_description.get_text(" ", strip=True)
+		elif sibling_description is not None:
+			description = sibling_description.get_text(" ", strip=True)
+		else:
+			# Der Text eines Blocks wird nur einmal erzeugt, auch wenn er viele Links enthält
+			if id(block) not in block_texts:
+				block_texts[id(block)] = block.get_text(" ", strip=True)
+			text = block_texts[id(block)]
+			link_text = link.get_text(" ", strip=True)
+			if link_text and link_text in text:
+				remainder = text.split(link_text, 1)[1].strip()
+				if 3 <= len(remainder) <= 500:
+					description = remainder
+
+		links.append((link, heading, description))
+
+	return links
+
+
 def isInternalDocumentsPage(url: str) -> bool:
 	"""
 	Prüft, ob eine URL auf die interne Dokumentenseite verweist
 
+	Host und Pfad stammen aus BASE_URL, damit auch eine lokale Kopie der Seite
+	(z.B. im Benchmark) ihre Unterseiten verfolgt.
+
 	Args:
 		url (str): Zu prüfende URL
 
@@ -360,25 +1338,88 @@ def isInternalDocumentsPage(url: str) -> bool:
 		bool: True wenn die URL zur internen Dokumentenseite gehört
 	"""
 	parsed = urlparse(url)
-	return (
-		parsed.netloc == "www.ravensburg.dhbw.de"
-		and parsed.path.rstrip("/") == "/service-einrichtungen/dokumente-downloads"
-	)
+	base = urlparse(BASE_URL)
+	return parsed.netloc == base.netloc and parsed.path.rstrip("/") == base.path.rstrip("/")
+
+
+class TabStrainer(SoupStrainer):
+	"""
+	SoupStrainer, der nur Tab-Navigation und Tab-Inhalte parsen lässt
+
+	Kopf, Fußzeile und Navigation der Seite werden so gar nicht erst aufgebaut. Mit ihnen
+	fehlen auch die Vorfahren der Tabs, ein umgebendes li für den Beschreibungs-Fallback in
+	scanPaneLinks gibt es dann nicht. Deshalb nur auf ausdrücklichen Wunsch verwendet.
+	"""
+
+	def __init__(self, html: str):
+		"""
+		Sucht die Tab-Ziele per regulärem Ausdruck, bevor das HTML geparst wird
+
+		Args:
+			html (str): HTML-Quelltext der Seite
+		"""
+		# bs4 vor 4.13 ruft die Namensfunktion direkt mit Name und Attributen auf
+		super().__init__(self.isTabElement)
+		self.tab_ids = {
+			(match.group(1) or match.group(2) or match.group(3) or "").strip()
+			for match in TAB_TARGET_PATTERN.finditer(html)
+		}
+
+	def isTabElement(self, name: object, attrs: Optional[Mapping] = None) -> bool:
+		"""
+		Prüft, ob ein Element die Tab-Liste oder ein Tab-Container ist
+
+		Args:
+			name (object): Tag-Name
+			attrs (Optional[Mapping]): Rohe Attribute des Tags
+
+		Returns:
+			bool: True für ul.nav.nav-tabs und div-Container eines Tabs
+		"""
+		if attrs is None:
+			return False
+		if name == "div":
+			return attributeToText(attrs.get("id")).strip() in self.tab_ids
+		if name == "ul":
+			classes = attributeToText(attrs.get("class")).split()
+			return "nav" in classes and "nav-tabs" in classes
+		return False
+
+	def allow_tag_creation(self, nsprefix: Optional[str], name: str, attrs: Optional[Mapping]) -> bool:
+		"""
+		Einstiegspunkt von bs4 ab 4.13 während des Parsens
 
+		Args:
+			nsprefix (Optional[str]): Namespace-Präfix des Tags
+			name (str): Tag-Name
+			attrs (Optional[Mapping]): Rohe Attribute des Tags
 
-def extractDocumentsFromHtml(base_url: str, html: str) -> Tuple[List[SourceDocument], Set[str], Set[str]]:
+		Returns:
+			bool: True wenn das Tag samt Inhalt übernommen wird
+		"""
+		return self.isTabElement(name, attrs or {})
+
+
+def extractDocumentsFromHtml(
+	base_url: str,
+	html: str,
+	parser: Optional[str] = None,
+	tabs_only: bool = False,
+) -> Tuple[List[SourceDocument], Set[str], Set[str]]:
 	"""
 	Extrahiert Dokumenteinträge und Folge-Links aus dem HTML einer Seite
 
 	Args:
 		base_url (str): Basis-URL zum Auflösen relativer Links
 		html (str): HTML-Quelltext der Seite
+		parser (Optional[str]): Parser-Backend, Standard ist HTML_PARSER
+		tabs_only (bool): Nur Tab-Navigation und Tabs parsen (TabStrainer), schneller aber ohne Vorfahren der Tabs
 
 	Returns:
 		Tuple[List[SourceDocument], Set[str], Set[str]]:
 			Gefundene Dokumente, erwartete Entry-Keys und zu crawelnde Folge-Links
 	"""
-	soup = BeautifulSoup(html, "html.parser")
+	soup = BeautifulSoup(html, parser or HTML_PARSER, parse_only=TabStrainer(html) if tabs_only else None)
 	tab_mapping = collectTabMapping(soup)
 
 	all_docs: Dict[str, SourceDocument] = {}
@@ -396,7 +1437,7 @@ def extractDocumentsFromHtml(base_url: str, html: str) -> Tuple[List[SourceDocum
 
 		top_category = tab_label.strip() or "Ohne Kategorie"
 
-		for link in pane.find_all("a", href=True):
+		for link, sub_category, description in scanPaneLinks(pane):
 			href = attributeToText(link.get("href", "")).strip()
 			if not href:
 				continue
@@ -421,12 +1462,10 @@ def extractDocumentsFromHtml(base_url: str, html: str) -> Tuple[List[SourceDocum
 				title = guessFilename(absolute_url, "Dokument")
 
 			# Die Überschrift oberhalb des Links wird als Unterkategorie verwendet
-			sub_category = nearestSubHeading(link, pane)
 			if sub_category.lower().startswith("amtliche bekanntmach"):
 				continue
 
 			# Beschreibung und Eintragsschlüssel werden aus den gesammelten Daten gebaut
-			description = extractDescription(link)
 			entry_key = makeEntryKey(absolute_url, title, top_category, sub_category)
 			expected_keys.add(entry_key)
 
@@ -442,47 +1481,134 @@ def extractDocumentsFromHtml(base_url: str, html: str) -> Tuple[List[SourceDocum
 	return sorted(all_docs.values(), key=lambda item: item.entry_key), expected_keys, follow_links
 
 
-def crawlAllDocuments(session: requests.Session, start_url: str) -> Tuple[List[SourceDocument], Set[str]]:
+def extractDocumentsCached(
+	page_url: str,
+	html: Optional[str],
+	headers: Dict[str, str],
+	page_cache: Dict[str, Dict],
+) -> Tuple[List[SourceDocument], Set[str], Set[str]]:
+	"""
+	Extrahiert Dokumente einer Seite oder übernimmt das Ergebnis aus dem Seiten-Cache
+
+	Args:
+		page_url (str): URL der Seite
+		html (Optional[str]): HTML-Quelltext oder None bei einer 304-Antwort
+		headers (Dict[str, str]): Metadaten der Antwort mit ETag und Last-Modified
+		page_cache (Dict[str, Dict]): Seiten-Cache, wird aktualisiert
+
+	Returns:
+		Tuple[List[SourceDocument], Set[str], Set[str]]:
+			Gefundene Dokumente, erwartete Entry-Keys und zu crawelnde Folge-Links
+	"""
+	cached = page_cache.get(page_url)
+	body_hash = hashlib.sha256(html.encode("utf-8")).hexdigest() if html is not None else ""
+
+	# Bei 304 oder identischem Inhalt wird das Parsen komplett übersprungen
+	if cached and (html is None or cached.get("body_sha256") == body_hash):
+		cached["etag"] = headers.get("etag") or cached.get("etag", "")
+		cached["last_modified"] = headers.get("last_modified") or cached.get("last_modified", "")
+		return (
+			[SourceDocument(**item) for item in cached.get("documents", [])],
+			set(cached.get("expected_keys", [])),
+			set(cached.get("follow_links", [])),
+		)
+
+	if html is None:
+		raise ValueError(f"304 ohne Cache-Eintrag für {page_url}")
+
+	page_docs, page_expected, page_follow = extractDocumentsFromHtml(page_url, html)
+	page_cache[page_url] = {
+		"etag": headers.get("etag", ""),
+		"last_modified": headers.get("last_modified", ""),
+		"body_sha256": body_hash,
+		"documents": [asdict(doc) for doc in page_docs],
+		"expected_keys": sorted(page_expected),
+		"follow_links": sorted(page_follow),
+	}
+	return page_docs, page_expected, page_follow
+
+
+def crawlAllDocuments(
+	session: requests.Session,
+	start_url: str,
+	max_workers: int = CRAWL_WORKERS,
+	page_cache: Optional[Dict[str, Dict]] = None,
+	metrics: Optional[run_metrics.RunMetrics] = None,
+) -> Tuple[List[SourceDocument], Set[str]]:
 	"""
 	Durchläuft die Dokumentenseiten rekursiv und sammelt alle Einträge
 
+	Seiten werden parallel geladen, aber in derselben Reihenfolge wie bei einer
+	seriellen Breitensuche ausgewertet, damit das Ergebnis identisch bleibt.
+	Mit Seiten-Cache werden Seiten bedingt geladen und unveränderte Seiten nicht neu geparst.
+
 	Args:
 		session (requests.Session): HTTP-Session für Seitenabrufe
 		start_url (str): Start-URL für den Crawl
+		max_workers (int): Maximale Anzahl parallel geladener Seiten
+		page_cache (Optional[Dict[str, Dict]]): Seiten-Cache, wird aktualisiert
+		metrics (Optional[run_metrics.RunMetrics]): Erfasst die Parse-Zeit als Phase "parse"
 
 	Returns:
 		Tuple[List[SourceDocument], Set[str]]: Alle gefundenen Dokumente und erwartete Entry-Keys
 	"""
-	queue: List[str] = [start_url]
-	visited: Set[str] = set()
+	frontier: Deque[str] = deque([start_url])
+	# Enthält besuchte und bereits eingereihte Seiten für O(1) Duplikatprüfung
+	seen: Set[str] = {start_url}
 	all_docs: Dict[str, SourceDocument] = {}
 	expected_keys: Set[str] = set()
+	limiter = HostConcurrencyLimiter()
+
+	def loadPage(page_url: str) -> Tuple[Optional[str], Dict[str, str]]:
+		with limiter.slot(page_url):
+			if page_cache is None:
+				return fetchPageHtml(session, page_url), {}
+			return fetchPageConditional(session, page_url, page_cache.get(page_url))
+
+	in_flight: Dict[int, Tuple[str, Future]] = {}
+	next_sequence = 0
+	merge_sequence = 0
+	# Ohne mindestens einen Worker würde nichts eingereiht und die Übernahme liefe ins Leere
+	workers = max(1, max_workers)
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		while frontier or in_flight:
+			while frontier and len(in_flight) < workers:
+				page_url = frontier.popleft()
+				in_flight[next_sequence] = (page_url, executor.submit(loadPage, page_url))
+				next_sequence += 1
+
+			# Ergebnisse werden in Einreihungsreihenfolge übernommen
+			page_url, future = in_flight.pop(merge_sequence)
+			merge_sequence += 1
 
-	while queue:
-		page_url = queue.pop(0)
-		if page_url in visited:
-			continue
-
-		# Bereits besuchte Seiten werden nicht erneut verarbeitet
-		visited.add(page_url)
-
-		try:
-			html = fetchPageHtml(session, page_url)
-		except Exception as exc:
-			print(f"Warnung: Seite konnte nicht geladen werden ({page_url}): {exc}")
-			continue
-
-		page_docs, page_expected, page_follow = extractDocumentsFromHtml(page_url, html)
-		for doc in page_docs:
-			all_docs[doc.entry_key] = doc
-		expected_keys.update(page_expected)
-
-		for next_url in sorted(page_follow):
-			if next_url not in visited and next_url not in queue:
-				queue.append(next_url)
+			try:
+				html, headers = future.result()
+			except Exception as exc:
+				print(f"Warnung: Seite konnte nicht geladen werden ({page_url}): {exc}")
+				continue
 
-		# Kleine Pause um Überlastung zu vermeiden
-		time.sleep(REQUEST_DELAY_SECONDS)
+			parse_started = time.perf_counter()
+			if page_cache is None:
+				page_docs, page_expected, page_follow = extractDocumentsFromHtml(page_url, html)
+			else:
+				page_docs, page_expected, page_follow = extractDocumentsCached(page_url, html, headers, page_cache)
+			if metrics is not None:
+				metrics.addPhase("parse", time.perf_counter() - parse_started)
+			for doc in page_docs:
+				all_docs[doc.entry_key] = doc
+			expected_keys.update(page_expected)
+
+			for next_url in sorted(page_follow):
+				if next_url not in seen:
+					seen.add(next_url)
+					frontier.append(next_url)
+
+	if page_cache is not None:
+		# Nicht mehr verlinkte Seiten werden aus dem Cache entfernt
+		for cached_url in list(page_cache):
+			if cached_url not in seen:
+				del page_cache[cached_url]
 
 	return sorted(all_docs.values(), key=lambda item: item.entry_key), expected_keys
 
@@ -504,6 +1630,54 @@ def fetchPageHtml(session: requests.Session, url: str) -> str:
 	return response.text
 
 
+def fetchPageConditional(
+	session: requests.Session,
+	url: str,
+	cached: Optional[Dict],
+) -> Tuple[Optional[str], Dict[str, str]]:
+	"""
+	Lädt eine Seite bedingt mit den Validatoren aus dem Seiten-Cache
+
+	Args:
+		session (requests.Session): HTTP-Session für den Abruf
+		url (str): URL der abzurufenden Seite
+		cached (Optional[Dict]): Cache-Eintrag der Seite oder None
+
+	Returns:
+		Tuple[Optional[str], Dict[str, str]]: HTML-Quelltext oder None bei 304 und Antwort-Metadaten
+	"""
+	request_headers: Dict[str, str] = {}
+	if cached:
+		if cached.get("etag"):
+			request_headers["If-None-Match"] = cached["etag"]
+		if cached.get("last_modified"):
+			request_headers["If-Modified-Since"] = cached["last_modified"]
+
+	response = session.get(url, timeout=REQUEST_TIMEOUT, headers=request_headers)
+	if response.status_code == 304 and cached:
+		return None, responseMetadata(response.headers)
+	response.raise_for_status()
+	return response.text, responseMetadata(response.headers)
+
+
+def responseMetadata(headers: Mapping[str, str]) -> Dict[str, str]:
+	"""
+	Liest die für den Änderungsabgleich relevanten Header einer Antwort
+
+	Args:
+		headers (Mapping[str, str]): Header der HTTP-Antwort
+
+	Returns:
+		Dict[str, str]: Content-Length, Last-Modified, ETag und Content-Type
+	"""
+	return {
+		"content_length": headers.get("Content-Length", ""),
+		"last_modified": headers.get("Last-Modified", ""),
+		"etag": headers.get("ETag", ""),
+		"content_type": headers.get("Content-Type", ""),
+	}
+
+
 def headMetadata(session: requests.Session, url: str) -> Dict[str, str]:
 	"""
 	Liest Datei-Metadaten einer URL über eine HEAD-Anfrage
@@ -519,13 +1693,7 @@ def headMetadata(session: requests.Session, url: str) -> Dict[str, str]:
 		# HEAD reicht aus, um Datei-Metadaten ohne Voll-Download abzurufen
 		response = session.head(url, timeout=HEAD_TIMEOUT, allow_redirects=True)
 		response.raise_for_status()
-		headers = response.headers
-		return {
-			"content_length": headers.get("Content-Length", ""),
-			"last_modified": headers.get("Last-Modified", ""),
-			"etag": headers.get("ETag", ""),
-			"content_type": headers.get("Content-Type", ""),
-		}
+		return responseMetadata(response.headers)
 	except Exception:
 		# Fallback auf leere Werte, wenn der Server HEAD nicht sauber beantwortet
 		return {
@@ -536,6 +1704,112 @@ def headMetadata(session: requests.Session, url: str) -> Dict[str, str]:
 		}
 
 
+def hasValidators(old: Optional[Dict]) -> bool:
+	"""
+	Prüft, ob ein alter Metadaten-Eintrag ETag oder Last-Modified enthält
+
+	Args:
+		old (Optional[Dict]): Alter Metadaten-Eintrag oder None
+
+	Returns:
+		bool: True wenn ein bedingter GET möglich ist
+	"""
+	if not old:
+		return False
+	return bool(old.get("etag") or old.get("last_modified"))
+
+
+def runWithHostLimit(
+	urls: List[str],
+	worker: Callable[[int], T],
+	max_workers: int = PROBE_WORKERS,
+	per_host: int = PER_HOST_CONCURRENCY,
+) -> List[T]:
+	"""
+	Führt eine Netzwerkaufgabe je URL parallel mit Host-Begrenzung aus
+
+	Args:
+		urls (List[str]): URLs der Aufgaben, bestimmen den begrenzten Host
+		worker (Callable[[int], T]): Aufgabe, bekommt den Index in urls
+		max_workers (int): Maximale Anzahl paralleler Worker
+		per_host (int): Maximale Anzahl paralleler Anfragen je Host
+
+	Returns:
+		List[T]: Ergebnisse in derselben Reihenfolge wie urls
+	"""
+	if not urls:
+		return []
+
+	limiter = HostConcurrencyLimiter(per_host)
+
+	def run(index: int) -> T:
+		with limiter.slot(urls[index]):
+			return worker(index)
+
+	with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+		return list(executor.map(run, range(len(urls))))
+
+
+def probeHeadMetadata(
+	session: requests.Session,
+	documents: Iterable[SourceDocument],
+	max_workers: int = PROBE_WORKERS,
+	per_host: int = PER_HOST_CONCURRENCY,
+) -> Dict[str, Dict[str, str]]:
+	"""
+	Fragt die HEAD-Metadaten aller Dokumente parallel ab
+
+	Args:
+		session (requests.Session): HTTP-Session für die Abrufe
+		documents (Iterable[SourceDocument]): Dokumente aus dem Crawl
+		max_workers (int): Maximale Anzahl paralleler Worker
+		per_host (int): Maximale Anzahl paralleler Anfragen je Host
+
+	Returns:
+		Dict[str, Dict[str, str]]: HEAD-Metadaten nach Dokument-URL
+	"""
+	# Dieselbe Datei kann in mehreren Tabs verlinkt sein und wird nur einmal geprüft
+	urls = sorted({doc.url for doc in documents})
+	heads = runWithHostLimit(
+		urls,
+		lambda index: headMetadata(session, urls[index]),
+		max_workers,
+		per_host,
+	)
+	return dict(zip(urls, heads))
+
+
+def revalidateDocuments(
+	session: requests.Session,
+	jobs: List[Tuple[SourceDocument, Dict, Path]],
+	max_workers: int = PROBE_WORKERS,
+	per_host: int = PER_HOST_CONCURRENCY,
+) -> Dict[str, DownloadResult]:
+	"""
+	Prüft Dokumente mit bekannten Validatoren parallel per bedingtem GET
+
+	Geänderte Dokumente werden dabei direkt heruntergeladen, unveränderte
+	kosten nur eine 304-Antwort ohne Body.
+
+	Args:
+		session (requests.Session): HTTP-Session für die Abrufe
+		jobs (List[Tuple[SourceDocument, Dict, Path]]): Dokument, alter Eintrag und lokaler Pfad
+		max_workers (int): Maximale Anzahl paralleler Worker
+		per_host (int): Maximale Anzahl paralleler Anfragen je Host
+
+	Returns:
+		Dict[str, DownloadResult]: Ergebnis je Entry-Key
+	"""
+	urls = [doc.url for doc, _, _ in jobs]
+
+	def revalidate(index: int) -> DownloadResult:
+		doc, old, local_path = jobs[index]
+		return downloadFile(session, doc.url, local_path, validators=old)
+
+	results = runWithHostLimit(urls, revalidate, max_workers, per_host)
+	return {doc.entry_key: result for (doc, _, _), result in zip(jobs, results)}
+
+
 def computeSha256(path: Path) -> str:
 	"""
 	Berechnet die SHA256-Prüfsumme einer lokalen Datei
@@ -592,42 +1866,326 @@ def buildLocalPath(doc: SourceDocument, used_paths: Set[str]) -> Path:
 	return candidate
 
 
-def downloadFile(session: requests.Session, url: str, destination: Path) -> Tuple[bool, str]:
+def partialPaths(destination: Path) -> Tuple[Path, Path]:
 	"""
-	Lädt eine Datei herunter und speichert sie lokal ab
+	Liefert die Pfade der Teildatei und ihres Zustands für einen Download
+
+	Beide liegen im Zielordner, damit das Umbenennen atomar bleibt.
+
+	Args:
+		destination (Path): Lokaler Zielpfad
+
+	Returns:
+		Tuple[Path, Path]: Pfad der Teildatei und Pfad der Zustandsdatei
+	"""
+	part = destination.with_name(f".{destination.name}.part")
+	return part, part.with_name(f"{part.name}.json")
+
+
+def removePartial(destination: Path) -> None:
+	"""
+	Entfernt Teildatei und Zustand eines abgebrochenen Downloads
+
+	Args:
+		destination (Path): Lokaler Zielpfad
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	for path in partialPaths(destination):
+		try:
+			path.unlink()
+		except FileNotFoundError:
+			pass
+
+
+def resumeValidator(url: str, destination: Path) -> Tuple[int, str]:
+	"""
+	Prüft, ob ein abgebrochener Download per Range fortgesetzt werden kann
+
+	Args:
+		url (str): Download-URL
+		destination (Path): Lokaler Zielpfad
+
+	Returns:
+		Tuple[int, str]: Bereits geladene Bytes und Validator für If-Range, sonst (0, "")
+	"""
+	part, state_file = partialPaths(destination)
+	if not part.exists() or not state_file.exists():
+		return 0, ""
+
+	try:
+		state = json.loads(state_file.read_text(encoding="utf-8"))
+	except Exception:
+		return 0, ""
+
+	if not isinstance(state, dict) or state.get("url") != url:
+		return 0, ""
+
+	# Schwache ETags sind für If-Range nicht erlaubt, dann bleibt nur Last-Modified
+	etag = str(state.get("etag", ""))
+	validator = etag if etag and not etag.startswith("W/") else str(state.get("last_modified", ""))
+	if not validator:
+		return 0, ""
+	return part.stat().st_size, validator
+
+
+def downloadFile(
+	session: requests.Session,
+	url: str,
+	destination: Path,
+	validators: Optional[Dict] = None,
+) -> DownloadResult:
+	"""
+	Lädt eine Datei herunter und speichert sie lokal ab
+
+	Mit Validatoren wird ein bedingter GET gesendet. Antwortet der Server mit
+	304, bleibt die lokale Datei unangetastet. Der Inhalt wird zuerst in eine
+	Teildatei geschrieben und erst nach vollständigem Empfang atomar an den
+	Zielpfad verschoben. Abgebrochene Downloads werden per Range fortgesetzt.
 
 	Args:
 		session (requests.Session): HTTP-Session für den Download
 		url (str): Download-URL
 		destination (Path): Lokaler Zielpfad
+		validators (Optional[Dict]): Alter Eintrag mit etag und last_modified
 
 	Returns:
-		Tuple[bool, str]: Erfolgsstatus und Fehlermeldung bei Fehler
+		DownloadResult: Erfolgsstatus, Fehlermeldung, 304-Flag, Antwort-Metadaten, SHA256 und Bytezahl
 	"""
 	destination.parent.mkdir(parents=True, exist_ok=True)
-
+	part, state_file = partialPaths(destination)
+
+	request_headers: Dict[str, str] = {}
+	if validators:
+		if validators.get("etag"):
+			request_headers["If-None-Match"] = validators["etag"]
+		if validators.get("last_modified"):
+			request_headers["If-Modified-Since"] = validators["last_modified"]
+
+	offset, resume_validator = resumeValidator(url, destination)
+	if offset > 0:
+		# If-Range sorgt dafür, dass bei geänderter Datei wieder der komplette Inhalt kommt
+		request_headers["Range"] = f"bytes={offset}-"
+		request_headers["If-Range"] = resume_validator
+
+	# Eine vorhandene Teildatei bleibt bei Verbindungsfehlern für den nächsten Versuch erhalten
+	resumable = offset > 0
 	try:
-		with session.get(url, timeout=REQUEST_TIMEOUT, stream=True) as response:
+		with session.get(url, timeout=REQUEST_TIMEOUT, stream=True, headers=request_headers) as response:
+			if response.status_code == 304:
+				# Nicht geändert, die alten Werte bleiben gültig soweit der Server keine neuen liefert
+				removePartial(destination)
+				headers = {
+					key: str((validators or {}).get(key, ""))
+					for key in ("content_length", "last_modified", "etag", "content_type")
+				}
+				for key, value in responseMetadata(response.headers).items():
+					if value and key != "content_length":
+						headers[key] = value
+				return DownloadResult(ok=True, not_modified=True, headers=headers)
+
+			if response.status_code == 416 and offset > 0:
+				# Die Teildatei passt nicht mehr zur Datei auf dem Server
+				removePartial(destination)
+				return downloadFile(session, url, destination, validators)
+
 			response.raise_for_status()
-			content_type = (response.headers.get("Content-Type") or "").lower()
+			headers = responseMetadata(response.headers)
+			content_type = headers["content_type"].lower()
 			# HTML-Antworten sind in diesem Kontext keine echten Dateien
 			if "text/html" in content_type:
-				return False, "übersprungen (Content-Type text/html)"
-
-			# Der Inhalt wird direkt in die Zieldatei gestreamt
-			with destination.open("wb") as handle:
+				return DownloadResult(ok=False, error="übersprungen (Content-Type text/html)")
+
+			digest = hashlib.sha256()
+			hash_seconds = 0.0
+			size = 0
+			expected_length = headers["content_length"]
+			resumed = response.status_code == 206 and offset > 0
+			if resumed:
+				content_range = response.headers.get("Content-Range", "")
+				match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", content_range)
+				if not match or int(match.group(1)) != offset:
+					removePartial(destination)
+					return DownloadResult(ok=False, error=f"ungültiger Content-Range ({content_range})")
+				if match.group(2).isdigit():
+					expected_length = match.group(2)
+				elif expected_length.isdigit():
+					expected_length = str(offset + int(expected_length))
+
+				# Die bereits geladenen Bytes fließen einmalig in den Hash ein
+				with part.open("rb") as handle:
+					for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+						hash_started = time.perf_counter()
+						digest.update(chunk)
+						hash_seconds += time.perf_counter() - hash_started
+				size = offset
+			else:
+				# Ohne Validator wäre ein späteres Fortsetzen nicht sicher
+				state_file.write_text(json.dumps({
+					"url": url,
+					"etag": headers["etag"],
+					"last_modified": headers["last_modified"],
+				}), encoding="utf-8")
+
+			headers["content_length"] = expected_length
+			resumable = bool(headers["etag"] or headers["last_modified"]) or resumed
+
+			# Der Inhalt wird in die Teildatei gestreamt und dabei gleich gehasht
+			with part.open("ab" if resumed else "wb") as handle:
 				for chunk in response.iter_content(chunk_size=64 * 1024):
 					if chunk:
 						handle.write(chunk)
+						hash_started = time.perf_counter()
+						digest.update(chunk)
+						hash_seconds += time.perf_counter() - hash_started
+						size += len(chunk)
+
+			# Content-Length bezieht sich bei komprimierter Übertragung nicht auf die entpackten Bytes
+			if expected_length.isdigit() and not response.headers.get("Content-Encoding"):
+				if int(expected_length) != size:
+					# Zu viele Bytes bedeuten eine unbrauchbare Teildatei, zu wenige lassen sich fortsetzen
+					if int(expected_length) < size or not resumable:
+						removePartial(destination)
+					return DownloadResult(
+						ok=False,
+						error=f"unvollständig ({size} von {expected_length} Bytes)",
+						headers=headers,
+					)
 	except Exception as exc:
-		return False, str(exc)
+		if not resumable:
+			removePartial(destination)
+		return DownloadResult(ok=False, error=str(exc))
 
-	return True, ""
+	# Erst die vollständige Datei ersetzt das Ziel, ein Abbruch hinterlässt nie eine halbe Datei
+	os.replace(part, destination)
+	removePartial(destination)
+	return DownloadResult(ok=True, headers=headers, sha256=digest.hexdigest(), size=size, hash_seconds=hash_seconds)
 
 
-def shouldRedownload(doc: SourceDocument, old: Optional[Dict], local_path: Path, head: Dict[str, str]) -> bool:
+def blobPath(sha256: str) -> Path:
 	"""
-	Entscheidet, ob ein Dokument erneut heruntergeladen werden muss
+	Liefert den Pfad einer Datei im inhaltsadressierten Blob-Speicher
+
+	Args:
+		sha256 (str): SHA256-Hash des Inhalts
+
+	Returns:
+		Path: Pfad des Blobs unterhalb von BLOBS_DIR
+	"""
+	return BLOBS_DIR / sha256[:2] / sha256
+
+
+def linkAtomically(source: Path, destination: Path) -> None:
+	"""
+	Ersetzt eine Datei atomar durch einen Hardlink, notfalls durch eine Kopie
+
+	Args:
+		source (Path): Vorhandene Datei
+		destination (Path): Zu ersetzender Zielpfad
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	destination.parent.mkdir(parents=True, exist_ok=True)
+	temporary = destination.with_name(f".{destination.name}.link")
+	try:
+		temporary.unlink()
+	except FileNotFoundError:
+		pass
+	try:
+		os.link(source, temporary)
+	except OSError:
+		# Dateisysteme ohne Hardlinks bekommen eine normale Kopie
+		shutil.copyfile(source, temporary)
+	os.replace(temporary, destination)
+
+
+def storeBlob(local_path: Path, sha256: str) -> bool:
+	"""
+	Legt eine Datei im Blob-Speicher ab und teilt identische Inhalte per Hardlink
+
+	Existiert der Blob schon, wird die lokale Datei durch einen Hardlink auf ihn
+	ersetzt, sonst wird die lokale Datei als neuer Blob verlinkt.
+
+	Args:
+		local_path (Path): Datei unterhalb von data/documents
+		sha256 (str): SHA256-Hash des Inhalts
+
+	Returns:
+		bool: True wenn die Datei im Blob-Speicher liegt
+	"""
+	if not sha256 or not local_path.is_file():
+		return False
+
+	blob = blobPath(sha256)
+	try:
+		if blob.exists():
+			if not os.path.samefile(blob, local_path):
+				linkAtomically(blob, local_path)
+		else:
+			linkAtomically(local_path, blob)
+	except OSError as exc:
+		print(f"Warnung: Blob konnte nicht abgelegt werden ({local_path}): {exc}")
+		return False
+	return True
+
+
+def materializeBlob(sha256: str, destination: Path) -> bool:
+	"""
+	Legt eine Datei aus dem Blob-Speicher am Zielpfad an, ohne sie herunterzuladen
+
+	Args:
+		sha256 (str): SHA256-Hash des Inhalts
+		destination (Path): Lokaler Zielpfad
+
+	Returns:
+		bool: True wenn der Blob vorhanden war und verlinkt wurde
+	"""
+	blob = blobPath(sha256) if sha256 else None
+	if blob is None or not blob.is_file():
+		return False
+
+	try:
+		if not (destination.exists() and os.path.samefile(blob, destination)):
+			linkAtomically(blob, destination)
+	except OSError as exc:
+		print(f"Warnung: Blob konnte nicht verlinkt werden ({destination}): {exc}")
+		return False
+	return True
+
+
+def pruneBlobStore(referenced: Set[str]) -> int:
+	"""
+	Entfernt Blobs, auf die kein Metadaten-Eintrag mehr verweist
+
+	Args:
+		referenced (Set[str]): SHA256-Hashes aller aktuellen Einträge
+
+	Returns:
+		int: Anzahl entfernter Blobs
+	"""
+	if not BLOBS_DIR.exists():
+		return 0
+
+	removed = 0
+	for shard in BLOBS_DIR.iterdir():
+		if not shard.is_dir():
+			continue
+		for blob in shard.iterdir():
+			if blob.name in referenced or blob.name.startswith("."):
+				continue
+			try:
+				blob.unlink()
+				removed += 1
+			except OSError as exc:
+				print(f"Warnung: Blob konnte nicht gelöscht werden ({blob}): {exc}")
+	return removed
+
+
+def redownloadReason(doc: SourceDocument, old: Optional[Dict], local_path: Path, head: Dict[str, str]) -> str:
+	"""
+	Nennt den Grund, aus dem ein Dokument erneut heruntergeladen werden muss
 
 	Args:
 		doc (SourceDocument): Aktueller Dokumenteintrag aus dem Crawl
@@ -636,35 +2194,75 @@ def shouldRedownload(doc: SourceDocument, old: Optional[Dict], local_path: Path,
 		head (Dict[str, str]): Aktuelle HEAD-Metadaten der URL
 
 	Returns:
-		bool: True wenn ein neuer Download notwendig ist
+		str: Grund als kurzer Schlüssel (z.B. "etag"), leer wenn kein Download nötig ist
 	"""
 	if old is None:
-		return True
+		return "new"
 	if not local_path.exists():
-		return True
+		return "missing_file"
 
 	# Metadaten- oder Inhaltsänderungen erzwingen einen neuen Download
-	if old.get("description", "") != doc.description:
-		return True
-	if old.get("title", "") != doc.title:
-		return True
-	if old.get("category_top", "") != doc.category_top:
-		return True
-	if old.get("category_sub", "") != doc.category_sub:
-		return True
+	for field in ("description", "title", "category_top", "category_sub"):
+		if old.get(field, "") != getattr(doc, field):
+			return field
 
 	old_length = str(old.get("content_length", ""))
 	old_modified = old.get("last_modified", "")
 	old_etag = old.get("etag", "")
 
 	if head.get("content_length", "") and head.get("content_length") != old_length:
-		return True
+		return "content_length"
 	if head.get("last_modified", "") and head.get("last_modified") != old_modified:
-		return True
+		return "last_modified"
 	if head.get("etag", "") and head.get("etag") != old_etag:
-		return True
+		return "etag"
 
-	return False
+	return ""
+
+
+def shouldRedownload(doc: SourceDocument, old: Optional[Dict], local_path: Path, head: Dict[str, str]) -> bool:
+	"""
+	Entscheidet, ob ein Dokument erneut heruntergeladen werden muss
+
+	Args:
+		doc (SourceDocument): Aktueller Dokumenteintrag aus dem Crawl
+		old (Optional[Dict]): Alter Metadaten-Eintrag oder None
+		local_path (Path): Lokaler Pfad zur bereits gespeicherten Datei
+		head (Dict[str, str]): Aktuelle HEAD-Metadaten der URL
+
+	Returns:
+		bool: True wenn ein neuer Download notwendig ist
+	"""
+	return bool(redownloadReason(doc, old, local_path, head))
+
+
+def buildDocumentEntry(doc: SourceDocument, relative_path: Path, headers: Dict[str, str]) -> Dict:
+	"""
+	Sammelt alle Metadaten für einen Eintrag in einem Dictionary
+
+	Args:
+		doc (SourceDocument): Dokumenteintrag aus dem Crawl
+		relative_path (Path): Lokaler Pfad relativ zum data-Ordner
+		headers (Dict[str, str]): Metadaten aus HEAD-, GET- oder 304-Antwort
+
+	Returns:
+		Dict: Metadaten-Eintrag ohne Download-Zeitpunkt und Hash
+	"""
+	return {
+		"entry_key": doc.entry_key,
+		"url": doc.url,
+		"title": doc.title,
+		"description": doc.description,
+		"category_top": doc.category_top,
+		"category_sub": doc.category_sub,
+		"filename": relative_path.name,
+		"local_path": str(relative_path),
+		"content_length": headers.get("content_length", ""),
+		"last_modified": headers.get("last_modified", ""),
+		"etag": headers.get("etag", ""),
+		"content_type": headers.get("content_type", ""),
+		"last_seen": nowIso(),
+	}
 
 
 def removeDeletedDocuments(
@@ -703,6 +2301,256 @@ def removeDeletedDocuments(
 	return removed
 
 
+def isTrackedFile(relative_path: str, tracked: Set[str]) -> bool:
+	"""
+	Prüft, ob eine Datei unter data/documents zu einem aktuellen Eintrag gehört
+
+	Teil-Downloads (.name.part und .name.part.json) sowie vorkomprimierte
+	Geschwister (.gz, .br) gehören zu ihrer Zieldatei.
+
+	Args:
+		relative_path (str): Pfad relativ zum data-Ordner
+		tracked (Set[str]): Lokale Pfade aller aktuellen Einträge
+
+	Returns:
+		bool: True wenn die Datei behalten werden muss
+	"""
+	if relative_path in tracked:
+		return True
+	directory, name = os.path.split(relative_path)
+	if name.startswith(".") and (name.endswith(".part") or name.endswith(".part.json")):
+		# Teil-Downloads bleiben für die Wiederaufnahme, solange ihr Ziel noch aktuell ist
+		target = name[1:].rsplit(".part", 1)[0]
+		return os.path.join(directory, target) in tracked
+	for suffix in precompress.VARIANT_SUFFIXES:
+		if name.endswith(suffix):
+			return relative_path[: -len(suffix)] in tracked
+	return False
+
+
+def sweepOrphans(tracked: Set[str], quarantine_dir: Optional[Path] = None) -> SweepResult:
+	"""
+	Entfernt nicht mehr referenzierte Dateien unter data/documents und leere Ordner
+
+	Erfasst auch Reste abgebrochener Läufe, umbenannter Kategorien oder manuell kopierte
+	Dateien, die removeDeletedDocuments über die alten Metadaten nicht findet.
+
+	Args:
+		tracked (Set[str]): Lokale Pfade aller aktuellen Einträge relativ zum data-Ordner
+		quarantine_dir (Optional[Path]): Zielordner zum Verschieben statt Löschen
+
+	Returns:
+		SweepResult: Anzahl entfernter Dateien und Ordner sowie freigegebene Bytes
+	"""
+	result = SweepResult()
+	if not DOCUMENTS_DIR.is_dir():
+		return result
+
+	def sweepDirectory(directory: str) -> bool:
+		# Liefert True, wenn der Ordner nach dem Aufräumen leer ist
+		empty = True
+		with os.scandir(directory) as entries:
+			children = list(entries)
+		for entry in children:
+			if entry.is_dir(follow_symlinks=False):
+				if sweepDirectory(entry.path):
+					try:
+						os.rmdir(entry.path)
+						result.directories += 1
+					except OSError:
+						empty = False
+				else:
+					empty = False
+				continue
+
+			relative_path = os.path.relpath(entry.path, DATA_DIR)
+			if isTrackedFile(relative_path, tracked):
+				empty = False
+				continue
+
+			try:
+				stat = entry.stat(follow_symlinks=False)
+				if quarantine_dir is not None:
+					target = quarantine_dir / relative_path
+					target.parent.mkdir(parents=True, exist_ok=True)
+					os.replace(entry.path, target)
+				else:
+					os.unlink(entry.path)
+					# Hardlinks in den Blob-Speicher geben beim Löschen keinen Platz frei
+					if stat.st_nlink <= 1:
+						result.bytes_reclaimed += stat.st_size
+				result.files += 1
+			except OSError as exc:
+				print(f"Warnung: Verwaiste Datei konnte nicht entfernt werden ({entry.path}): {exc}")
+				empty = False
+		return empty
+
+	sweepDirectory(str(DOCUMENTS_DIR))
+	return result
+
+
+def listDocumentFiles() -> List[str]:
+	"""
+	Listet alle sichtbaren Dateien unter data/documents wie walkFiles in server.js
+
+	Vom Precompressor erzeugte .gz/.br-Geschwister sind keine eigenen Dokumente. Welche das sind,
+	steht im Manifest, ein heruntergeladenes archiv.tar.gz neben archiv.tar bleibt sichtbar.
+
+	Returns:
+		List[str]: Pfade relativ zu data/documents mit "/" als Trenner, sortiert
+	"""
+	if not DOCUMENTS_DIR.is_dir():
+		return []
+
+	variants = precompress.Precompressor(PRECOMPRESS_MANIFEST_FILE, DATA_DIR).variantPaths()
+	found: List[str] = []
+	pending = [str(DOCUMENTS_DIR)]
+	while pending:
+		with os.scandir(pending.pop()) as entries:
+			for entry in entries:
+				# Versteckte Dateien sind unfertige Downloads und werden wie im Server übersprungen
+				if entry.name.startswith("."):
+					continue
+				if entry.is_dir(follow_symlinks=False):
+					pending.append(entry.path)
+				elif os.path.relpath(entry.path, DATA_DIR).replace(os.sep, "/") not in variants:
+					found.append(os.path.relpath(entry.path, DOCUMENTS_DIR).replace(os.sep, "/"))
+	return sorted(found)
+
+
+def buildCategoryTree(documents: List[Dict]) -> List[Dict]:
+	"""
+	Baut den Kategorienbaum mit Anzahl der Dokumente je Knoten
+
+	Args:
+		documents (List[Dict]): Datensätze mit Feld category ("Ebene1/Ebene2")
+
+	Returns:
+		List[Dict]: Knoten mit name, path, count, documents und children, nach Name sortiert
+	"""
+	root: Dict = {"children": {}}
+	for record in documents:
+		parts = [part.strip() for part in str(record.get("category") or "Allgemein").split("/") if part.strip()]
+		node = root
+		path_parts: List[str] = []
+		for part in parts:
+			path_parts.append(part)
+			child = node["children"].get(part)
+			if child is None:
+				child = {"name": part, "path": "/".join(path_parts), "count": 0, "documents": 0, "children": {}}
+				node["children"][part] = child
+			# count enthält alle Dokumente des Teilbaums, documents nur die direkten
+			child["count"] += 1
+			node = child
+		if node is not root:
+			node["documents"] += 1
+
+	def finish(node: Dict) -> List[Dict]:
+		return [
+			{**child, "children": finish(child)}
+			for _, child in sorted(node["children"].items(), key=lambda item: item[0].lower())
+		]
+
+	return finish(root)
+
+
+def buildDocumentsIndex(metadata: Dict) -> Dict:
+	"""
+	Verknüpft Metadaten und Dateien zu der Antwort, die /api/documents ausliefert
+
+	Die Datensätze entsprechen dem, was server.js bisher pro Anfrage aus Metadaten
+	und Verzeichnisbaum berechnet. Der Hash über den Inhalt dient als ETag.
+
+	Args:
+		metadata (Dict): Metadaten im Format von dokumente_metadata.json
+
+	Returns:
+		Dict: Index mit documents, total, metadata_total, categories und etag
+	"""
+	metadata_documents = [item for item in metadata.get("documents", []) if isinstance(item, dict)]
+	by_path = {
+		str(item.get("local_path", "")).replace("\\", "/").lstrip("/"): item
+		for item in metadata_documents
+	}
+
+	documents: List[Dict] = []
+	for relative_path in listDocumentFiles():
+		local_path = f"documents/{relative_path}"
+		entry = by_path.get(local_path, {})
+		category_from_path = relative_path.rpartition("/")[0]
+		filename = relative_path.rpartition("/")[2]
+		documents.append({
+			"category": entry.get("category") or category_from_path or "Allgemein",
+			"filename": entry.get("filename") or filename,
+			"title": entry.get("title") or filename,
+			"description": entry.get("description") or "",
+			"local_path": entry.get("local_path") or local_path,
+			"thumbnail": entry.get("thumbnail") or "",
+		})
+
+	payload = {
+		"documents": documents,
+		"total": len(documents),
+		"metadata_total": len(metadata_documents),
+		"categories": buildCategoryTree(documents),
+	}
+	# Der Hash hängt nur vom Inhalt ab, damit unveränderte Läufe dasselbe ETag liefern
+	digest = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+	return {
+		"version": DOCUMENTS_INDEX_VERSION,
+		"generated_at": nowIso(),
+		"etag": digest,
+		**payload,
+	}
+
+
+def saveDocumentsIndex(index: Dict) -> None:
+	"""
+	Schreibt den Dokumenten-Index atomar, damit der Server nie eine halbe Datei liest
+
+	Args:
+		index (Dict): Ergebnis von buildDocumentsIndex
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	DOCUMENTS_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+	temporary = DOCUMENTS_INDEX_FILE.with_name(f".{DOCUMENTS_INDEX_FILE.name}.tmp")
+	with temporary.open("w", encoding="utf-8") as handle:
+		json.dump(index, handle, ensure_ascii=False, separators=(",", ":"))
+	os.replace(temporary, DOCUMENTS_INDEX_FILE)
+
+
+def precompressOutputs(documents: List[Dict]) -> Dict[str, int]:
+	"""
+	Schreibt .gz/.br-Geschwister für Metadaten, Index und textartige Dokumente
+
+	Unveränderte Dateien werden anhand ihres sha256 erkannt und nicht erneut komprimiert,
+	bei Dokumenten kommt der Hash direkt aus den Metadaten.
+
+	Args:
+		documents (List[Dict]): Aktuelle Metadaten-Einträge
+
+	Returns:
+		Dict[str, int]: Statistik des Precompressors
+	"""
+	precompressor = precompress.Precompressor(PRECOMPRESS_MANIFEST_FILE, DATA_DIR)
+	for path in (METADATA_FILE, DOCUMENTS_INDEX_FILE):
+		precompressor.compress(path)
+
+	text_paths: List[Path] = []
+	for entry in documents:
+		local_path = str(entry.get("local_path", ""))
+		if Path(local_path).suffix.lower() not in PRECOMPRESS_EXTENSIONS:
+			continue
+		text_paths.append(DATA_DIR / local_path)
+		precompressor.compress(DATA_DIR / local_path, entry.get("sha256") or None)
+	# Varianten entfernter Dokumente verschwinden zusammen mit ihrem Manifest-Eintrag
+	precompressor.retain(text_paths, DOCUMENTS_DIR)
+	precompressor.save()
+	return precompressor.stats
+
+
 def verifyCoverage(expected_keys: Set[str], metadata_docs: Iterable[Dict]) -> Tuple[Set[str], Set[str]]:
 	"""
 	Vergleicht erwartete Keys mit den Keys in den finalen Metadaten
@@ -790,22 +2638,301 @@ def send_new_without_description_notification(items: List[Dict[str, str]]) -> bo
 	return send_telegram_message(message)
 
 
-def main() -> int:
+def timestampToIso(timestamp: float) -> str:
 	"""
-	Steuert den kompletten Scrape-, Download- und Metadaten-Workflow
+	Wandelt einen Unix-Zeitstempel in einen ISO-8601 String in UTC um
+
+	Args:
+		timestamp (float): Sekunden seit der Epoche
 
 	Returns:
-		int: 0 bei Erfolg, 1 bei Fehlern oder fehlender Coverage
+		str: Zeitpunkt im ISO-Format
 	"""
-	print("DHBW Dokumente-Scraper")
-	print(f"Startzeitpunkt: {nowIso()}")
+	return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
 
-	DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
-	session = buildSession()
 
-	# Vorhandene Metadaten werden geladen um Änderungen inkrementell zu erkennen
-	old_metadata = loadMetadata()
-	old_docs_list = old_metadata.get("documents", []) if isinstance(old_metadata, dict) else []
+def isoToTimestamp(value: str) -> float:
+	"""
+	Wandelt einen ISO-8601 String in einen Unix-Zeitstempel um
+
+	Args:
+		value (str): Zeitpunkt im ISO-Format
+
+	Returns:
+		float: Sekunden seit der Epoche, 0 bei leerem oder ungültigem Wert
+	"""
+	try:
+		return datetime.fromisoformat(value).timestamp()
+	except (TypeError, ValueError):
+		return 0.0
+
+
+def loadSchedule(path: Optional[Path] = None) -> Dict[str, Dict]:
+	"""
+	Lädt den Prüfplan des Daemons pro Top-Kategorie
+
+	Args:
+		path (Optional[Path]): Plan-Datei, Standard ist DAEMON_SCHEDULE_FILE
+
+	Returns:
+		Dict[str, Dict]: Zustand pro Kategorie, leer bei fehlender oder defekter Datei
+	"""
+	try:
+		with Path(path or DAEMON_SCHEDULE_FILE).open("r", encoding="utf-8") as handle:
+			data = json.load(handle)
+	except (OSError, ValueError):
+		return {}
+	categories = data.get("categories", {}) if isinstance(data, dict) else {}
+	return {name: state for name, state in categories.items() if isinstance(state, dict)}
+
+
+def deferredCategories(schedule: Dict[str, Dict], now: float) -> Set[str]:
+	"""
+	Bestimmt die Kategorien, deren nächste Prüfung noch nicht fällig ist
+
+	Args:
+		schedule (Dict[str, Dict]): Zustand pro Kategorie
+		now (float): Aktueller Zeitstempel
+
+	Returns:
+		Set[str]: Kategorien, deren bekannte Dokumente in diesem Durchlauf nicht revalidiert werden
+	"""
+	return {name for name, state in schedule.items() if isoToTimestamp(state.get("next_due_at", "")) > now}
+
+
+def updateSchedule(schedule: Dict[str, Dict], result: ScrapeResult, deferred: Set[str], now: float) -> None:
+	"""
+	Passt die Prüfabstände an das beobachtete Änderungsverhalten an
+
+	Ohne Änderung wächst der Abstand einer Kategorie um DAEMON_BACKOFF_FACTOR, bei einer
+	Änderung schrumpft er um DAEMON_SPEEDUP_FACTOR. Häufig geänderte Kategorien werden
+	dadurch oft, selten geänderte kaum noch revalidiert. Neue Dokumente in einer nicht
+	fälligen Kategorie zählen ebenfalls als Änderung.
+
+	Args:
+		schedule (Dict[str, Dict]): Zustand pro Kategorie, wird aktualisiert
+		result (ScrapeResult): Ergebnis des Durchlaufs
+		deferred (Set[str]): In diesem Durchlauf nicht geprüfte Kategorien
+		now (float): Zeitpunkt des Durchlaufs
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	for name in list(schedule):
+		if name not in result.categories:
+			# Verschwundene Kategorien werden nicht weiter eingeplant
+			del schedule[name]
+
+	for name in result.categories:
+		changed = name in result.changed_categories
+		if name in deferred and not changed:
+			continue
+		state = schedule.setdefault(name, {"interval_seconds": DAEMON_INITIAL_INTERVAL_SECONDS, "checks": 0, "changes": 0})
+		interval = float(state.get("interval_seconds", DAEMON_INITIAL_INTERVAL_SECONDS))
+		if changed:
+			interval *= DAEMON_SPEEDUP_FACTOR
+			state["changes"] = int(state.get("changes", 0)) + 1
+			state["last_changed_at"] = timestampToIso(now)
+		else:
+			interval *= DAEMON_BACKOFF_FACTOR
+		interval = min(max(interval, DAEMON_MIN_INTERVAL_SECONDS), DAEMON_MAX_INTERVAL_SECONDS)
+		state["interval_seconds"] = interval
+		state["checks"] = int(state.get("checks", 0)) + 1
+		state["last_checked_at"] = timestampToIso(now)
+		state["next_due_at"] = timestampToIso(now + interval)
+
+
+def nextRunAt(schedule: Dict[str, Dict], now: float) -> float:
+	"""
+	Bestimmt den Zeitpunkt des nächsten Durchlaufs
+
+	Args:
+		schedule (Dict[str, Dict]): Zustand pro Kategorie
+		now (float): Aktueller Zeitstempel
+
+	Returns:
+		float: Früheste Fälligkeit einer Kategorie, spätestens nach DAEMON_PAGE_INTERVAL_SECONDS
+	"""
+	due = [isoToTimestamp(state.get("next_due_at", "")) for state in schedule.values()]
+	return max(now, min([now + DAEMON_PAGE_INTERVAL_SECONDS, *due]))
+
+
+def saveSchedule(schedule: Dict[str, Dict], next_run: float, path: Optional[Path] = None) -> None:
+	"""
+	Schreibt Prüfplan und nächsten Durchlauf atomar, damit andere Prozesse den Plan einsehen können
+
+	Args:
+		schedule (Dict[str, Dict]): Zustand pro Kategorie
+		next_run (float): Zeitstempel des nächsten Durchlaufs
+		path (Optional[Path]): Plan-Datei, Standard ist DAEMON_SCHEDULE_FILE
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	target = Path(path or DAEMON_SCHEDULE_FILE)
+	target.parent.mkdir(parents=True, exist_ok=True)
+	due_next = sorted(
+		name for name, state in schedule.items()
+		if isoToTimestamp(state.get("next_due_at", "")) <= next_run
+	)
+	payload = {
+		"updated_at": nowIso(),
+		"next_run_at": timestampToIso(next_run),
+		"due_next_run": due_next,
+		"categories": {name: schedule[name] for name in sorted(schedule)},
+	}
+	temporary = target.with_name(f".{target.name}.tmp")
+	with temporary.open("w", encoding="utf-8") as handle:
+		json.dump(payload, handle, ensure_ascii=False, indent=2)
+	os.replace(temporary, target)
+
+
+def runDaemon(args: argparse.Namespace, session: requests.Session) -> int:
+	"""
+	Läuft dauerhaft und revalidiert die Dokumente nach einem adaptiven Plan
+
+	Session, Verbindungs-Pool und Seiten-Cache bleiben zwischen den Durchläufen im
+	Speicher. Jeder Durchlauf lädt die Seiten bedingt, prüft aber nur die Dokumente
+	der fälligen Kategorien. SIGTERM oder Strg+C beenden den Daemon nach dem laufenden Durchlauf.
+
+	Args:
+		args (argparse.Namespace): Optionen aus parseArguments
+		session (requests.Session): HTTP-Session für alle Durchläufe
+
+	Returns:
+		int: 0 nach regulärem Ende
+	"""
+	stop = threading.Event()
+	try:
+		signal.signal(signal.SIGTERM, lambda *_: stop.set())
+	except ValueError:
+		# Signale lassen sich nur im Hauptthread registrieren
+		pass
+
+	page_cache = loadPageCache()
+	schedule = loadSchedule()
+	cycles = 0
+	print(f"Daemon gestartet, Plan: {DAEMON_SCHEDULE_FILE}")
+	try:
+		while not stop.is_set():
+			started = time.time()
+			deferred = deferredCategories(schedule, started)
+			print(f"\nDurchlauf {cycles + 1}: {len(deferred)} Kategorien nicht fällig")
+			try:
+				result = runScrape(args, session, page_cache=page_cache, deferred_categories=deferred)
+				updateSchedule(schedule, result, deferred, started)
+				next_run = nextRunAt(schedule, time.time())
+			except Exception as exc:
+				print(f"Fehler im Durchlauf: {exc}")
+				next_run = time.time() + DAEMON_RETRY_SECONDS
+			# Ein fortgesetzter Lauf betrifft nur den ersten Durchlauf
+			args.resume = False
+			saveSchedule(schedule, next_run)
+			cycles += 1
+			if args.max_cycles and cycles >= args.max_cycles:
+				break
+			print(f"Nächster Durchlauf: {timestampToIso(next_run)}")
+			stop.wait(max(0.0, next_run - time.time()))
+	except KeyboardInterrupt:
+		pass
+	print("Daemon beendet")
+	return 0
+
+
+def parseArguments(argv: List[str]) -> argparse.Namespace:
+	"""
+	Liest die Kommandozeilen-Optionen des Scrapers
+
+	Args:
+		argv (List[str]): Argumente ohne Programmnamen
+
+	Returns:
+		argparse.Namespace: Ausgewertete Optionen
+	"""
+	parser = argparse.ArgumentParser(description="Scraper für die Dokumente der DHBW Ravensburg")
+	parser.add_argument(
+		"--metadata-db",
+		nargs="?",
+		const=METADATA_DB_FILE,
+		default=None,
+		type=Path,
+		help="Metadaten zusätzlich in einer SQLite-Datenbank pflegen (Standard: data/dokumente_metadata.sqlite)",
+	)
+	parser.add_argument(
+		"--http-cache",
+		nargs="?",
+		const=HTTP_CACHE_DIR,
+		default=None,
+		type=Path,
+		help="HTTP-Antworten auf der Festplatte cachen und revalidieren (Standard: data/http_cache)",
+	)
+	parser.add_argument(
+		"--quarantine",
+		nargs="?",
+		const=QUARANTINE_DIR,
+		default=None,
+		type=Path,
+		help="Verwaiste Dateien verschieben statt löschen (Standard: data/quarantine)",
+	)
+	parser.add_argument(
+		"--resume",
+		action="store_true",
+		help="Abgebrochenen Lauf fortsetzen und im Journal abgeschlossene Dokumente überspringen",
+	)
+	parser.add_argument(
+		"--plan",
+		nargs="?",
+		const=PLAN_FILE,
+		default=None,
+		type=Path,
+		help="Nur crawlen und per HEAD prüfen, was ein Lauf laden, aktualisieren oder entfernen würde (Standard: data/dokumente_plan.json)",
+	)
+	archive = parser.add_mutually_exclusive_group()
+	archive.add_argument(
+		"--record",
+		default=None,
+		type=Path,
+		metavar="ARCHIV",
+		help="Alle HTTP-Anfragen und Antworten in einem Archiv (ZIP) aufzeichnen",
+	)
+	archive.add_argument(
+		"--replay",
+		default=None,
+		type=Path,
+		metavar="ARCHIV",
+		help="HTTP-Antworten ohne Netzwerk aus einem mit --record erstellten Archiv liefern (--http-cache wird ignoriert)",
+	)
+	parser.add_argument(
+		"--metrics-textfile",
+		default=None,
+		type=Path,
+		help="Ziel der Prometheus-Datei für den node_exporter Textfile-Collector (Standard: data/dokumente_metrics.prom)",
+	)
+	parser.add_argument(
+		"--daemon",
+		action="store_true",
+		help="Dauerhaft laufen und Kategorien nach adaptivem Plan prüfen (Plan: data/dokumente_schedule.json)",
+	)
+	parser.add_argument(
+		"--max-cycles",
+		type=int,
+		default=0,
+		help="Im Daemon-Betrieb nach so vielen Durchläufen beenden (Standard: unbegrenzt)",
+	)
+	return parser.parse_args(argv)
+
+
+def indexOldEntries(metadata: Dict) -> Dict[str, Dict]:
+	"""
+	Ordnet die Einträge gespeicherter Metadaten ihrem Entry-Key zu
+
+	Args:
+		metadata (Dict): Geladene Metadaten mit documents-Liste
+
+	Returns:
+		Dict[str, Dict]: Alte Einträge nach Entry-Key
+	"""
+	old_docs_list = metadata.get("documents", []) if isinstance(metadata, dict) else []
 	old_by_key: Dict[str, Dict] = {}
 	for item in old_docs_list:
 		if not isinstance(item, dict):
@@ -821,23 +2948,282 @@ def main() -> int:
 			)
 		if entry_key:
 			old_by_key[entry_key] = item
+	return old_by_key
+
+
+def contentLengthOrNone(value: object) -> Optional[int]:
+	"""
+	Wandelt einen Content-Length-Wert in eine Zahl um
+
+	Args:
+		value (object): Wert aus Header oder Metadaten
+
+	Returns:
+		Optional[int]: Größe in Bytes oder None wenn unbekannt
+	"""
+	text = str(value or "").strip()
+	return int(text) if text.isdigit() else None
+
+
+def buildPlan(
+	source_documents: List[SourceDocument],
+	expected_keys: Set[str],
+	old_by_key: Dict[str, Dict],
+	heads_by_url: Dict[str, Dict[str, str]],
+) -> Dict:
+	"""
+	Ordnet jedes Dokument der Aktion zu, die ein vollständiger Lauf ausführen würde
+
+	Die geschätzten Bytes zählen jede URL nur einmal, wie der Lauf selbst. Inhalte, die
+	der Lauf aus dem Blob-Speicher wiederherstellen kann, sind enthalten, die Schätzung
+	ist also eine Obergrenze.
+
+	Args:
+		source_documents (List[SourceDocument]): Dokumente aus dem Crawl
+		expected_keys (Set[str]): Erwartete Entry-Keys aus dem Crawl
+		old_by_key (Dict[str, Dict]): Alte Einträge nach Entry-Key
+		heads_by_url (Dict[str, Dict[str, str]]): HEAD-Metadaten nach URL
+
+	Returns:
+		Dict: summary sowie download, update, remove und unchanged mit je einer Liste von Einträgen
+	"""
+	plan: Dict[str, List[Dict]] = {"download": [], "update": [], "remove": [], "unchanged": []}
+	used_paths: Set[str] = {
+		str(entry.get("local_path"))
+		for key, entry in old_by_key.items()
+		if key in expected_keys and entry.get("local_path")
+	}
+	transfer_sizes: Dict[str, Optional[int]] = {}
+	for doc in source_documents:
+		old = old_by_key.get(doc.entry_key)
+		relative_path = Path(old["local_path"]) if old and old.get("local_path") else buildLocalPath(doc, used_paths)
+		head = heads_by_url.get(doc.url, {})
+		reason = redownloadReason(doc, old, DATA_DIR / relative_path, head)
+		item = {
+			"entry_key": doc.entry_key,
+			"url": doc.url,
+			"title": doc.title,
+			"category_top": doc.category_top,
+			"category_sub": doc.category_sub,
+			"local_path": relative_path.as_posix(),
+		}
+		if not reason:
+			plan["unchanged"].append(item)
+			continue
+		# Ohne Content-Length im HEAD dient die zuletzt gespeicherte Größe als Schätzung
+		size = contentLengthOrNone(head.get("content_length")) or contentLengthOrNone((old or {}).get("content_length"))
+		item.update({"reason": reason, "content_length": size})
+		plan["download" if old is None else "update"].append(item)
+		transfer_sizes.setdefault(doc.url, size)
+
+	current_keys = {doc.entry_key for doc in source_documents}
+	for key, old in sorted(old_by_key.items()):
+		if key in current_keys:
+			continue
+		plan["remove"].append({
+			"entry_key": key,
+			"url": old.get("url", ""),
+			"title": old.get("title", ""),
+			"local_path": old.get("local_path", ""),
+			"content_length": contentLengthOrNone(old.get("content_length")),
+		})
+
+	summary: Dict[str, int] = {name: len(items) for name, items in plan.items()}
+	summary["transfers"] = len(transfer_sizes)
+	summary["estimated_bytes"] = sum(size for size in transfer_sizes.values() if size is not None)
+	summary["unknown_size"] = sum(1 for size in transfer_sizes.values() if size is None)
+	summary["removed_bytes"] = sum(item["content_length"] or 0 for item in plan["remove"])
+	return {"summary": summary, **plan}
+
+
+def runPlan(args: argparse.Namespace, session: requests.Session) -> int:
+	"""
+	Trockenlauf: crawlt und prüft Validatoren per HEAD, lädt aber keine Dokumente
 
+	Metadaten, Seiten-Cache und Dateien bleiben unverändert, geschrieben wird nur der Plan.
+
+	Args:
+		args (argparse.Namespace): Optionen aus parseArguments, args.plan ist die Zieldatei
+		session (requests.Session): HTTP-Session für Seitenabrufe und HEADs
+
+	Returns:
+		int: 0 bei Erfolg, 1 wenn die Seite keine Dokumente liefert
+	"""
+	started = time.perf_counter()
+	old_metadata = loadMetadata()
+	if args.metadata_db is not None and Path(args.metadata_db).is_file():
+		store = SqliteMetadataStore(args.metadata_db)
+		try:
+			if store.count() > 0:
+				old_metadata = store.exportMetadata()
+		finally:
+			store.close()
+	old_by_key = indexOldEntries(old_metadata)
 	print(f"Vorhandene Metadateneinträge: {len(old_by_key)}")
 	print(f"Lade Seite: {BASE_URL}")
 
-	source_documents, expected_keys = crawlAllDocuments(session, BASE_URL)
+	# Der Seiten-Cache spart Übertragung und Parsen, wird im Trockenlauf aber nicht gespeichert
+	source_documents, expected_keys = crawlAllDocuments(session, BASE_URL, page_cache=loadPageCache())
+	print(f"Gefundene Dokumente (ohne Bekanntmachungen): {len(source_documents)}")
+	if not source_documents:
+		print("Fehler: Keine Dokumente gefunden, Plan wird nicht geschrieben")
+		return 1
+
+	print(f"Prüfe Dokumente: {len({doc.url for doc in source_documents})} HEADs ...")
+	heads_by_url = probeHeadMetadata(session, source_documents)
+	plan = buildPlan(source_documents, expected_keys, old_by_key, heads_by_url)
+	summary = plan["summary"]
+
+	print("\nPlan:\n")
+	print(f"Herunterladen (neu): {summary['download']}")
+	print(f"Aktualisieren: {summary['update']}")
+	print(f"Entfernen: {summary['remove']}")
+	print(f"Unverändert: {summary['unchanged']}")
+	print(
+		f"Geschätzte Übertragung: {summary['estimated_bytes'] / (1024 * 1024):.1f} MiB "
+		f"für {summary['transfers']} URLs ({summary['unknown_size']} ohne Größenangabe)"
+	)
+	for action in ("download", "update", "remove"):
+		items = plan[action]
+		for item in items[:20]:
+			detail = f" ({item['reason']})" if item.get("reason") else ""
+			print(f"- {action}: {item['title'] or item['url']}{detail}")
+		if len(items) > 20:
+			print(f"... und {len(items) - 20} weitere ({action})")
+
+	payload = {
+		"generated_at": nowIso(),
+		"source": BASE_URL,
+		"duration_seconds": round(time.perf_counter() - started, 3),
+		**plan,
+	}
+	plan_path = Path(args.plan)
+	plan_path.parent.mkdir(parents=True, exist_ok=True)
+	plan_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+	print(f"\nPlan: {plan_path}")
+	return 0
+
+
+def runScrape(
+	args: argparse.Namespace,
+	session: requests.Session,
+	page_cache: Optional[Dict[str, Dict]] = None,
+	deferred_categories: Optional[Set[str]] = None,
+) -> ScrapeResult:
+	"""
+	Führt einen kompletten Scrape-, Download- und Metadaten-Durchlauf aus
+
+	Args:
+		args (argparse.Namespace): Optionen aus parseArguments
+		session (requests.Session): HTTP-Session für alle Anfragen
+		page_cache (Optional[Dict[str, Dict]]): Seiten-Cache im Speicher, sonst wird er von der Festplatte geladen
+		deferred_categories (Optional[Set[str]]): Top-Kategorien, deren bekannte Dokumente nicht revalidiert werden
+
+	Returns:
+		ScrapeResult: Exit-Code sowie gefundene und geänderte Top-Kategorien
+	"""
+	print(f"Startzeitpunkt: {nowIso()}")
+	DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
+	deferred_categories = deferred_categories or set()
+	# Die Session kann aus früheren Daemon-Durchläufen stammen, gemessen wird nur dieser Lauf
+	metrics = run_metrics.RunMetrics()
+	http_before = http_client.sessionStats(session)
+	_, host_errors_before = http_client.sessionObservations(session)
+
+	# Vorhandene Metadaten werden geladen um Änderungen inkrementell zu erkennen
+	old_metadata = loadMetadata()
+	store: Optional[SqliteMetadataStore] = None
+	if args.metadata_db is not None:
+		store = SqliteMetadataStore(args.metadata_db)
+		if store.count() == 0 and old_metadata:
+			# Beim ersten Lauf mit Datenbank wird die bestehende JSON-Datei übernommen
+			imported = store.importMetadata(old_metadata)
+			print(f"Metadaten in SQLite übernommen: {imported}")
+		old_metadata = store.exportMetadata()
+	old_by_key = indexOldEntries(old_metadata)
+
+	print(f"Vorhandene Metadateneinträge: {len(old_by_key)}")
+	print(f"Lade Seite: {BASE_URL}")
+	metrics.lap("load_metadata")
+
+	# Unveränderte Seiten werden aus dem Seiten-Cache übernommen statt neu geparst
+	if page_cache is None:
+		page_cache = loadPageCache()
+	source_documents, expected_keys = crawlAllDocuments(session, BASE_URL, page_cache=page_cache, metrics=metrics)
+	savePageCache(page_cache)
+	metrics.lap("crawl")
 
 	print(f"Gefundene Dokumente (ohne Bekanntmachungen): {len(source_documents)}")
 
+	# Das Journal hält jedes Ergebnis sofort fest, --resume übernimmt fertige Einträge daraus
+	resumed_by_key = loadRunJournal() if args.resume else {}
+	if resumed_by_key:
+		print(f"Journal gefunden: {len(resumed_by_key)} abgeschlossene Einträge")
+	journal = RunJournal(append=args.resume)
+
 	# Bereits bekannte Pfade werden reserviert, damit keine Kollisionen entstehen
 	used_paths: Set[str] = {
 		str(entry.get("local_path"))
 		for key, entry in old_by_key.items()
 		if key in expected_keys and entry.get("local_path")
 	}
+	used_paths.update(
+		str(entry["local_path"])
+		for key, entry in resumed_by_key.items()
+		if key in expected_keys and entry.get("local_path")
+	)
+
+	# Zuerst wird für jedes Dokument festgelegt, wie es auf Änderungen geprüft wird
+	planned: List[Tuple[SourceDocument, Optional[Dict], Path, str]] = []
+	resumed_docs: List[Dict] = []
+	for doc in source_documents:
+		journaled = resumed_by_key.get(doc.entry_key)
+		if journaled is not None and matchesJournalEntry(doc, journaled):
+			# Im abgebrochenen Lauf bereits fertige Dokumente werden weder geprüft noch geladen
+			resumed_docs.append(journaled)
+			continue
+
+		old = old_by_key.get(doc.entry_key)
+
+		if old and old.get("local_path"):
+			relative_path = Path(old["local_path"])
+		else:
+			# Neue Einträge bekommen einen stabilen, konfliktfreien Zielpfad
+			relative_path = buildLocalPath(doc, used_paths)
 
-	processed_docs: List[Dict] = []
+		local_path = DATA_DIR / relative_path
+		if shouldRedownload(doc, old, local_path, {}):
+			# Neue, lokal fehlende oder umbenannte Einträge brauchen ohnehin den vollen Download
+			mode = "download"
+		elif doc.category_top in deferred_categories:
+			# Im Daemon-Betrieb werden selten geänderte Kategorien erst bei Fälligkeit geprüft
+			mode = "deferred"
+		elif hasValidators(old):
+			# Mit gespeichertem ETag/Last-Modified ersetzt ein bedingter GET den HEAD
+			mode = "conditional"
+		else:
+			mode = "head"
+		planned.append((doc, old, relative_path, mode))
+
+	conditional_jobs = [
+		(doc, old, DATA_DIR / relative_path)
+		for doc, old, relative_path, mode in planned
+		if mode == "conditional" and old is not None
+	]
+	head_docs = [doc for doc, _, _, mode in planned if mode == "head"]
+
+	# Alle Prüf-Anfragen laufen gebündelt und parallel vor der Download-Schleife
+	print(f"Prüfe Dokumente: {len(conditional_jobs)} bedingte GETs, {len(head_docs)} HEADs ...")
+	metrics.lap("plan")
+	revalidated = revalidateDocuments(session, conditional_jobs)
+	heads_by_url = probeHeadMetadata(session, head_docs)
+	metrics.lap("revalidate")
+
+	if store is not None and resumed_docs:
+		store.upsertMany(resumed_docs)
+	processed_docs: List[Dict] = list(resumed_docs)
 	stats = {
+		"resumed": len(resumed_docs),
 		"new": 0,
 		"new_without_description": 0,
 		"updated": 0,
@@ -845,61 +3231,108 @@ def main() -> int:
 		"failed": 0,
 		"removed": 0,
 		"downloaded": 0,
+		"deferred": 0,
 	}
 	failed_urls: List[str] = []
 	new_docs_without_description: List[Dict[str, str]] = []
 
-	for index, doc in enumerate(source_documents, start=1):
-		old = old_by_key.get(doc.entry_key)
-
-		if old and old.get("local_path"):
-			relative_path = Path(old["local_path"])
-		else:
-			# Neue Einträge bekommen einen stabilen, konfliktfreien Zielpfad
-			relative_path = buildLocalPath(doc, used_paths)
+	def recordEntry(entry: Dict) -> None:
+		processed_docs.append(entry)
+		journal.record(entry["entry_key"], "done", entry)
+		if store is not None:
+			# Jeder Eintrag wird sofort gesichert, ein Abbruch verliert keine bereits geprüften Dokumente
+			store.upsert(entry)
+
+	# Alte Einträge, deren Inhalt im Blob-Speicher liegt, können für dieselbe URL wiederverwendet werden
+	blob_donors: Dict[str, Dict] = {
+		entry["url"]: entry
+		for entry in old_by_key.values()
+		if entry.get("url") and entry.get("sha256") and hasValidators(entry) and blobPath(entry["sha256"]).is_file()
+	}
+	# In diesem Lauf bereits geladene URLs werden nicht ein zweites Mal übertragen
+	fetched_this_run: Dict[str, DownloadResult] = {}
 
+	for index, (doc, old, relative_path, mode) in enumerate(planned, start=1):
 		local_path = DATA_DIR / relative_path
-		head = headMetadata(session, doc.url)
-
-		# HEAD-Daten dienen als billiger Änderungsindikator vor einem Voll-Download
-		redownload = shouldRedownload(doc, old, local_path, head)
 
-		# Alle Metadaten für den Eintrag werden in einem Dictionary gesammelt
-		document_entry = {
-			"entry_key": doc.entry_key,
-			"url": doc.url,
-			"title": doc.title,
-			"description": doc.description,
-			"category_top": doc.category_top,
-			"category_sub": doc.category_sub,
-			"filename": local_path.name,
-			"local_path": str(relative_path),
-			"content_length": head.get("content_length", ""),
-			"last_modified": head.get("last_modified", ""),
-			"etag": head.get("etag", ""),
-			"content_type": head.get("content_type", ""),
-			"last_seen": nowIso(),
-		}
+		result: Optional[DownloadResult] = None
+		if mode == "conditional":
+			result = revalidated[doc.entry_key]
+			redownload = not result.not_modified
+			head = result.headers
+		elif mode == "head":
+			head = heads_by_url.get(doc.url, {})
+			# HEAD-Daten dienen als billiger Änderungsindikator vor einem Voll-Download
+			redownload = shouldRedownload(doc, old, local_path, head)
+		elif mode == "deferred":
+			# Ohne Anfrage gelten die zuletzt gespeicherten Header weiter
+			head = {name: old.get(name, "") for name in ("content_length", "last_modified", "etag", "content_type")}
+			redownload = False
+		else:
+			head = {}
+			redownload = True
 
 		if not redownload:
 			# Unveränderte Einträge behalten Hash und Download-Zeitpunkt aus den alten Metadaten
+			document_entry = buildDocumentEntry(doc, relative_path, head)
 			document_entry["downloaded_at"] = old.get("downloaded_at", "") if old else ""
 			document_entry["sha256"] = old.get("sha256", "") if old else ""
-			processed_docs.append(document_entry)
+			# Bestehende Dateien wandern beim ersten Lauf mit Blob-Speicher dorthin
+			storeBlob(local_path, document_entry["sha256"])
+			recordEntry(document_entry)
+			if mode == "deferred":
+				stats["deferred"] += 1
+				continue
 			stats["unchanged"] += 1
-			print(f"[{index}/{len(source_documents)}] Unverändert: {doc.title}")
+			print(f"[{index}/{len(planned)}] Unverändert: {doc.title}")
 			continue
 
-		# Bei Änderungen wird die Datei neu geladen und lokal überschrieben
-		ok, error = downloadFile(session, doc.url, local_path)
-		if not ok:
+		transferred = True
+		downloaded_at = nowIso()
+		if result is None:
+			earlier = fetched_this_run.get(doc.url)
+			donor = blob_donors.get(doc.url)
+			if earlier is not None and materializeBlob(earlier.sha256, local_path):
+				# Dieselbe URL aus einem anderen Tab wurde in diesem Lauf schon geladen
+				result = earlier
+				transferred = False
+			else:
+				# Bei Änderungen wird die Datei neu geladen und lokal überschrieben
+				result = downloadFile(session, doc.url, local_path, validators=donor)
+				if result.not_modified and donor is not None and materializeBlob(donor["sha256"], local_path):
+					# Der Inhalt ist unverändert und liegt schon im Blob-Speicher
+					result = DownloadResult(ok=True, headers=result.headers, sha256=donor["sha256"])
+					downloaded_at = donor.get("downloaded_at", "") or downloaded_at
+					transferred = False
+				elif result.not_modified:
+					result = downloadFile(session, doc.url, local_path)
+
+		if not result.ok:
 			stats["failed"] += 1
-			failed_urls.append(f"{doc.url} -> {error}")
-			print(f"[{index}/{len(source_documents)}] FEHLER: {doc.title} ({error})")
+			failed_urls.append(f"{doc.url} -> {result.error}")
+			journal.record(doc.entry_key, "failed", error=result.error)
+			print(f"[{index}/{len(planned)}] FEHLER: {doc.title} ({result.error})")
+			if old is not None:
+				# Der bisherige Stand bleibt unverändert erhalten, sonst würde die Bereinigung
+				# Datei, Eintrag und Blob entfernen und der nächste Lauf das Dokument als neu laden.
+				# Ins Journal kommt er nicht als fertig, damit --resume das Dokument erneut versucht
+				processed_docs.append(old)
+				if store is not None:
+					store.upsert(old)
 			continue
 
-		document_entry["downloaded_at"] = nowIso()
-		document_entry["sha256"] = computeSha256(local_path)
+		# Die Metadaten stammen direkt aus der GET-Antwort, ein separater HEAD ist nicht nötig
+		document_entry = buildDocumentEntry(doc, relative_path, result.headers)
+		document_entry["downloaded_at"] = downloaded_at
+		# Der Hash entsteht schon beim Streamen, die Datei wird nicht erneut gelesen
+		document_entry["sha256"] = result.sha256
+		if transferred:
+			# Gleicher Inhalt unter mehreren Pfaden belegt dank Hardlinks nur einmal Platz
+			storeBlob(local_path, result.sha256)
+			fetched_this_run[doc.url] = result
+			# Bei bedingten GETs lief die Übertragung samt Hash schon in der Phase "revalidate"
+			metrics.add("download_bytes", result.size)
+			metrics.addPhase("hash", result.hash_seconds)
 
 		if old is None:
 			# Neue Dokumente werden separat gezählt und ggf. gemeldet
@@ -910,33 +3343,85 @@ def main() -> int:
 					"title": doc.title,
 					"local_path": str(relative_path),
 				})
-			print(f"[{index}/{len(source_documents)}] Neu: {doc.title}")
+			print(f"[{index}/{len(planned)}] Neu: {doc.title}")
 		else:
 			stats["updated"] += 1
-			print(f"[{index}/{len(source_documents)}] Aktualisiert: {doc.title}")
+			print(f"[{index}/{len(planned)}] Aktualisiert: {doc.title}")
 
-		stats["downloaded"] += 1
-		processed_docs.append(document_entry)
-		# Kurze Pause zwischen Downloads hält das Verhalten freundlich für den Server
-		time.sleep(REQUEST_DELAY_SECONDS)
+		if transferred:
+			stats["downloaded"] += 1
+		recordEntry(document_entry)
 
+	metrics.lap("download")
+	# Löschen, Sweep und Blob-Bereinigung richten sich nach denselben noch referenzierten Einträgen.
+	# Fehlgeschlagene bekannte Dokumente stehen mit ihrem alten Eintrag in processed_docs,
+	# die Zielpfade aller geplanten Dokumente schützen zusätzlich Teil-Downloads neuer Einträge
 	current_keys = {entry["entry_key"] for entry in processed_docs}
-	current_local_paths = {
-		entry.get("local_path", "")
+	referenced_paths = {
+		str(entry.get("local_path", ""))
 		for entry in processed_docs
 		if entry.get("local_path")
 	}
+	referenced_paths.update(relative_path.as_posix() for _, _, relative_path, _ in planned)
+	referenced_blobs = {entry["sha256"] for entry in processed_docs if entry.get("sha256")}
 	# Verwaiste lokale Dateien werden entfernt wenn der Eintrag nicht mehr existiert
-	stats["removed"] = removeDeletedDocuments(old_by_key, current_keys, current_local_paths)
+	stats["removed"] = removeDeletedDocuments(old_by_key, current_keys, referenced_paths)
+	sweep = SweepResult()
+	if source_documents:
+		sweep = sweepOrphans(referenced_paths, args.quarantine)
+		pruneBlobStore(referenced_blobs)
+	else:
+		# Ein leerer Crawl deutet auf einen Seitenfehler hin, dann wird nichts weggeräumt, auch keine Blobs
+		print("Warnung: Keine Dokumente gefunden, verwaiste Dateien und Blobs werden nicht bereinigt")
+	metrics.lap("cleanup")
+	# Vorschaubilder hängen nur am sha256 und werden vor dem Export in die Einträge geschrieben
+	try:
+		thumbnail_stats = thumbnails.updateThumbnails(processed_docs, DATA_DIR, THUMBNAILS_DIR)
+	except Exception as exc:
+		print(f"Warnung: Vorschaubilder konnten nicht erzeugt werden: {exc}")
+		thumbnail_stats = {}
+	metrics.lap("thumbnails")
 
 	# Die neue Metadaten-Datei spiegelt den kompletten aktuellen Stand wider
-	new_metadata = {
-		"updated_at": nowIso(),
-		"source": BASE_URL,
-		"document_count": len(processed_docs),
-		"documents": sorted(processed_docs, key=lambda item: item["entry_key"]),
-	}
+	if store is not None:
+		# In der Datenbank werden nur noch die nicht mehr vorhandenen Einträge gelöscht
+		store.deleteKeys(store.keys() - current_keys)
+		store.upsertMany(entry for entry in processed_docs if entry.get("thumbnail"))
+		store.setMeta("updated_at", nowIso())
+		store.setMeta("source", BASE_URL)
+		new_metadata = store.exportMetadata()
+		store.close()
+	else:
+		new_metadata = {
+			"updated_at": nowIso(),
+			"source": BASE_URL,
+			"document_count": len(processed_docs),
+			"documents": sorted(processed_docs, key=lambda item: item["entry_key"]),
+		}
+	# Der Änderungs-Feed erspart Abnehmern das Vergleichen der kompletten Metadaten
+	changes = computeChanges(old_by_key, new_metadata["documents"])
+	change_feed = ChangeFeed()
+	new_metadata["change_seq"] = change_feed.append(changes) if any(changes.values()) else change_feed.lastSeq()
+	# Die JSON-Datei bleibt als kompatibles Exportformat für server.js erhalten
 	saveMetadata(new_metadata)
+	# Der vorberechnete Index erspart dem Server das Durchlaufen des Dateibaums pro Anfrage
+	saveDocumentsIndex(buildDocumentsIndex(new_metadata))
+	# Vorkomprimierte Varianten ersparen dem Server das Komprimieren pro Anfrage
+	try:
+		compress_stats = precompressOutputs(new_metadata["documents"])
+	except Exception as exc:
+		print(f"Warnung: Vorkomprimierte Varianten konnten nicht geschrieben werden: {exc}")
+		compress_stats = {}
+	metrics.lap("save")
+	# Der Volltextindex extrahiert nur Dateien, deren sha256 er noch nicht kennt
+	try:
+		search_stats = search_index.SearchIndex(SEARCH_INDEX_DIR).update(new_metadata["documents"], DATA_DIR)
+	except Exception as exc:
+		print(f"Warnung: Suchindex konnte nicht aktualisiert werden: {exc}")
+		search_stats = {}
+	# Nach dem Schreiben der Metadaten ist das Journal vollständig darin aufgegangen
+	journal.discard()
+	metrics.lap("search_index")
 
 	# Coverage prüft ob Crawling und Metadaten dieselben Einträge sehen
 	missing, extra = verifyCoverage(expected_keys, processed_docs)
@@ -952,9 +3437,44 @@ def main() -> int:
 	print(f"Neu ohne Beschreibung: {stats['new_without_description']}")
 	print(f"Aktualisiert: {stats['updated']}")
 	print(f"Unverändert: {stats['unchanged']}")
+	if deferred_categories:
+		print(f"Nicht fällig, ohne Prüfung übernommen: {stats['deferred']}")
+	print(f"Aus Journal übernommen: {stats['resumed']}")
 	print(f"Heruntergeladen: {stats['downloaded']}")
 	print(f"Entfernt (lokal gelöscht): {stats['removed']}")
+	print(
+		f"Verwaiste Dateien {'verschoben' if args.quarantine else 'entfernt'}: {sweep.files} "
+		f"({sweep.bytes_reclaimed / (1024 * 1024):.1f} MiB freigegeben, {sweep.directories} leere Ordner)"
+	)
 	print(f"Fehlgeschlagen: {stats['failed']}")
+	print(
+		f"Änderungs-Feed: seq {new_metadata['change_seq']} "
+		f"({', '.join(f'{len(keys)} {kind}' for kind, keys in changes.items())})"
+	)
+	if thumbnail_stats:
+		print(
+			f"Vorschaubilder: {thumbnail_stats['generated']} erzeugt, {thumbnail_stats['reused']} wiederverwendet, "
+			f"{thumbnail_stats['failed']} fehlgeschlagen, {thumbnail_stats['removed']} entfernt"
+		)
+	if compress_stats:
+		print(
+			f"Vorkomprimiert: {compress_stats['compressed']} neu, {compress_stats['unchanged']} unverändert, "
+			f"{compress_stats['bytes_saved'] / 1024:.1f} KiB gespart"
+		)
+	if search_stats:
+		print(
+			f"Suchindex: {search_stats['indexed']} indexiert, {search_stats['removed']} entfernt, "
+			f"{search_stats['extracted']} Dateien extrahiert"
+		)
+	http_stats = {name: value - http_before.get(name, 0) for name, value in http_client.sessionStats(session).items()}
+	if http_stats:
+		print(
+			f"HTTP: {http_stats['requests']} Anfragen, "
+			f"{http_stats['connections_reused']} wiederverwendete Verbindungen, "
+			f"{http_stats['retries']} Wiederholungen, "
+			f"{http_stats['cache_hits']} Cache-Treffer, "
+			f"{http_stats['bytes_received'] / (1024 * 1024):.1f} MiB"
+		)
 	print(f"Coverage fehlend: {len(missing)}")
 	print(f"Coverage extra: {len(extra)}")
 	print("\nEinträge pro Top-Kategorie:")
@@ -989,11 +3509,65 @@ def main() -> int:
 	print(f"Dateien: {DOCUMENTS_DIR}")
 	print(f"Ende: {nowIso()}")
 
-	if stats["failed"] > 0 or missing:
-		return 1
+	# Latenzen und Fehler pro Host nur aus diesem Lauf, jede Anfrage liefert genau einen Messwert
+	latencies, host_errors = http_client.sessionObservations(session)
+	request_count = http_stats.get("requests", 0)
+	latencies = latencies[-request_count:] if request_count > 0 else []
+	host_errors = {host: count - host_errors_before.get(host, 0) for host, count in host_errors.items()}
+	summary = metrics.summary(
+		stats,
+		http_stats,
+		latencies,
+		{host: count for host, count in host_errors.items() if count > 0},
+		success=not (stats["failed"] > 0 or missing),
+	)
+	try:
+		run_metrics.exportMetrics(summary, METRICS_FILE, args.metrics_textfile or METRICS_TEXTFILE)
+		print(f"Metriken: {METRICS_FILE} ({summary['duration_seconds']:.1f} s)")
+	except OSError as exc:
+		print(f"Warnung: Metriken konnten nicht geschrieben werden: {exc}")
+
+	# Für den Daemon zählt jede Änderungsart als Änderung der Kategorie des Eintrags
+	category_by_key = {key: entry.get("category_top", "") for key, entry in old_by_key.items()}
+	category_by_key.update((entry["entry_key"], entry.get("category_top", "")) for entry in new_metadata["documents"])
+	return ScrapeResult(
+		exit_code=1 if stats["failed"] > 0 or missing else 0,
+		categories={doc.category_top for doc in source_documents},
+		changed_categories={category_by_key.get(key, "") for keys in changes.values() for key in keys},
+	)
 
-	return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+	"""
+	Steuert den kompletten Scrape-, Download- und Metadaten-Workflow
+
+	Args:
+		argv (Optional[List[str]]): Kommandozeilen-Argumente ohne Programmnamen
+
+	Returns:
+		int: 0 bei Erfolg, 1 bei Fehlern oder fehlender Coverage
+	"""
+	args = parseArguments(argv or [])
+
+	print("DHBW Dokumente-Scraper")
+	try:
+		session = buildSession(args.http_cache, record_path=args.record, replay_path=args.replay)
+	except ValueError as exc:
+		print(f"Fehler: {exc}")
+		return 1
+	try:
+		if args.plan is not None:
+			return runPlan(args, session)
+		if args.daemon:
+			return runDaemon(args, session)
+		return runScrape(args, session).exit_code
+	finally:
+		if args.record is not None or args.replay is not None:
+			# Erst beim Schließen schreibt die Aufzeichnung ihren Index
+			session.close()
+			if args.record is not None:
+				print(f"HTTP-Archiv: {args.record}")
 
 
 if __name__ == "__main__":
-	raise SystemExit(main())
\ No newline at end of file
+	raise SystemExit(main(sys.argv[1:]))
\ No newline at end of file
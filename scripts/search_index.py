@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Volltext-Suchindex über die heruntergeladenen Dokumente
+
+Extrahiert Text aus PDF (mit pypdf, falls installiert), Office-Open-XML- und
+OpenDocument-Dateien und legt einen invertierten Index auf der Festplatte an.
+Die Posting-Listen sind nach Hash des Suchbegriffs auf mehrere Shards verteilt,
+damit Aktualisierungen und Abfragen nur die betroffenen Shards lesen und schreiben.
+
+Extrahierte Begriffe werden pro sha256 gespeichert, unveränderte Dateien werden
+deshalb nie ein zweites Mal extrahiert, auch wenn sie umbenannt oder verschoben wurden.
+
+Aufruf zum Testen einer Suche:
+	python scripts/search_index.py "Praxisbericht Vorlage"
+"""
+
+from __future__ import annotations
+
+import html
+import json
+import math
+import os
+import re
+import sys
+import time
+import zipfile
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+	# pypdf ist optional, ohne das Paket werden PDFs nur über Titel und Beschreibung gefunden
+	from pypdf import PdfReader
+except ImportError:
+	PdfReader = None
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = (SCRIPT_DIR / ".." / "data").resolve()
+SEARCH_INDEX_DIR = DATA_DIR / "search_index"
+# Muss erhöht werden, wenn sich Tokenisierung oder Dateiformat ändern
+INDEX_VERSION = 1
+SHARD_COUNT = 32
+MAX_TEXT_CHARS = 2_000_000
+# Titel und Beschreibung wiegen schwerer als Treffer irgendwo im Dokumenttext
+TITLE_WEIGHT = 5
+DESCRIPTION_WEIGHT = 2
+BM25_K1 = 1.2
+BM25_B = 0.75
+MIN_TERM_LENGTH = 2
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+XML_TAG_PATTERN = re.compile(r"<[^>]+>")
+UMLAUT_MAP = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+OOXML_PARTS = {
+	".docx": ("word/document.xml",),
+	".docm": ("word/document.xml",),
+	".dotx": ("word/document.xml",),
+	".xlsx": ("xl/sharedStrings.xml",),
+	".xlsm": ("xl/sharedStrings.xml",),
+	".pptx": ("ppt/slides/",),
+	".pptm": ("ppt/slides/",),
+}
+OPENDOCUMENT_EXTENSIONS = {".odt", ".ods", ".odp", ".ott"}
+PLAIN_TEXT_EXTENSIONS = {".txt", ".csv"}
+
+
+def tokenize(text: str) -> List[str]:
+	"""
+	Zerlegt Text in normalisierte Suchbegriffe
+
+	Umlaute werden ausgeschrieben, damit "Prüfung" und "Pruefung" denselben Begriff ergeben.
+
+	Args:
+		text (str): Beliebiger Text
+
+	Returns:
+		List[str]: Begriffe in Kleinschreibung in Textreihenfolge
+	"""
+	normalized = text.casefold().translate(UMLAUT_MAP)
+	return [token for token in TOKEN_PATTERN.findall(normalized) if len(token) >= MIN_TERM_LENGTH]
+
+
+def xmlToText(data: bytes) -> str:
+	"""
+	Entfernt Tags aus einem XML-Dokument und liefert den enthaltenen Text
+
+	Args:
+		data (bytes): XML-Inhalt
+
+	Returns:
+		str: Text mit Leerzeichen an Stelle der Tags
+	"""
+	return html.unescape(XML_TAG_PATTERN.sub(" ", data.decode("utf-8", errors="ignore")))
+
+
+def extractText(path: Path) -> str:
+	"""
+	Extrahiert den Text einer Dokumentdatei anhand ihrer Endung
+
+	Args:
+		path (Path): Pfad zur Datei
+
+	Returns:
+		str: Extrahierter Text oder leerer Text bei nicht unterstützten oder defekten Dateien
+	"""
+	suffix = path.suffix.lower()
+	try:
+		if suffix == ".pdf":
+			if PdfReader is None:
+				return ""
+			reader = PdfReader(str(path))
+			parts: List[str] = []
+			length = 0
+			for page in reader.pages:
+				page_text = page.extract_text() or ""
+				parts.append(page_text)
+				length += len(page_text)
+				if length >= MAX_TEXT_CHARS:
+					break
+			return "\n".join(parts)[:MAX_TEXT_CHARS]
+
+		if suffix in OOXML_PARTS or suffix in OPENDOCUMENT_EXTENSIONS:
+			prefixes = OOXML_PARTS.get(suffix, ("content.xml",))
+			with zipfile.ZipFile(path) as archive:
+				names = sorted(
+					name for name in archive.namelist()
+					if any(name == prefix or (prefix.endswith("/") and name.startswith(prefix)) for prefix in prefixes)
+				)
+				return " ".join(xmlToText(archive.read(name)) for name in names)[:MAX_TEXT_CHARS]
+
+		if suffix in PLAIN_TEXT_EXTENSIONS:
+			with path.open("r", encoding="utf-8", errors="ignore") as handle:
+				return handle.read(MAX_TEXT_CHARS)
+	except Exception as exc:
+		print(f"Warnung: Text konnte nicht extrahiert werden ({path.name}): {exc}")
+	return ""
+
+
+def shardFor(term: str) -> int:
+	"""
+	Bestimmt den Shard eines Suchbegriffs
+
+	Args:
+		term (str): Normalisierter Suchbegriff
+
+	Returns:
+		int: Shard-Nummer zwischen 0 und SHARD_COUNT - 1
+	"""
+	return zlib.crc32(term.encode("utf-8")) % SHARD_COUNT
+
+
+def writeJsonAtomically(path: Path, data: object) -> None:
+	"""
+	Schreibt JSON über eine temporäre Datei, damit Leser nie eine halbe Datei sehen
+
+	Args:
+		path (Path): Zieldatei
+		data (object): JSON-serialisierbare Daten
+
+	Returns:
+		None: Diese Funktion gibt keinen Wert zurück
+	"""
+	path.parent.mkdir(parents=True, exist_ok=True)
+	temporary = path.with_name(f".{path.name}.tmp")
+	with temporary.open("w", encoding="utf-8") as handle:
+		json.dump(data, handle, ensure_ascii=False, separators=(",", ":"))
+	os.replace(temporary, path)
+
+
+class SearchIndex:
+	"""
+	Invertierter Index mit BM25-Ranking und nach Begriff geshardeten Posting-Listen
+
+	Layout im Index-Verzeichnis:
+		manifest.json            Version, Dokumente mit sha256, Titel, Beschreibung und Länge
+		content/<ab>/<sha>.json  Begriffshäufigkeiten des Dateiinhalts pro sha256
+		shards/<n>.json          Begriff -> {entry_key: gewichtete Häufigkeit}
+	"""
+
+	def __init__(self, directory: Optional[Path] = None):
+		"""
+		Öffnet einen Index, ohne ihn schon zu laden
+
+		Args:
+			directory (Optional[Path]): Index-Verzeichnis, Standard ist SEARCH_INDEX_DIR
+		"""
+		self.directory = Path(directory or SEARCH_INDEX_DIR)
+		self._manifest: Optional[Dict] = None
+		self._shards: Dict[int, Dict[str, Dict[str, int]]] = {}
+		self._rebuild = False
+
+	def manifest(self) -> Dict:
+		"""
+		Lädt das Manifest oder liefert ein leeres bei fehlender oder veralteter Version
+
+		Returns:
+			Dict: Manifest mit version und documents
+		"""
+		if self._manifest is None:
+			try:
+				with (self.directory / "manifest.json").open("r", encoding="utf-8") as handle:
+					data = json.load(handle)
+			except (OSError, ValueError):
+				data = {}
+			# Wird pypdf nachinstalliert, müssen bereits indexierte PDFs neu aufgenommen werden
+			pdf_text = PdfReader is not None
+			if not isinstance(data, dict) or data.get("version") != INDEX_VERSION or data.get("pdf_text") != pdf_text:
+				data = {"version": INDEX_VERSION, "pdf_text": pdf_text, "documents": {}}
+				# Alte Shards werden verworfen und beim nächsten update() alle neu geschrieben
+				self._shards = {number: {} for number in range(SHARD_COUNT)}
+				self._rebuild = True
+			self._manifest = data
+		return self._manifest
+
+	def shard(self, number: int) -> Dict[str, Dict[str, int]]:
+		"""
+		Lädt einen Shard mit Posting-Listen
+
+		Args:
+			number (int): Shard-Nummer
+
+		Returns:
+			Dict[str, Dict[str, int]]: Posting-Listen nach Begriff
+		"""
+		if number not in self._shards:
+			try:
+				with (self.directory / "shards" / f"{number}.json").open("r", encoding="utf-8") as handle:
+					self._shards[number] = json.load(handle)
+			except (OSError, ValueError):
+				self._shards[number] = {}
+		return self._shards[number]
+
+	def contentPath(self, sha256: str) -> Path:
+		"""
+		Liefert den Pfad der gespeicherten Begriffshäufigkeiten eines Dateiinhalts
+
+		Args:
+			sha256 (str): Hash des Dateiinhalts
+
+		Returns:
+			Path: Pfad der JSON-Datei
+		"""
+		return self.directory / "content" / sha256[:2] / f"{sha256}.json"
+
+	def contentTerms(self, sha256: str, path: Optional[Path]) -> Tuple[Dict[str, int], bool]:
+		"""
+		Liefert die Begriffe eines Dateiinhalts, extrahiert sie nur beim ersten Mal
+
+		Args:
+			sha256 (str): Hash des Dateiinhalts
+			path (Optional[Path]): Datei zum Extrahieren, falls noch nichts gespeichert ist
+
+		Returns:
+			Tuple[Dict[str, int], bool]: Begriffshäufigkeiten und ob neu extrahiert wurde
+		"""
+		if not sha256:
+			return {}, False
+		cached = self.contentPath(sha256)
+		try:
+			with cached.open("r", encoding="utf-8") as handle:
+				return json.load(handle), False
+		except (OSError, ValueError):
+			pass
+		if path is None or not path.is_file():
+			return {}, False
+		if path.suffix.lower() == ".pdf" and PdfReader is None:
+			# Ohne pypdf wird nichts gespeichert, damit die PDFs später nachextrahiert werden
+			return {}, False
+		terms = dict(Counter(tokenize(extractText(path))))
+		writeJsonAtomically(cached, terms)
+		return terms, True
+
+	def documentTerms(self, record: Dict, path: Optional[Path] = None) -> Tuple[Dict[str, int], bool]:
+		"""
+		Kombiniert Titel, Beschreibung und Dateiinhalt zu gewichteten Begriffshäufigkeiten
+
+		Args:
+			record (Dict): Dokument mit sha256, title und description
+			path (Optional[Path]): Datei für eine eventuell nötige Extraktion
+
+		Returns:
+			Tuple[Dict[str, int], bool]: Gewichtete Häufigkeiten und ob neu extrahiert wurde
+		"""
+		terms, extracted = self.contentTerms(record.get("sha256", ""), path)
+		combined = Counter(terms)
+		for token in tokenize(record.get("title", "")):
+			combined[token] += TITLE_WEIGHT
+		for token in tokenize(record.get("description", "")):
+			combined[token] += DESCRIPTION_WEIGHT
+		return dict(combined), extracted
+
+	def update(self, entries: Iterable[Dict], data_dir: Optional[Path] = None) -> Dict[str, int]:
+		"""
+		Bringt den Index auf den Stand der übergebenen Metadaten-Einträge
+
+		Nur Einträge mit geändertem sha256, Titel oder Beschreibung werden neu
+		indexiert, und nur die Shards ihrer alten und neuen Begriffe werden geschrieben.
+
+		Args:
+			entries (Iterable[Dict]): Metadaten-Einträge mit entry_key, sha256, local_path, title, description
+			data_dir (Optional[Path]): Basis für local_path, Standard ist DATA_DIR
+
+		Returns:
+			Dict[str, int]: Anzahl indexierter, entfernter, extrahierter Einträge und geschriebener Shards
+		"""
+		base = Path(data_dir or DATA_DIR)
+		manifest = self.manifest()
+		documents: Dict[str, Dict] = manifest["documents"]
+		current = {entry["entry_key"]: entry for entry in entries if entry.get("entry_key")}
+		stats = {"indexed": 0, "removed": 0, "extracted": 0, "shards_written": 0}
+
+		changes: Dict[str, Tuple[Dict[str, int], Dict[str, int]]] = {}
+		for entry_key, entry in current.items():
+			record = {
+				"sha256": entry.get("sha256", ""),
+				"title": entry.get("title", ""),
+				"description": entry.get("description", ""),
+			}
+			old = documents.get(entry_key)
+			if old is not None and all(old.get(name) == value for name, value in record.items()):
+				continue
+			old_terms = self.documentTerms(old)[0] if old is not None else {}
+			local_path = base / entry["local_path"] if entry.get("local_path") else None
+			new_terms, extracted = self.documentTerms(record, local_path)
+			stats["extracted"] += int(extracted)
+			changes[entry_key] = (old_terms, new_terms)
+			documents[entry_key] = {**record, "length": sum(new_terms.values())}
+			stats["indexed"] += 1
+
+		for entry_key in list(documents):
+			if entry_key not in current:
+				changes[entry_key] = (self.documentTerms(documents.pop(entry_key))[0], {})
+				stats["removed"] += 1
+
+		touched: Set[int] = set(range(SHARD_COUNT)) if self._rebuild else set()
+		for entry_key, (old_terms, new_terms) in changes.items():
+			for term in old_terms:
+				postings = self.shard(shardFor(term)).get(term)
+				if postings is not None:
+					postings.pop(entry_key, None)
+					if not postings:
+						del self.shard(shardFor(term))[term]
+				touched.add(shardFor(term))
+			for term, frequency in new_terms.items():
+				self.shard(shardFor(term)).setdefault(term, {})[entry_key] = frequency
+				touched.add(shardFor(term))
+
+		for number in sorted(touched):
+			writeJsonAtomically(self.directory / "shards" / f"{number}.json", self._shards[number])
+		stats["shards_written"] = len(touched)
+		self._rebuild = False
+		if changes or touched or not (self.directory / "manifest.json").exists():
+			writeJsonAtomically(self.directory / "manifest.json", manifest)
+		self.pruneContent({record.get("sha256", "") for record in documents.values()})
+		return stats
+
+	def pruneContent(self, referenced: Set[str]) -> int:
+		"""
+		Löscht gespeicherte Begriffe von Inhalten, die kein Dokument mehr nutzt
+
+		Args:
+			referenced (Set[str]): Noch verwendete sha256-Werte
+
+		Returns:
+			int: Anzahl gelöschter Dateien
+		"""
+		content_dir = self.directory / "content"
+		if not content_dir.is_dir():
+			return 0
+		removed = 0
+		for path in content_dir.glob("*/*.json"):
+			if path.stem not in referenced:
+				path.unlink(missing_ok=True)
+				removed += 1
+		return removed
+
+	def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+		"""
+		Sucht Dokumente, die alle Begriffe der Anfrage enthalten, sortiert nach BM25
+
+		Args:
+			query (str): Suchanfrage, z.B. "Praxisbericht Vorlage"
+			limit (int): Maximale Anzahl Treffer
+
+		Returns:
+			List[Tuple[str, float]]: entry_key und Score, bester Treffer zuerst
+		"""
+		terms = list(dict.fromkeys(tokenize(query)))
+		documents = self.manifest()["documents"]
+		if not terms or not documents:
+			return []
+
+		average_length = sum(record.get("length", 0) for record in documents.values()) / len(documents) or 1.0
+		scores: Dict[str, float] = {}
+		matched: Optional[Set[str]] = None
+		for term in terms:
+			postings = self.shard(shardFor(term)).get(term, {})
+			# Alle Begriffe müssen vorkommen, sonst liefert eine Suche mit mehreren Wörtern zu viel
+			matched = set(postings) if matched is None else matched & set(postings)
+			if not matched:
+				return []
+			idf = math.log(1 + (len(documents) - len(postings) + 0.5) / (len(postings) + 0.5))
+			for entry_key, frequency in postings.items():
+				length = documents.get(entry_key, {}).get("length", 0)
+				norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+				scores[entry_key] = scores.get(entry_key, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+		ranked = sorted(((key, scores[key]) for key in matched or ()), key=lambda item: (-item[1], item[0]))
+		return ranked[:limit]
+
+
+def main() -> int:
+	"""
+	Führt eine Suche über den vorhandenen Index aus und gibt die Treffer aus
+
+	Returns:
+		int: 0 bei Erfolg, 1 ohne Suchbegriff
+	"""
+	if len(sys.argv) < 2:
+		print(f"Verwendung: {sys.argv[0]} 'Suchbegriffe'")
+		return 1
+
+	index = SearchIndex()
+	started = time.perf_counter()
+	results = index.search(" ".join(sys.argv[1:]))
+	elapsed = (time.perf_counter() - started) * 1000
+	documents = index.manifest()["documents"]
+	for entry_key, score in results:
+		print(f"{score:6.2f}  {documents[entry_key].get('title', '')}  ({entry_key})")
+	print(f"{len(results)} Treffer in {elapsed:.1f} ms")
+	return 0
+
+
+if __name__ == "__main__":
+	raise SystemExit(main())
@@ -18,6 +18,11 @@ import sys
 import os
 from datetime import datetime
 
+if __package__:
+    from . import http_client
+else:
+    import http_client
+
 class TelegramMessenger:
     def __init__(self, config_file="config_msgr.json"):
         """
@@ -29,6 +34,8 @@ class TelegramMessenger:
         self.config_file = config_file
         self.bot_token = None
         self.chat_id = None
+        # Die geteilte Session hält die Verbindung zur Telegram-API zwischen Aufrufen offen
+        self.session = http_client.sharedSession()
         # Die Konfiguration wird direkt beim Start geladen
         self.loadConfig()
     
@@ -84,7 +91,7 @@ class TelegramMessenger:
         
         try:
             # Die Nachricht wird per POST an die API gesendet
-            response = requests.post(url, data=payload, timeout=30)
+            response = self.session.post(url, data=payload, timeout=30)
             response.raise_for_status()
             
             result = response.json()
@@ -146,7 +153,7 @@ class TelegramMessenger:
         url = f"https://api.telegram.org/bot{self.bot_token}/getMe"
         
         try:
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
             result = response.json()
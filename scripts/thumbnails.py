@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Vorschaubilder für Bilddokumente (Logos, Grafiken) in data/documents
+
+Die Dokumentenansicht soll für eine Vorschau nicht das Original laden müssen.
+Vorschaubilder werden deshalb nach dem Download in einem Prozess-Pool auf eine feste
+Kantenlänge verkleinert und unter data/thumbnails abgelegt.
+
+Der Dateiname leitet sich aus sha256 und Kantenlänge ab, ein Vorschaubild wird also
+nur neu erzeugt, wenn sich der Inhalt der Datei ändert. Pillow ist optional, ohne das
+Paket werden nur bereits vorhandene Vorschaubilder weiterverwendet.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+	# Pillow ist optional, ohne das Paket werden keine neuen Vorschaubilder erzeugt
+	from PIL import Image, ImageSequence, features
+except ImportError:
+	Image = None
+
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = (SCRIPT_DIR / ".." / "data").resolve()
+THUMBNAILS_DIR = DATA_DIR / "thumbnails"
+THUMBNAIL_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".tif", ".tiff", ".eps"}
+# Längste Kante in Pixeln, eine Änderung erzeugt neue Dateinamen und damit neue Bilder
+THUMBNAIL_SIZE = 320
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_FORMATS = {"WEBP": "webp", "JPEG": "jpg"}
+THUMBNAIL_WORKERS = max(1, min(4, os.cpu_count() or 1))
+
+
+def thumbnailFormat() -> Tuple[str, str]:
+	"""
+	Wählt das Ausgabeformat, WebP wenn Pillow es schreiben kann, sonst JPEG
+
+	Returns:
+		Tuple[str, str]: Pillow-Formatname und Dateiendung
+	"""
+	if Image is not None and features.check("webp"):
+		return "WEBP", THUMBNAIL_FORMATS["WEBP"]
+	return "JPEG", THUMBNAIL_FORMATS["JPEG"]
+
+
+def thumbnailName(sha256: str, extension: str) -> str:
+	"""
+	Liefert den Pfad eines Vorschaubilds relativ zum Vorschaubild-Ordner
+
+	Args:
+		sha256 (str): SHA256-Hash des Originals
+		extension (str): Dateiendung des Ausgabeformats
+
+	Returns:
+		str: Pfad der Form <ab>/<sha256>-<Kantenlänge>.<Endung>
+	"""
+	return f"{sha256[:2]}/{sha256}-{THUMBNAIL_SIZE}.{extension}"
+
+
+def renderThumbnail(source: str, destination: str, size: int, image_format: str) -> bool:
+	"""
+	Verkleinert ein Bild und schreibt es atomar an den Zielpfad
+
+	Läuft in einem Worker-Prozess, deshalb nur mit einfachen, picklebaren Argumenten.
+
+	Args:
+		source (str): Pfad des Originalbilds
+		destination (str): Pfad des Vorschaubilds
+		size (int): Längste Kante in Pixeln
+		image_format (str): Pillow-Formatname, WEBP oder JPEG
+
+	Returns:
+		bool: True wenn das Vorschaubild geschrieben wurde
+	"""
+	target = Path(destination)
+	temporary = target.with_name(f".{target.name}.tmp")
+	try:
+		with Image.open(source) as original:
+			# Bei GIF und mehrseitigen TIFFs reicht das erste Bild
+			frame = next(ImageSequence.Iterator(original)).copy()
+		# EPS wird beim Laden gerastert und erfordert Ghostscript
+		frame.thumbnail((size, size))
+		if frame.mode in ("RGBA", "LA", "P") and image_format == "JPEG":
+			# JPEG kennt keine Transparenz, Logos bekommen einen weißen Hintergrund
+			frame = frame.convert("RGBA")
+			background = Image.new("RGB", frame.size, (255, 255, 255))
+			background.paste(frame, mask=frame.getchannel("A"))
+			frame = background
+		elif frame.mode not in ("RGB", "RGBA"):
+			frame = frame.convert("RGBA" if "A" in frame.getbands() or frame.mode == "P" else "RGB")
+		target.parent.mkdir(parents=True, exist_ok=True)
+		frame.save(temporary, format=image_format, quality=THUMBNAIL_QUALITY)
+		os.replace(temporary, target)
+	except Exception as exc:
+		print(f"Warnung: Vorschaubild konnte nicht erzeugt werden ({Path(source).name}): {exc}")
+		try:
+			temporary.unlink()
+		except OSError:
+			pass
+		return False
+	return True
+
+
+def renderAll(jobs: List[Tuple[str, str]], image_format: str, workers: int) -> List[bool]:
+	"""
+	Erzeugt mehrere Vorschaubilder, bei mehr als einem Auftrag in einem Prozess-Pool
+
+	Args:
+		jobs (List[Tuple[str, str]]): Paare aus Originalpfad und Zielpfad
+		image_format (str): Pillow-Formatname
+		workers (int): Maximale Anzahl Worker-Prozesse
+
+	Returns:
+		List[bool]: Erfolg pro Auftrag in derselben Reihenfolge
+	"""
+	sizes = [THUMBNAIL_SIZE] * len(jobs)
+	formats = [image_format] * len(jobs)
+	sources = [source for source, _ in jobs]
+	destinations = [destination for _, destination in jobs]
+	if workers > 1 and len(jobs) > 1:
+		try:
+			# Das Verkleinern ist rechenintensiv, Prozesse umgehen den GIL
+			with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+				return list(pool.map(renderThumbnail, sources, destinations, sizes, formats))
+		except (OSError, RuntimeError) as exc:
+			# Ohne Prozess-Pool (z.B. fehlendes /dev/shm) wird im eigenen Prozess gerechnet
+			print(f"Warnung: Prozess-Pool nicht verfügbar, Vorschaubilder werden seriell erzeugt: {exc}")
+	return list(map(renderThumbnail, sources, destinations, sizes, formats))
+
+
+def pruneThumbnails(directory: Path, referenced: Set[str]) -> int:
+	"""
+	Entfernt Vorschaubilder, auf die kein Metadaten-Eintrag mehr verweist
+
+	Args:
+		directory (Path): Vorschaubild-Ordner
+		referenced (Set[str]): Relative Pfade aller noch benötigten Vorschaubilder
+
+	Returns:
+		int: Anzahl entfernter Dateien
+	"""
+	if not directory.exists():
+		return 0
+
+	removed = 0
+	for shard in directory.iterdir():
+		if not shard.is_dir():
+			continue
+		for thumbnail in shard.iterdir():
+			if f"{shard.name}/{thumbnail.name}" in referenced:
+				continue
+			try:
+				thumbnail.unlink()
+				removed += 1
+			except OSError as exc:
+				print(f"Warnung: Vorschaubild konnte nicht gelöscht werden ({thumbnail}): {exc}")
+		try:
+			shard.rmdir()
+		except OSError:
+			pass
+	return removed
+
+
+def updateThumbnails(
+	entries: Iterable[Dict],
+	data_dir: Optional[Path] = None,
+	directory: Optional[Path] = None,
+	workers: Optional[int] = None,
+) -> Dict[str, int]:
+	"""
+	Erzeugt fehlende Vorschaubilder und trägt ihre Pfade in die Metadaten-Einträge ein
+
+	Einträge mit Vorschaubild bekommen das Feld thumbnail mit einem Pfad relativ zum
+	data-Ordner, bei allen anderen wird das Feld entfernt. Die Einträge werden direkt verändert.
+
+	Args:
+		entries (Iterable[Dict]): Metadaten-Einträge mit local_path und sha256
+		data_dir (Optional[Path]): data-Ordner, Standard ist DATA_DIR
+		directory (Optional[Path]): Vorschaubild-Ordner, Standard ist THUMBNAILS_DIR
+		workers (Optional[int]): Anzahl Worker-Prozesse, Standard ist THUMBNAIL_WORKERS
+
+	Returns:
+		Dict[str, int]: Anzahl erzeugter, weiterverwendeter, fehlgeschlagener und entfernter Bilder
+	"""
+	data_dir = Path(data_dir or DATA_DIR)
+	directory = Path(directory or THUMBNAILS_DIR)
+	image_format, extension = thumbnailFormat()
+	try:
+		prefix = directory.relative_to(data_dir).as_posix()
+	except ValueError:
+		prefix = directory.as_posix()
+	stats = {"generated": 0, "reused": 0, "failed": 0, "removed": 0}
+
+	candidates: List[Tuple[Dict, str]] = []
+	jobs: Dict[str, Tuple[str, str]] = {}
+	for entry in entries:
+		entry.pop("thumbnail", None)
+		local_path = str(entry.get("local_path", ""))
+		sha256 = str(entry.get("sha256", ""))
+		if not sha256 or Path(local_path).suffix.lower() not in THUMBNAIL_EXTENSIONS:
+			continue
+		# Vorhandene Bilder im anderen Format bleiben gültig, solange der Inhalt gleich ist
+		names = [thumbnailName(sha256, known) for known in [extension, *THUMBNAIL_FORMATS.values()]]
+		existing = [name for name in names if (directory / name).is_file()]
+		name = existing[0] if existing else names[0]
+		candidates.append((entry, name))
+		if existing or name in jobs:
+			continue
+		source = data_dir / local_path
+		if Image is not None and source.is_file():
+			# Identische Inhalte unter mehreren Pfaden werden nur einmal verkleinert
+			jobs[name] = (str(source), str(directory / name))
+
+	pending = list(jobs)
+	results = renderAll([jobs[name] for name in pending], image_format, workers or THUMBNAIL_WORKERS)
+	generated = {name for name, ok in zip(pending, results) if ok}
+	stats["generated"] = len(generated)
+	stats["failed"] = len(pending) - len(generated)
+
+	referenced: Set[str] = set()
+	for entry, name in candidates:
+		if (directory / name).is_file():
+			entry["thumbnail"] = f"{prefix}/{name}"
+			referenced.add(name)
+	stats["reused"] = len(referenced - generated)
+	stats["removed"] = pruneThumbnails(directory, referenced)
+	return stats
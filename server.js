@@ -27,6 +27,66 @@ try {
     console.error('Fehler beim Laden der Kursdaten:', err);
 }
 
+// Von den Python-Scrapern vorkomprimierte Geschwister, bevorzugt in dieser Reihenfolge
+const PRECOMPRESSED_VARIANTS = [
+    { encoding: 'br', suffix: '.br' },
+    { encoding: 'gzip', suffix: '.gz' }
+];
+
+function acceptedEncodings(header) {
+    // Kodierungen mit q=0 sind ausdrücklich abgelehnt
+    return new Set(String(header || '')
+        .split(',')
+        .map(part => part.trim().toLowerCase().split(';'))
+        .filter(([, ...params]) => !params.some(param => /^\s*q=0(\.0*)?\s*$/.test(param)))
+        .map(([name]) => name.trim()));
+}
+
+function servePrecompressed(root) {
+    // Liefert data/x.json.br bzw. .gz statt data/x.json, wenn der Browser es akzeptiert
+    return (req, res, next) => {
+        if (req.method !== 'GET' && req.method !== 'HEAD') {
+            return next();
+        }
+        let filePath;
+        try {
+            filePath = path.join(root, decodeURIComponent(req.path));
+        } catch (error) {
+            return next();
+        }
+        if (!filePath.startsWith(root + path.sep)) {
+            return next();
+        }
+
+        const accepted = acceptedEncodings(req.headers['accept-encoding']);
+        for (const { encoding, suffix } of PRECOMPRESSED_VARIANTS) {
+            if (!accepted.has(encoding)) {
+                continue;
+            }
+            try {
+                // Eine Variante, die älter als das Original ist, gehört zu einem früheren Inhalt
+                if (fs.statSync(filePath + suffix).mtimeMs < fs.statSync(filePath).mtimeMs) {
+                    continue;
+                }
+            } catch (error) {
+                continue;
+            }
+            res.vary('Accept-Encoding');
+            res.set('Content-Encoding', encoding);
+            res.type(path.extname(filePath));
+            return res.sendFile(path.relative(root, filePath) + suffix, { root, dotfiles: 'deny' }, error => {
+                if (error && !res.headersSent) {
+                    // Ohne lesbare Variante übernimmt die normale statische Auslieferung
+                    res.removeHeader('Content-Encoding');
+                    next();
+                }
+            });
+        }
+        res.vary('Accept-Encoding');
+        next();
+    };
+}
+
 // Express setup
 const app = express();
 app.use(express.urlencoded({ extended: true }));
@@ -51,6 +111,7 @@ app.use(session({
 
 app.use('/assets', express.static(path.join(__dirname, 'assets')));
 app.use('/scripts', express.static(path.join(__dirname, 'scripts')));
+app.use('/data', servePrecompressed(path.join(__dirname, 'data')));
 app.use('/data', express.static(path.join(__dirname, 'data')));
 app.use('/favicon', express.static(path.join(__dirname, 'favicon'), {
     maxAge: '1d',
@@ -99,19 +160,116 @@ function normalizeLocalPath(value) {
     return String(value || '').replace(/\\/g, '/').replace(/^\/+/, '');
 }
 
-function walkFiles(dir, allFiles = []) {
+const PRECOMPRESS_MANIFEST_PATH = path.join(__dirname, 'data', 'precompressed_manifest.json');
+
+function loadPrecompressedVariants() {
+    // Nur vom Precompressor geschriebene .gz/.br-Geschwister sind Varianten, heruntergeladene Archive nicht
+    try {
+        const manifest = JSON.parse(fs.readFileSync(PRECOMPRESS_MANIFEST_PATH, 'utf8'));
+        const variants = new Set();
+        for (const [source, known] of Object.entries(manifest.files || {})) {
+            for (const suffix of Array.isArray(known && known.variants) ? known.variants : []) {
+                variants.add(source + suffix);
+            }
+        }
+        return variants;
+    } catch (error) {
+        return new Set();
+    }
+}
+
+function walkFiles(dir, allFiles = [], variants = new Set()) {
     const entries = fs.readdirSync(dir, { withFileTypes: true });
     for (const entry of entries) {
+        // Versteckte Dateien sind unfertige Downloads des Dokumente-Scrapers
+        if (entry.name.startsWith('.')) {
+            continue;
+        }
         const fullPath = path.join(dir, entry.name);
         if (entry.isDirectory()) {
-            walkFiles(fullPath, allFiles);
-        } else {
+            walkFiles(fullPath, allFiles, variants);
+        } else if (!variants.has(normalizeLocalPath(path.relative(path.join(__dirname, 'data'), fullPath)))) {
             allFiles.push(fullPath);
         }
     }
     return allFiles;
 }
 
+// Vom Dokumente-Scraper vorberechneter Index, im Speicher gehalten solange sich die Datei nicht ändert
+const DOCUMENTS_INDEX_PATH = path.join(__dirname, 'data', 'documents_index.json');
+let documentsIndexCache = null;
+
+function loadDocumentsIndex() {
+    try {
+        const indexStat = fs.statSync(DOCUMENTS_INDEX_PATH);
+        const metadataPath = path.join(__dirname, 'data', 'dokumente_metadata.json');
+        // Ein Index, der älter als die Metadaten ist, stammt aus einem abgebrochenen Lauf
+        if (fs.existsSync(metadataPath) && fs.statSync(metadataPath).mtimeMs > indexStat.mtimeMs) {
+            return null;
+        }
+        if (documentsIndexCache && documentsIndexCache.mtimeMs === indexStat.mtimeMs) {
+            return documentsIndexCache;
+        }
+
+        const index = JSON.parse(fs.readFileSync(DOCUMENTS_INDEX_PATH, 'utf8'));
+        if (!Array.isArray(index.documents) || !index.etag) {
+            return null;
+        }
+        documentsIndexCache = {
+            mtimeMs: indexStat.mtimeMs,
+            etag: `"${index.etag}"`,
+            body: JSON.stringify({
+                documents: index.documents,
+                total: index.total,
+                metadata_total: index.metadata_total,
+                categories: index.categories
+            })
+        };
+        return documentsIndexCache;
+    } catch (error) {
+        // Ohne lesbaren Index wird die Liste wie bisher aus Metadaten und Dateibaum gebaut
+        return null;
+    }
+}
+
+// Änderungs-Feed des Dokumente-Scrapers, der Index enthält pro Sequenznummer einen 8-Byte-Offset
+const DOCUMENTS_CHANGES_PATH = path.join(__dirname, 'data', 'dokumente_changes.jsonl');
+const DOCUMENTS_CHANGES_INDEX_PATH = path.join(__dirname, 'data', 'dokumente_changes.idx');
+const CHANGES_INDEX_RECORD_BYTES = 8;
+
+function readBytes(filePath, position, length) {
+    const handle = fs.openSync(filePath, 'r');
+    try {
+        const buffer = Buffer.alloc(length);
+        const bytesRead = fs.readSync(handle, buffer, 0, length, position);
+        return buffer.subarray(0, bytesRead);
+    } finally {
+        fs.closeSync(handle);
+    }
+}
+
+function readDocumentChanges(since) {
+    // Gelesen wird nur ab dem Offset des ersten neueren Eintrags, nicht der ganze Feed
+    if (!fs.existsSync(DOCUMENTS_CHANGES_INDEX_PATH)) {
+        return { lastSeq: 0, changes: [] };
+    }
+    const lastSeq = Math.floor(fs.statSync(DOCUMENTS_CHANGES_INDEX_PATH).size / CHANGES_INDEX_RECORD_BYTES);
+    if (since >= lastSeq) {
+        return { lastSeq, changes: [] };
+    }
+
+    const offsetBytes = readBytes(DOCUMENTS_CHANGES_INDEX_PATH, since * CHANGES_INDEX_RECORD_BYTES, CHANGES_INDEX_RECORD_BYTES);
+    const start = Number(offsetBytes.readBigUInt64BE(0));
+    const feedSize = fs.statSync(DOCUMENTS_CHANGES_PATH).size;
+    const lines = readBytes(DOCUMENTS_CHANGES_PATH, start, Math.max(feedSize - start, 0)).toString('utf8').split('\n');
+    // Das letzte Stück ist leer oder eine unvollständige Zeile eines laufenden Schreibvorgangs
+    const changes = lines
+        .slice(0, -1)
+        .map(line => JSON.parse(line))
+        .filter(record => record.seq > since && record.seq <= lastSeq);
+    return { lastSeq, changes };
+}
+
 // Authentication routes
 app.get('/', async (req, res) => {
     if (req.session.authenticated) {
@@ -206,8 +364,37 @@ app.get('/api/session', (req, res) => {
     });
 });
 
+app.get('/api/documents/changes', requireLogin, (req, res) => {
+    const since = Number(req.query.since ?? 0);
+    if (!Number.isInteger(since) || since < 0) {
+        return res.status(400).json({
+            error: 'invalid-since',
+            message: 'Parameter since muss eine nicht-negative ganze Zahl sein.'
+        });
+    }
+
+    try {
+        const { lastSeq, changes } = readDocumentChanges(since);
+        res.json({ since, last_seq: lastSeq, changes });
+    } catch (error) {
+        console.error('Fehler beim Lesen des Änderungs-Feeds:', error);
+        res.status(500).json({
+            error: 'changes-load-failed',
+            message: 'Änderungen konnten nicht geladen werden.'
+        });
+    }
+});
+
 app.get('/api/documents', requireLogin, (req, res) => {
     try {
+        const documentsIndex = loadDocumentsIndex();
+        if (documentsIndex) {
+            // Express beantwortet passende If-None-Match-Anfragen anhand des ETags mit 304
+            res.set('ETag', documentsIndex.etag);
+            res.type('json');
+            return res.send(documentsIndex.body);
+        }
+
         const metadataPath = path.join(__dirname, 'data', 'dokumente_metadata.json');
         const documentsRoot = path.join(__dirname, 'data', 'documents');
 
@@ -220,7 +407,7 @@ app.get('/api/documents', requireLogin, (req, res) => {
             metadataDocuments.map(doc => [normalizeLocalPath(doc.local_path), doc])
         );
 
-        const filePaths = fs.existsSync(documentsRoot) ? walkFiles(documentsRoot) : [];
+        const filePaths = fs.existsSync(documentsRoot) ? walkFiles(documentsRoot, [], loadPrecompressedVariants()) : [];
 
         const documents = filePaths.map(filePath => {
             const relativeFromDocumentsRoot = normalizeLocalPath(path.relative(documentsRoot, filePath));
@@ -233,7 +420,8 @@ app.get('/api/documents', requireLogin, (req, res) => {
                 filename: matchingMetadata?.filename || path.basename(filePath),
                 title: matchingMetadata?.title || path.basename(filePath),
                 description: matchingMetadata?.description || '',
-                local_path: matchingMetadata?.local_path || localPath
+                local_path: matchingMetadata?.local_path || localPath,
+                thumbnail: matchingMetadata?.thumbnail || ''
             };
         });
 
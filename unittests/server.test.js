@@ -2,6 +2,7 @@ import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
 import request from 'supertest';
 import { app } from '../server.js';
 import fs from 'fs';
+import zlib from 'zlib';
 
 // 1. Alle Scraper-Funktionen mocken
 vi.mock('../scripts/dhbwAPP_scraper.js', () => ({
@@ -163,6 +164,133 @@ describe('Express Server API & Routes', () => {
             readdirSpy.mockRestore();
         });
 
+        it('should skip precompressed variants from the manifest when listing the documents folder', async () => {
+            // Ohne lesbaren Index greift die Liste auf den Dateibaum zurück
+            const statSpy = vi.spyOn(fs, 'statSync').mockImplementation(() => {
+                throw new Error('ENOENT');
+            });
+            const existsSpy = vi.spyOn(fs, 'existsSync').mockImplementation(target => !target.endsWith('.json'));
+            const readSpy = vi.spyOn(fs, 'readFileSync').mockImplementation(target => {
+                if (String(target).endsWith('precompressed_manifest.json')) {
+                    return JSON.stringify({ files: { 'documents/liste.csv': { variants: ['.gz', '.br'] } } });
+                }
+                throw new Error('ENOENT');
+            });
+            const readdirSpy = vi.spyOn(fs, 'readdirSync').mockReturnValue([
+                { name: 'liste.csv', isDirectory: () => false },
+                { name: 'liste.csv.gz', isDirectory: () => false },
+                { name: 'liste.csv.br', isDirectory: () => false },
+                { name: 'archiv.tar', isDirectory: () => false },
+                { name: 'archiv.tar.gz', isDirectory: () => false }
+            ]);
+
+            const res = await request(app).get('/api/documents').set('Cookie', sessionCookie);
+
+            expect(res.status).toBe(200);
+            expect(res.body.documents.map(doc => doc.local_path).sort()).toEqual([
+                'documents/archiv.tar',
+                'documents/archiv.tar.gz',
+                'documents/liste.csv'
+            ]);
+
+            statSpy.mockRestore();
+            existsSpy.mockRestore();
+            readSpy.mockRestore();
+            readdirSpy.mockRestore();
+        });
+
+        it('should serve the precomputed documents index with ETag', async () => {
+            const statSpy = vi.spyOn(fs, 'statSync').mockReturnValue({ mtimeMs: 1 });
+            const existsSpy = vi.spyOn(fs, 'existsSync').mockReturnValue(false);
+            const readSpy = vi.spyOn(fs, 'readFileSync').mockReturnValue(JSON.stringify({
+                etag: 'abc',
+                documents: [{ local_path: 'documents/A/a.pdf', category: 'A', filename: 'a.pdf' }],
+                total: 1,
+                metadata_total: 1,
+                categories: [{ name: 'A', path: 'A', count: 1, documents: 1, children: [] }]
+            }));
+            const readdirSpy = vi.spyOn(fs, 'readdirSync');
+
+            const res = await request(app).get('/api/documents').set('Cookie', sessionCookie);
+            expect(res.status).toBe(200);
+            expect(res.headers.etag).toBe('"abc"');
+            expect(res.body.total).toBe(1);
+            expect(res.body.categories[0].name).toBe('A');
+            // Der Dateibaum wird bei vorhandenem Index nicht durchlaufen
+            expect(readdirSpy).not.toHaveBeenCalled();
+
+            const cached = await request(app)
+                .get('/api/documents')
+                .set('Cookie', sessionCookie)
+                .set('If-None-Match', '"abc"');
+            expect(cached.status).toBe(304);
+
+            statSpy.mockRestore();
+            existsSpy.mockRestore();
+            readSpy.mockRestore();
+            readdirSpy.mockRestore();
+        });
+
+        it('should serve pre-compressed data files when the client accepts them', async () => {
+            const sourcePath = new URL('../data/kurse_fn.json', import.meta.url);
+            const variantPath = new URL('../data/kurse_fn.json.gz', import.meta.url);
+            const original = fs.readFileSync(sourcePath);
+            fs.writeFileSync(variantPath, zlib.gzipSync(original));
+            try {
+                const compressed = await request(app).get('/data/kurse_fn.json').set('Accept-Encoding', 'gzip, br;q=0');
+                expect(compressed.status).toBe(200);
+                expect(compressed.headers['content-encoding']).toBe('gzip');
+                expect(compressed.headers['content-type']).toContain('application/json');
+                expect(compressed.headers.vary).toContain('Accept-Encoding');
+                expect(compressed.body).toEqual(JSON.parse(original.toString('utf8')));
+
+                const plain = await request(app).get('/data/kurse_fn.json').set('Accept-Encoding', 'identity');
+                expect(plain.status).toBe(200);
+                expect(plain.headers['content-encoding']).toBeUndefined();
+
+                // Eine Variante, die älter als das Original ist, wird nicht mehr ausgeliefert
+                fs.utimesSync(variantPath, new Date(0), new Date(0));
+                const stale = await request(app).get('/data/kurse_fn.json').set('Accept-Encoding', 'gzip');
+                expect(stale.headers['content-encoding']).toBeUndefined();
+            } finally {
+                fs.unlinkSync(variantPath);
+            }
+        });
+
+        it('should return document changes since a sequence number', async () => {
+            const feedPath = new URL('../data/dokumente_changes.jsonl', import.meta.url);
+            const indexPath = new URL('../data/dokumente_changes.idx', import.meta.url);
+            const records = [
+                { seq: 1, added: ['a'], updated: [], removed: [], metadata_changed: [] },
+                { seq: 2, added: [], updated: ['a'], removed: [], metadata_changed: [] },
+                { seq: 3, added: [], updated: [], removed: ['a'], metadata_changed: [] }
+            ];
+            const lines = records.map(record => `${JSON.stringify(record)}\n`);
+            const index = Buffer.alloc(lines.length * 8);
+            let offset = 0;
+            lines.forEach((line, position) => {
+                index.writeBigUInt64BE(BigInt(offset), position * 8);
+                offset += Buffer.byteLength(line);
+            });
+            fs.writeFileSync(feedPath, `${lines.join('')}{"seq":4,"added"`);
+            fs.writeFileSync(indexPath, index);
+            try {
+                const res = await request(app).get('/api/documents/changes?since=1').set('Cookie', sessionCookie);
+                expect(res.status).toBe(200);
+                expect(res.body.last_seq).toBe(3);
+                expect(res.body.changes.map(record => record.seq)).toEqual([2, 3]);
+
+                const current = await request(app).get('/api/documents/changes?since=3').set('Cookie', sessionCookie);
+                expect(current.body.changes).toEqual([]);
+
+                const invalid = await request(app).get('/api/documents/changes?since=-1').set('Cookie', sessionCookie);
+                expect(invalid.status).toBe(400);
+            } finally {
+                fs.unlinkSync(feedPath);
+                fs.unlinkSync(indexPath);
+            }
+        });
+
         it('should handle internal errors gracefully (500)', async () => {
             const existsSpy = vi.spyOn(fs, 'existsSync').mockImplementation(() => { 
                 throw new Error('FS Crash'); 
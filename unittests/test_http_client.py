@@ -0,0 +1,265 @@
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	# Importpfad erweitern dass scripts.http_client auch beim direkten Teststart gefunden wird
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import scripts.http_client as http_client
+
+
+# Lokaler Keep-Alive-Server, dessen Antworten pro Pfad vorgegeben werden
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	responses = {}
+	headers_by_path = {}
+	hits = []
+
+	def do_GET(self):
+		# Jeder Pfad liefert nacheinander die hinterlegten Status-Codes, danach immer den letzten
+		self.hits.append((self.path, self.headers.get("If-None-Match")))
+		queue = self.responses.setdefault(self.path, [200])
+		status = queue.pop(0) if len(queue) > 1 else queue[0]
+		extra = self.headers_by_path.get(self.path, {})
+		body = b"x" * 100
+		if extra.get("ETag") and self.headers.get("If-None-Match") == extra["ETag"]:
+			# Passender Validator: nur 304 ohne Inhalt
+			status, body = 304, b""
+		self.send_response(status)
+		for name, value in extra.items():
+			self.send_header(name, value)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		return
+
+
+class HttpClientTests(unittest.TestCase):
+	@classmethod
+	def setUpClass(cls):
+		cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+		cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+		cls.thread.start()
+		cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+	@classmethod
+	def tearDownClass(cls):
+		cls.server.shutdown()
+		cls.server.server_close()
+
+	def setUp(self):
+		_Handler.responses = {}
+		_Handler.headers_by_path = {}
+		_Handler.hits = []
+
+	# Verbindungswiederverwendung und Zähler
+	def test_session_reuses_connection_and_counts_bytes(self):
+		session = http_client.buildSession("Test-Agent")
+		for _ in range(3):
+			response = session.get(f"{self.base}/a", timeout=5)
+			self.assertEqual(response.status_code, 200)
+
+		stats = http_client.sessionStats(session)
+		self.assertEqual(stats["requests"], 3)
+		self.assertEqual(stats["connections_opened"], 1)
+		self.assertEqual(stats["connections_reused"], 2)
+		self.assertEqual(stats["bytes_received"], 300)
+		self.assertEqual(session.headers["User-Agent"], "Test-Agent")
+
+	def test_streamed_body_is_counted(self):
+		session = http_client.buildSession()
+		with session.get(f"{self.base}/stream", timeout=5, stream=True) as response:
+			total = sum(len(chunk) for chunk in response.iter_content(chunk_size=7))
+		self.assertEqual(total, 100)
+		self.assertEqual(http_client.sessionStats(session)["bytes_received"], 100)
+
+	def test_retries_server_errors_with_backoff(self):
+		_Handler.responses = {"/flaky": [502, 200]}
+		session = http_client.buildSession(adapter=http_client.PooledAdapter(retry=http_client.buildRetry(backoff_factor=0)))
+		response = session.get(f"{self.base}/flaky", timeout=5)
+
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(http_client.sessionStats(session)["retries"], 1)
+
+	# Circuit Breaker pro Host
+	def test_circuit_breaker_opens_and_recovers(self):
+		clock = [0.0]
+		breaker = http_client.CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=lambda: clock[0])
+		url = "https://example.org/a"
+
+		breaker.failure(url)
+		breaker.before(url)
+		breaker.failure(url)
+		self.assertTrue(breaker.isOpen(url))
+		with self.assertRaises(http_client.CircuitOpenError):
+			breaker.before(url)
+		breaker.before("https://other.example.org/")
+
+		clock[0] = 11.0
+		breaker.before(url)
+		# Während der Probeanfrage bleiben weitere Anfragen gesperrt
+		with self.assertRaises(http_client.CircuitOpenError):
+			breaker.before(url)
+		breaker.success(url)
+		breaker.before(url)
+		self.assertFalse(breaker.isOpen(url))
+
+	def test_adapter_rejects_requests_while_circuit_is_open(self):
+		_Handler.responses = {"/down": [500]}
+		adapter = http_client.PooledAdapter(
+			retry=http_client.buildRetry(total=0),
+			breaker=http_client.CircuitBreaker(failure_threshold=2),
+		)
+		session = http_client.buildSession(adapter=adapter)
+		for _ in range(2):
+			self.assertEqual(session.get(f"{self.base}/down", timeout=5).status_code, 500)
+
+		with self.assertRaises(requests.exceptions.ConnectionError):
+			session.get(f"{self.base}/down", timeout=5)
+		stats = http_client.sessionStats(session)
+		self.assertEqual(stats["requests"], 2)
+		self.assertEqual(stats["circuit_open"], 1)
+
+	def test_latencies_and_errors_per_host_are_recorded(self):
+		_Handler.responses = {"/missing": [404]}
+		session = http_client.buildSession(adapter=http_client.PooledAdapter(retry=http_client.buildRetry(total=0)))
+		session.get(f"{self.base}/a", timeout=5)
+		session.get(f"{self.base}/missing", timeout=5)
+
+		latencies, host_errors = http_client.sessionObservations(session)
+		self.assertEqual(len(latencies), 2)
+		self.assertTrue(all(seconds >= 0 for seconds in latencies))
+		self.assertEqual(host_errors, {self.base.split("//", 1)[1]: 1})
+		self.assertEqual(http_client.sessionObservations(object()), ([], {}))
+
+	def test_shared_session_is_reused(self):
+		self.assertIs(http_client.sharedSession(), http_client.sharedSession())
+		self.assertEqual(http_client.sessionStats(object()), {})
+
+	# HTTP-Cache auf der Festplatte
+	def test_cache_serves_fresh_response_without_network(self):
+		_Handler.headers_by_path = {"/fresh": {"Cache-Control": "max-age=60", "ETag": '"f"'}}
+		with tempfile.TemporaryDirectory() as tmp:
+			cache = http_client.HttpCache(Path(tmp))
+			session = http_client.buildSession(adapter=http_client.PooledAdapter(cache=cache))
+			first = session.get(f"{self.base}/fresh", timeout=5)
+			second = session.get(f"{self.base}/fresh", timeout=5)
+
+			self.assertEqual(first.content, second.content)
+			self.assertEqual(second.status_code, 200)
+			self.assertEqual(len(_Handler.hits), 1)
+			stats = http_client.sessionStats(session)
+			self.assertEqual(stats["cache_hits"], 1)
+			self.assertEqual(stats["cache_stored"], 1)
+
+			# Ein Aufrufer mit passendem Validator bekommt ein lokales 304
+			local = session.get(f"{self.base}/fresh", timeout=5, headers={"If-None-Match": '"f"'})
+			self.assertEqual(local.status_code, 304)
+			self.assertEqual(len(_Handler.hits), 1)
+
+			# no-cache in der Anfrage erzwingt die Revalidierung beim Server
+			forced = session.get(f"{self.base}/fresh", timeout=5, headers={"Cache-Control": "no-cache"})
+			self.assertEqual(forced.status_code, 200)
+			self.assertEqual(_Handler.hits[-1], ("/fresh", '"f"'))
+
+	def test_cache_revalidates_stale_entry_with_etag(self):
+		_Handler.headers_by_path = {"/page": {"ETag": '"v1"', "Cache-Control": "no-cache"}}
+		with tempfile.TemporaryDirectory() as tmp:
+			session = http_client.buildSession(adapter=http_client.PooledAdapter(cache=http_client.HttpCache(Path(tmp))))
+			session.get(f"{self.base}/page", timeout=5)
+			revalidated = session.get(f"{self.base}/page", timeout=5)
+			conditional = session.get(f"{self.base}/page", timeout=5, headers={"If-None-Match": '"v1"'})
+
+			self.assertEqual(revalidated.status_code, 200)
+			self.assertEqual(revalidated.content, b"x" * 100)
+			self.assertEqual(conditional.status_code, 304)
+			self.assertEqual(_Handler.hits, [("/page", None), ("/page", '"v1"'), ("/page", '"v1"')])
+			self.assertEqual(http_client.sessionStats(session)["cache_revalidated"], 2)
+
+	def test_cache_skips_no_store_and_streamed_responses(self):
+		_Handler.headers_by_path = {
+			"/secret": {"Cache-Control": "no-store", "ETag": '"s"'},
+			"/stream": {"ETag": '"d"'},
+		}
+		with tempfile.TemporaryDirectory() as tmp:
+			session = http_client.buildSession(adapter=http_client.PooledAdapter(cache=http_client.HttpCache(Path(tmp))))
+			session.get(f"{self.base}/secret", timeout=5)
+			with session.get(f"{self.base}/stream", timeout=5, stream=True) as response:
+				b"".join(response.iter_content(16))
+
+			self.assertEqual(list(Path(tmp).rglob("*.json")), [])
+
+	def test_freshness_lifetime_rules(self):
+		cache = http_client.HttpCache(Path("."), clock=lambda: 1000.0)
+		date = "Thu, 01 Jan 1970 00:16:40 GMT"
+		self.assertEqual(cache.freshnessLifetime({"headers": {"Cache-Control": "public, max-age=30"}}), 30.0)
+		self.assertEqual(cache.freshnessLifetime({"headers": {"Date": date, "Expires": "Thu, 01 Jan 1970 00:17:40 GMT"}}), 60.0)
+		self.assertEqual(cache.freshnessLifetime({"headers": {"Date": date, "Expires": "0"}}), 0.0)
+		heuristic = {"status": 200, "headers": {"Date": date, "Last-Modified": "Thu, 01 Jan 1970 00:00:00 GMT"}}
+		self.assertEqual(cache.freshnessLifetime(heuristic), 100.0)
+		self.assertEqual(cache.freshnessLifetime({"headers": {"Cache-Control": "no-cache, max-age=30"}}), 0.0)
+		capped = http_client.HttpCache(Path("."), clock=lambda: 1000.0, heuristic_max_seconds=0.0)
+		self.assertEqual(capped.freshnessLifetime(heuristic), 0.0)
+		self.assertEqual(capped.freshnessLifetime({"headers": {"Cache-Control": "max-age=30"}}), 30.0)
+
+	# Aufzeichnung und Wiedergabe über ein HTTP-Archiv
+	def test_recorded_archive_replays_without_network(self):
+		_Handler.responses = {"/seq": [200, 404]}
+		_Handler.headers_by_path = {"/doc": {"ETag": '"d"'}}
+		with tempfile.TemporaryDirectory() as tmp:
+			archive_path = Path(tmp) / "archiv.zip"
+			recorder = http_client.HttpArchiveRecorder(archive_path)
+			adapter = http_client.PooledAdapter(retry=http_client.buildRetry(total=0), recorder=recorder)
+			session = http_client.buildSession(adapter=adapter)
+			session.get(f"{self.base}/seq", timeout=5)
+			session.get(f"{self.base}/seq", timeout=5)
+			with session.get(f"{self.base}/doc", timeout=5, stream=True) as response:
+				streamed = b"".join(response.iter_content(16))
+			session.get(f"{self.base}/doc", timeout=5, headers={"If-None-Match": '"d"'})
+			with self.assertRaises(requests.exceptions.ConnectionError):
+				session.get("http://127.0.0.1:9/weg", timeout=5)
+			self.assertFalse(archive_path.exists())
+			session.close()
+			session.close()
+			recorded_hits = len(_Handler.hits)
+
+			replay = http_client.buildSession(adapter=http_client.ReplayAdapter(http_client.HttpArchive(archive_path)))
+			self.assertEqual([replay.get(f"{self.base}/seq").status_code for _ in range(3)], [200, 404, 404])
+			with replay.get(f"{self.base}/doc", stream=True) as response:
+				self.assertEqual(b"".join(response.iter_content(16)), streamed)
+				self.assertEqual(response.headers["ETag"], '"d"')
+			self.assertEqual(replay.get(f"{self.base}/doc", headers={"If-None-Match": '"d"'}).status_code, 304)
+			# Ein unbekannter Validator bekommt die vollständige Antwort
+			self.assertEqual(replay.get(f"{self.base}/doc", headers={"If-None-Match": '"alt"'}).status_code, 200)
+			with self.assertRaises(requests.exceptions.ConnectionError):
+				replay.get("http://127.0.0.1:9/weg")
+			with self.assertRaises(http_client.ArchiveMissError):
+				replay.get(f"{self.base}/neu")
+			replay.close()
+
+			self.assertEqual(len(_Handler.hits), recorded_hits)
+			stats = http_client.sessionStats(replay)
+			self.assertEqual((stats["requests"], stats["failures"]), (8, 2))
+			self.assertEqual(stats["bytes_received"], 500)
+
+	def test_archive_rejects_unreadable_files(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			broken = Path(tmp) / "kaputt.zip"
+			broken.write_bytes(b"kein zip")
+			with self.assertRaises(ValueError):
+				http_client.HttpArchive(broken)
+			with self.assertRaises(ValueError):
+				http_client.HttpArchive(Path(tmp) / "fehlt.zip")
+
+
+if __name__ == "__main__":
+	unittest.main()
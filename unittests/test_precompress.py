@@ -0,0 +1,106 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	# Importpfad erweitern dass scripts.precompress auch beim direkten Teststart gefunden wird
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import scripts.precompress as precompress
+
+
+class PrecompressTests(unittest.TestCase):
+	def setUp(self):
+		self._tmp = tempfile.TemporaryDirectory()
+		self.base = Path(self._tmp.name)
+		self.manifest = self.base / "manifest.json"
+
+	def tearDown(self):
+		self._tmp.cleanup()
+
+	def _precompressor(self):
+		return precompress.Precompressor(self.manifest, self.base)
+
+	# Varianten schreiben und nur bei geändertem Inhalt erneuern
+	def test_compress_writes_reproducible_variants_once_per_content(self):
+		source = self.base / "kontakte" / "kontakte.json"
+		source.parent.mkdir()
+		source.write_text('{"name": "Mustermann"}\n' * 200, encoding="utf-8")
+
+		precompressor = self._precompressor()
+		self.assertTrue(precompressor.compress(source))
+		precompressor.save()
+		variant = source.with_name("kontakte.json.gz")
+		first = variant.read_bytes()
+		self.assertEqual(gzip.decompress(first), source.read_bytes())
+		self.assertLess(len(first), source.stat().st_size)
+
+		with patch("scripts.precompress.gzip.compress") as compress_mock:
+			reloaded = self._precompressor()
+			self.assertFalse(reloaded.compress(source))
+			compress_mock.assert_not_called()
+		self.assertEqual(reloaded.stats["unchanged"], 1)
+		self.assertIn("kontakte/kontakte.json", reloaded.files)
+
+		# Eine gelöschte Variante wird auch bei gleichem Inhalt neu erzeugt
+		variant.unlink()
+		self.assertTrue(reloaded.compress(source))
+		self.assertEqual(variant.read_bytes(), first)
+
+	def test_unchanged_rewrite_moves_variant_mtime_forward(self):
+		source = self.base / "metadata.json"
+		source.write_text('{"titel": "Ordnung"}\n' * 200, encoding="utf-8")
+		precompressor = self._precompressor()
+		precompressor.compress(source)
+		variant = source.with_name("metadata.json.gz")
+		os.utime(variant, (1000, 1000))
+
+		# Byte-identisch neu geschrieben, die Variante ist jetzt älter als das Original
+		source.write_bytes(source.read_bytes())
+		self.assertFalse(precompressor.compress(source))
+
+		self.assertEqual(precompressor.stats["unchanged"], 1)
+		self.assertGreaterEqual(variant.stat().st_mtime_ns, source.stat().st_mtime_ns)
+
+	def test_small_or_incompressible_files_drop_stale_variants(self):
+		source = self.base / "klein.txt"
+		source.write_text("x" * 4000, encoding="utf-8")
+		precompressor = self._precompressor()
+		precompressor.compress(source)
+		self.assertTrue(source.with_name("klein.txt.gz").exists())
+
+		source.write_text("kurz", encoding="utf-8")
+		self.assertFalse(precompressor.compress(source))
+		self.assertFalse(source.with_name("klein.txt.gz").exists())
+		self.assertEqual(precompressor.stats["skipped"], 1)
+
+		noise = self.base / "zufall.csv"
+		noise.write_bytes(os.urandom(4096))
+		self.assertFalse(precompressor.compress(noise))
+		self.assertFalse(noise.with_name("zufall.csv.gz").exists())
+
+	def test_retain_only_forgets_entries_inside_the_given_directory(self):
+		documents = self.base / "documents"
+		documents.mkdir()
+		kept, removed, outside = documents / "a.txt", documents / "b.txt", self.base / "kontakte.json"
+		precompressor = self._precompressor()
+		for path in (kept, removed, outside):
+			path.write_text("inhalt " * 500, encoding="utf-8")
+			precompressor.compress(path)
+
+		self.assertEqual(precompressor.retain([kept], documents), 1)
+
+		self.assertFalse(removed.with_name("b.txt.gz").exists())
+		self.assertTrue(kept.with_name("a.txt.gz").exists())
+		self.assertTrue(outside.with_name("kontakte.json.gz").exists())
+		self.assertEqual(sorted(precompressor.files), ["documents/a.txt", "kontakte.json"])
+		self.assertEqual(precompressor.variantPaths(), {"documents/a.txt.gz", "kontakte.json.gz"})
+
+
+if __name__ == "__main__":
+	unittest.main()
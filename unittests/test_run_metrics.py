@@ -0,0 +1,81 @@
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	# Importpfad erweitern dass scripts.run_metrics auch beim direkten Teststart gefunden wird
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import scripts.run_metrics as run_metrics
+
+
+class RunMetricsTests(unittest.TestCase):
+	def _metrics(self):
+		clock = [10.0]
+		metrics = run_metrics.RunMetrics(clock=lambda: clock[0])
+		metrics.started_at = 1700000000.123
+		return metrics, clock
+
+	# Perzentile und Phasen
+	def test_percentile_interpolates_between_samples(self):
+		samples = [0.4, 0.1, 0.3, 0.2]
+		self.assertAlmostEqual(run_metrics.percentile(samples, 0.5), 0.25)
+		self.assertAlmostEqual(run_metrics.percentile(samples, 1.0), 0.4)
+		self.assertEqual(run_metrics.percentile([], 0.95), 0.0)
+		summary = run_metrics.latencySummary(samples)
+		self.assertEqual((summary["count"], summary["max"]), (4, 0.4))
+		self.assertAlmostEqual(summary["p99"], 0.397)
+
+	def test_laps_close_consecutive_phases_and_summary_reports_throughput(self):
+		metrics, clock = self._metrics()
+		clock[0] = 12.0
+		metrics.lap("crawl")
+		metrics.addPhase("parse", 0.5)
+		clock[0] = 15.0
+		metrics.lap("revalidate")
+		clock[0] = 16.0
+		metrics.lap("download")
+		# Bytes aus bedingten GETs der Prüf-Phase und aus der Download-Phase
+		metrics.add("download_bytes", 1500)
+		metrics.add("download_bytes", 500)
+
+		summary = metrics.summary({"downloaded": 2}, {"requests": 3, "bytes_received": 2100}, [0.1, 0.2, 0.3], {"example.org": 1}, True)
+
+		self.assertEqual(summary["phases"], {"crawl": 2.0, "download": 1.0, "parse": 0.5, "revalidate": 3.0})
+		self.assertEqual(summary["duration_seconds"], 6.0)
+		self.assertEqual(summary["throughput"]["download_bytes_per_second"], 500.0)
+		self.assertEqual(summary["throughput"]["http_bytes_received"], 2100)
+		self.assertAlmostEqual(summary["http"]["latency_seconds"]["p50"], 0.2)
+		self.assertEqual(summary["errors_by_host"], {"example.org": 1})
+
+	# Export als JSON und Prometheus-Textformat
+	def test_export_writes_json_and_textfile(self):
+		metrics, clock = self._metrics()
+		clock[0] = 11.0
+		metrics.lap("crawl")
+		summary = metrics.summary({"failed": 1}, {"requests": 2}, [0.1, 0.3], {'host"x': 2}, False)
+
+		with tempfile.TemporaryDirectory() as tmp:
+			json_path = Path(tmp) / "metrics.json"
+			textfile = Path(tmp) / "prom" / "metrics.prom"
+			run_metrics.exportMetrics(summary, json_path, textfile)
+
+			self.assertEqual(json.loads(json_path.read_text(encoding="utf-8"))["phases"], {"crawl": 1.0})
+			text = textfile.read_text(encoding="utf-8")
+			self.assertEqual(sorted(path.name for path in textfile.parent.iterdir()), ["metrics.prom"])
+
+		lines = text.splitlines()
+		self.assertIn("# TYPE dhbw_dokumente_http_request_duration_seconds summary", lines)
+		self.assertIn('dhbw_dokumente_http_request_duration_seconds{quantile="0.5"} 0.2', lines)
+		self.assertIn("dhbw_dokumente_http_request_duration_seconds_count 2.0", lines)
+		self.assertIn("dhbw_dokumente_last_run_timestamp_seconds 1700000000.123", lines)
+		self.assertIn("dhbw_dokumente_last_run_success 0.0", lines)
+		self.assertIn('dhbw_dokumente_http_errors{host="host\\"x"} 2.0', lines)
+		self.assertIn('dhbw_dokumente_documents{state="failed"} 1.0', lines)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -1,6 +1,11 @@
+import json
+import os
 import sys
 import tempfile
+import threading
+import time
 import unittest
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -15,8 +20,9 @@ import scripts.scraper_dokumente as scraper
 
 # Kleine Response-Attrappe für Download-, HEAD- und HTML-Tests
 class _FakeResponse:
-	def __init__(self, text="", headers=None, chunks=None, raise_error: Exception | None = None):
+	def __init__(self, text="", headers=None, chunks=None, raise_error: Exception | None = None, status_code=200):
 		# text für HTML-Tests, headers für HEAD/GET Metadaten, chunks für Datei-Streaming
+		self.status_code = status_code
 		self.text = text
 		self.headers = headers or {}
 		self._chunks = chunks or []
@@ -28,8 +34,10 @@ class _FakeResponse:
 			raise self._raise_error
 
 	def iter_content(self, chunk_size=8192):
-		# Liefert die vorbereiteten Chunks wie requests.iter_content
+		# Liefert die vorbereiteten Chunks wie requests.iter_content, Exceptions simulieren Abbrüche
 		for chunk in self._chunks:
+			if isinstance(chunk, Exception):
+				raise chunk
 			yield chunk
 
 	def __enter__(self):
@@ -51,6 +59,7 @@ class _FakeSession:
 
 	def get(self, url, **kwargs):
 		# Gibt entweder eine Response zurück oder wirft den gewünschten Fehler
+		self.last_get_kwargs = kwargs
 		if self._get_error:
 			raise self._get_error
 		return self._get_response
@@ -62,6 +71,40 @@ class _FakeSession:
 		return self._head_response
 
 
+@contextmanager
+def _redirected_data_dir(data_dir: Path):
+	# Alle Datenpfade des Scrapers zeigen während des Tests auf ein temporäres Verzeichnis
+	paths = {
+		"DATA_DIR": data_dir,
+		"DOCUMENTS_DIR": data_dir / "documents",
+		"METADATA_FILE": data_dir / "dokumente_metadata.json",
+		"PAGE_CACHE_FILE": data_dir / "dokumente_page_cache.json",
+		"BLOBS_DIR": data_dir / "blobs",
+		"METADATA_DB_FILE": data_dir / "dokumente_metadata.sqlite",
+		"JOURNAL_FILE": data_dir / "dokumente_journal.jsonl",
+		"CHANGES_FILE": data_dir / "dokumente_changes.jsonl",
+		"CHANGES_INDEX_FILE": data_dir / "dokumente_changes.idx",
+		"DAEMON_SCHEDULE_FILE": data_dir / "dokumente_schedule.json",
+		"HTTP_CACHE_DIR": data_dir / "http_cache",
+		"QUARANTINE_DIR": data_dir / "quarantine",
+		"DOCUMENTS_INDEX_FILE": data_dir / "documents_index.json",
+		"SEARCH_INDEX_DIR": data_dir / "search_index",
+		"THUMBNAILS_DIR": data_dir / "thumbnails",
+		"PRECOMPRESS_MANIFEST_FILE": data_dir / "precompressed_manifest.json",
+		"METRICS_FILE": data_dir / "dokumente_metrics.json",
+		"METRICS_TEXTFILE": data_dir / "dokumente_metrics.prom",
+		"PLAN_FILE": data_dir / "dokumente_plan.json",
+	}
+	original = {name: getattr(scraper, name) for name in paths}
+	try:
+		for name, value in paths.items():
+			setattr(scraper, name, value)
+		yield
+	finally:
+		for name, value in original.items():
+			setattr(scraper, name, value)
+
+
 class ScraperDokumenteTests(unittest.TestCase):
 	# Basistests für Zeitformat und einfache Hilfsfunktionen
 	def test_now_iso_is_valid_datetime(self):
@@ -161,6 +204,12 @@ class ScraperDokumenteTests(unittest.TestCase):
 	def test_is_document_url_fileadmin_without_extension(self):
 		self.assertTrue(scraper.is_document_url("https://example.org/fileadmin/something/noext"))
 
+	def test_internal_documents_page_follows_base_url(self):
+		self.assertTrue(scraper.isInternalDocumentsPage(scraper.BASE_URL + "/?tab=2"))
+		with patch("scripts.scraper_dokumente.BASE_URL", "http://127.0.0.1:8123/service-einrichtungen/dokumente-downloads"):
+			self.assertTrue(scraper.isInternalDocumentsPage("http://127.0.0.1:8123/service-einrichtungen/dokumente-downloads?tab=2"))
+			self.assertFalse(scraper.isInternalDocumentsPage("https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"))
+
 	def test_collect_tab_mapping_detects_bekanntmachung(self):
 		soup = scraper.BeautifulSoup(
 			"""
@@ -760,6 +809,1033 @@ class ScraperDokumenteTests(unittest.TestCase):
 				scraper.DOCUMENTS_DIR = original_documents_dir
 				scraper.METADATA_FILE = original_metadata_file
 
+	# Paralleles HEAD-Probing vor der Download-Schleife
+	def test_probe_head_metadata_dedupes_urls(self):
+		calls = []
+
+		def fake_head(_session, url):
+			calls.append(url)
+			return {"content_length": str(len(url)), "last_modified": "", "etag": "", "content_type": ""}
+
+		docs = [
+			scraper.SourceDocument("k1", "https://e.org/a.pdf", "A", "", "Top", "Sub"),
+			scraper.SourceDocument("k2", "https://e.org/a.pdf", "A", "", "Andere", "Sub"),
+			scraper.SourceDocument("k3", "https://e.org/b.pdf", "B", "", "Top", "Sub"),
+		]
+		with patch("scripts.scraper_dokumente.headMetadata", side_effect=fake_head):
+			heads = scraper.probeHeadMetadata(object(), docs)
+
+		# Dieselbe URL aus zwei Tabs darf nur einmal abgefragt werden
+		self.assertEqual(sorted(calls), ["https://e.org/a.pdf", "https://e.org/b.pdf"])
+		self.assertEqual(heads["https://e.org/a.pdf"]["content_length"], str(len("https://e.org/a.pdf")))
+
+	def test_probe_head_metadata_respects_per_host_limit(self):
+		lock = threading.Lock()
+		active = {"now": 0, "max": 0}
+
+		def fake_head(_session, url):
+			with lock:
+				active["now"] += 1
+				active["max"] = max(active["max"], active["now"])
+			time.sleep(0.02)
+			with lock:
+				active["now"] -= 1
+			return {}
+
+		docs = [
+			scraper.SourceDocument(f"k{i}", f"https://e.org/{i}.pdf", "T", "", "Top", "")
+			for i in range(12)
+		]
+		with patch("scripts.scraper_dokumente.headMetadata", side_effect=fake_head):
+			heads = scraper.probeHeadMetadata(object(), docs, max_workers=8, per_host=3)
+
+		self.assertEqual(len(heads), 12)
+		self.assertLessEqual(active["max"], 3)
+		self.assertGreater(active["max"], 1)
+
+	# Paralleler Crawl mit Frontier aus deque und Set
+	def test_crawl_all_documents_parallel_matches_serial_order(self):
+		start = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
+		page_a = start + "?page=a"
+		page_b = start + "?page=b"
+		page_c = start + "?page=c"
+		links = {start: {page_b, page_a}, page_a: {page_c, page_b}, page_b: {page_c}, page_c: set()}
+		fetched = []
+
+		def fake_fetch(_session, page_url):
+			fetched.append(page_url)
+			return page_url
+
+		def fake_extract(page_url, html):
+			# Alle Seiten liefern denselben Key, die zuletzt ausgewertete Seite gewinnt wie beim seriellen Crawl
+			doc = scraper.SourceDocument("k", "u", "t", page_url, "c", "s")
+			return [doc], {"k"}, links[page_url]
+
+		with patch("scripts.scraper_dokumente.fetchPageHtml", side_effect=fake_fetch), \
+			 patch("scripts.scraper_dokumente.extractDocumentsFromHtml", side_effect=fake_extract):
+			docs, keys = scraper.crawlAllDocuments(object(), start, max_workers=3)
+
+		self.assertEqual(sorted(fetched), sorted([start, page_a, page_b, page_c]))
+		self.assertEqual(keys, {"k"})
+		self.assertEqual(docs[0].description, page_c)
+
+		# Ungültige Worker-Zahlen laufen seriell statt ohne eingereihte Seite abzubrechen
+		with patch("scripts.scraper_dokumente.fetchPageHtml", side_effect=fake_fetch), \
+			 patch("scripts.scraper_dokumente.extractDocumentsFromHtml", side_effect=fake_extract):
+			serial_docs, serial_keys = scraper.crawlAllDocuments(object(), start, max_workers=0)
+		self.assertEqual((serial_docs, serial_keys), (docs, keys))
+
+	def test_crawl_all_documents_skips_failed_follow_page(self):
+		start = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
+		broken = start + "?page=x"
+
+		def fake_fetch(_session, page_url):
+			if page_url == broken:
+				raise RuntimeError("timeout")
+			return page_url
+
+		def fake_extract(page_url, html):
+			return [scraper.SourceDocument("k1", "u1", "t", "", "c", "")], {"k1"}, {broken}
+
+		with patch("scripts.scraper_dokumente.fetchPageHtml", side_effect=fake_fetch), \
+			 patch("scripts.scraper_dokumente.extractDocumentsFromHtml", side_effect=fake_extract):
+			docs, keys = scraper.crawlAllDocuments(object(), start)
+
+		self.assertEqual([doc.entry_key for doc in docs], ["k1"])
+		self.assertEqual(keys, {"k1"})
+
+	# Bedingte GETs ersetzen HEAD plus GET bei bekannten Validatoren
+	def test_download_file_conditional_not_modified(self):
+		response = _FakeResponse(headers={"ETag": '"v2"'}, status_code=304)
+		session = _FakeSession(get_response=response)
+		old = {"etag": '"v1"', "last_modified": "Mon", "content_length": "3", "content_type": "application/pdf"}
+		with tempfile.TemporaryDirectory() as tmp:
+			dest = Path(tmp) / "a.pdf"
+			dest.write_bytes(b"abc")
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", dest, validators=old)
+			self.assertTrue(result.ok)
+			self.assertTrue(result.not_modified)
+			self.assertEqual(dest.read_bytes(), b"abc")
+
+		sent = session.last_get_kwargs["headers"]
+		self.assertEqual(sent["If-None-Match"], '"v1"')
+		self.assertEqual(sent["If-Modified-Since"], "Mon")
+		# Neue Validatoren aus der 304-Antwort ersetzen die alten, der Rest bleibt erhalten
+		self.assertEqual(result.headers["etag"], '"v2"')
+		self.assertEqual(result.headers["content_length"], "3")
+
+	def test_download_file_conditional_changed_returns_headers(self):
+		response = _FakeResponse(
+			headers={"Content-Type": "application/pdf", "ETag": '"v2"', "Content-Length": "4"},
+			chunks=[b"abcd"],
+		)
+		session = _FakeSession(get_response=response)
+		with tempfile.TemporaryDirectory() as tmp:
+			dest = Path(tmp) / "a.pdf"
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", dest, validators={"etag": '"v1"'})
+			self.assertTrue(result.ok)
+			self.assertFalse(result.not_modified)
+			self.assertEqual(result.headers["etag"], '"v2"')
+			self.assertEqual(dest.read_bytes(), b"abcd")
+
+	def test_main_uses_conditional_get_instead_of_head(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			documents_dir = data_dir / "documents"
+			local = documents_dir / "Top" / "Sub" / "a.pdf"
+			local.parent.mkdir(parents=True)
+			local.write_bytes(b"abc")
+
+			doc = scraper.SourceDocument("k", "https://example.org/a.pdf", "Titel", "desc", "Top", "Sub")
+			old_entry = {
+				"entry_key": "k",
+				"url": doc.url,
+				"title": "Titel",
+				"description": "desc",
+				"category_top": "Top",
+				"category_sub": "Sub",
+				"local_path": "documents/Top/Sub/a.pdf",
+				"etag": '"v1"',
+				"sha256": "h",
+			}
+			not_modified = scraper.DownloadResult(ok=True, not_modified=True, headers={"etag": '"v1"'})
+
+			with _redirected_data_dir(data_dir):
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.loadMetadata", return_value={"documents": [old_entry]}), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=([doc], {"k"})), \
+					 patch("scripts.scraper_dokumente.headMetadata") as head_mock, \
+					 patch("scripts.scraper_dokumente.downloadFile", return_value=not_modified) as download_mock:
+					exit_code = scraper.main()
+
+				self.assertEqual(exit_code, 0)
+				head_mock.assert_not_called()
+				self.assertEqual(download_mock.call_args.kwargs["validators"], old_entry)
+				saved = scraper.loadMetadata()
+				self.assertEqual(saved["documents"][0]["sha256"], "h")
+
+	def test_failed_revalidation_keeps_file_entry_and_blob(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			local = data_dir / "documents" / "Top" / "Sub" / "a.pdf"
+			local.parent.mkdir(parents=True)
+			local.write_bytes(b"abc")
+			sha = scraper.hashlib.sha256(b"abc").hexdigest()
+			doc = scraper.SourceDocument("k", "https://example.org/a.pdf", "Titel", "desc", "Top", "Sub")
+			old_entry = {
+				"entry_key": "k", "url": doc.url, "title": "Titel", "description": "desc",
+				"category_top": "Top", "category_sub": "Sub", "local_path": "documents/Top/Sub/a.pdf",
+				"etag": '"v1"', "sha256": sha, "downloaded_at": "2026-01-01T00:00:00+00:00",
+			}
+			timeout = scraper.DownloadResult(ok=False, error="Read timed out")
+
+			with _redirected_data_dir(data_dir):
+				scraper.storeBlob(local, sha)
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.loadMetadata", return_value={"documents": [old_entry]}), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=([doc], {"k"})), \
+					 patch("scripts.scraper_dokumente.downloadFile", return_value=timeout):
+					exit_code = scraper.main([])
+
+				self.assertEqual(exit_code, 1)
+				self.assertEqual(local.read_bytes(), b"abc")
+				self.assertTrue(scraper.blobPath(sha).is_file())
+				saved = json.loads(scraper.METADATA_FILE.read_text(encoding="utf-8"))
+				self.assertEqual(saved["documents"], [old_entry])
+				self.assertEqual(scraper.ChangeFeed().lastSeq(), 0)
+
+	def test_empty_crawl_keeps_blob_store(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			local = data_dir / "documents" / "Top" / "a.pdf"
+			local.parent.mkdir(parents=True)
+			local.write_bytes(b"abc")
+			sha = scraper.hashlib.sha256(b"abc").hexdigest()
+
+			with _redirected_data_dir(data_dir):
+				scraper.storeBlob(local, sha)
+				# Ein leerer Crawl (Layoutänderung, Seite nicht erreichbar) darf den Blob-Speicher nicht leeren
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=([], set())):
+					scraper.main([])
+
+				self.assertTrue(scraper.blobPath(sha).is_file())
+
+	def test_main_exports_run_metrics(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			textfile = Path(tmp) / "textfile" / "dokumente.prom"
+			doc = scraper.SourceDocument("k", "https://example.org/a.pdf", "Titel", "desc", "Top", "Sub")
+
+			def download(session, url, destination, **kwargs):
+				destination.parent.mkdir(parents=True, exist_ok=True)
+				destination.write_bytes(b"abcd")
+				return scraper.DownloadResult(ok=True, headers={}, sha256="a" * 64, size=4, hash_seconds=0.5)
+
+			with _redirected_data_dir(data_dir):
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=([doc], {"k"})), \
+					 patch("scripts.scraper_dokumente.headMetadata", return_value={}), \
+					 patch("scripts.scraper_dokumente.downloadFile", side_effect=download):
+					exit_code = scraper.main(["--metrics-textfile", str(textfile)])
+
+				self.assertEqual(exit_code, 0)
+				summary = json.loads((data_dir / "dokumente_metrics.json").read_text(encoding="utf-8"))
+				self.assertTrue(summary["success"])
+				self.assertEqual(summary["phases"]["hash"], 0.5)
+				self.assertTrue({"crawl", "download", "save", "search_index"} <= set(summary["phases"]))
+				self.assertEqual(summary["throughput"]["download_bytes"], 4)
+				self.assertEqual(summary["documents"]["downloaded"], 1)
+				self.assertIn('dhbw_dokumente_phase_duration_seconds{phase="download"}', textfile.read_text(encoding="utf-8"))
+
+	def test_http_cache_revalidates_responses_without_explicit_freshness(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			session = scraper.buildSession(http_cache_dir=Path(tmp))
+			cache = session.get_adapter("https://").cache
+			cache._clock = lambda: 1010.0
+			date = "Thu, 01 Jan 1970 00:16:40 GMT"
+			# Nur Last-Modified ergäbe heuristisch 100 Sekunden Frische, der Eintrag ist 10 Sekunden alt
+			heuristic = {"status": 200, "stored_at": 1000.0, "headers": {"Date": date, "Last-Modified": "Thu, 01 Jan 1970 00:00:00 GMT"}}
+			explicit = {"status": 200, "stored_at": 1000.0, "headers": {"Date": date, "Cache-Control": "max-age=60"}}
+			request = session.prepare_request(scraper.requests.Request("GET", "https://example.org/seite"))
+
+			self.assertNotIn("Cache-Control", request.headers)
+			self.assertFalse(cache.isFresh(heuristic, request))
+			# Frische-Angaben des Servers bedienen wiederholte Läufe weiter aus dem Cache
+			self.assertTrue(cache.isFresh(explicit, request))
+
+	def test_main_replays_from_archive_without_rate_limit(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			archive = Path(tmp) / "archiv.zip"
+			with self.assertRaises(SystemExit):
+				with patch("sys.stderr"):
+					scraper.parseArguments(["--record", str(archive), "--replay", str(archive)])
+			self.assertEqual(scraper.main(["--replay", str(archive)]), 1)
+
+			recording = scraper.buildSession(record_path=archive)
+			recording.close()
+			with _redirected_data_dir(Path(tmp) / "data"):
+				with patch("scripts.scraper_dokumente.runScrape", return_value=scraper.ScrapeResult(0)) as run_mock:
+					self.assertEqual(scraper.main(["--replay", str(archive)]), 0)
+			adapter = run_mock.call_args.args[1].get_adapter("https://")
+			self.assertIsInstance(adapter, scraper.http_client.ReplayAdapter)
+			self.assertNotIsInstance(adapter, scraper.RateLimitedAdapter)
+
+	# Trockenlauf mit Plan
+	def test_plan_lists_actions_with_estimated_bytes_without_downloading(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			for name in ("same.pdf", "changed.pdf"):
+				local = data_dir / "documents" / "Top" / name
+				local.parent.mkdir(parents=True, exist_ok=True)
+				local.write_bytes(b"abc")
+			docs = [
+				scraper.SourceDocument("same", "https://example.org/same.pdf", "Gleich", "d", "Top", ""),
+				scraper.SourceDocument("changed", "https://example.org/changed.pdf", "Neu", "d", "Top", ""),
+				scraper.SourceDocument("new", "https://example.org/new.pdf", "Neu", "d", "Top", ""),
+				scraper.SourceDocument("new-copy", "https://example.org/new.pdf", "Kopie", "d", "Andere", ""),
+			]
+			old_entries = [
+				{
+					"entry_key": key, "url": f"https://example.org/{key}.pdf", "title": title, "description": "d",
+					"category_top": "Top", "category_sub": "", "local_path": f"documents/Top/{key}.pdf",
+					"etag": '"v1"', "content_length": "3",
+				}
+				for key, title in (("same", "Gleich"), ("changed", "Neu"), ("gone", "Weg"))
+			]
+			heads = {
+				"https://example.org/same.pdf": {"etag": '"v1"', "content_length": "3"},
+				"https://example.org/changed.pdf": {"etag": '"v2"', "content_length": "5000"},
+				"https://example.org/new.pdf": {"etag": '"n"', "content_length": "1000"},
+			}
+			plan_file = Path(tmp) / "plan.json"
+
+			with _redirected_data_dir(data_dir):
+				scraper.saveMetadata({"documents": old_entries})
+				metadata_before = scraper.METADATA_FILE.read_bytes()
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=(docs, {doc.entry_key for doc in docs})), \
+					 patch("scripts.scraper_dokumente.headMetadata", side_effect=lambda session, url: heads[url]) as head_mock, \
+					 patch("scripts.scraper_dokumente.downloadFile") as download_mock, \
+					 patch("scripts.scraper_dokumente.savePageCache") as save_cache_mock:
+					exit_code = scraper.main(["--plan", str(plan_file)])
+
+				self.assertEqual(exit_code, 0)
+				download_mock.assert_not_called()
+				save_cache_mock.assert_not_called()
+				self.assertEqual(head_mock.call_count, 3)
+				self.assertEqual(scraper.METADATA_FILE.read_bytes(), metadata_before)
+				self.assertFalse(scraper.DOCUMENTS_INDEX_FILE.exists())
+
+			plan = json.loads(plan_file.read_text(encoding="utf-8"))
+			self.assertEqual(
+				{action: [item["entry_key"] for item in plan[action]] for action in ("download", "update", "remove", "unchanged")},
+				{"download": ["new", "new-copy"], "update": ["changed"], "remove": ["gone"], "unchanged": ["same"]},
+			)
+			self.assertEqual(plan["update"][0]["reason"], "content_length")
+			# Die doppelt verlinkte URL wird nur einmal übertragen
+			self.assertEqual(plan["summary"]["transfers"], 2)
+			self.assertEqual(plan["summary"]["estimated_bytes"], 6000)
+			self.assertEqual(plan["summary"]["removed_bytes"], 3)
+
+	# Daemon-Betrieb mit adaptivem Prüfplan pro Kategorie
+	def test_run_scrape_keeps_deferred_categories_without_requests(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			old_entries = []
+			docs = []
+			for key, category in (("k1", "Selten"), ("k2", "Oft")):
+				local = data_dir / "documents" / category / f"{key}.pdf"
+				local.parent.mkdir(parents=True)
+				local.write_bytes(b"abc")
+				docs.append(scraper.SourceDocument(key, f"https://example.org/{key}.pdf", key, "d", category, ""))
+				old_entries.append({
+					"entry_key": key, "url": docs[-1].url, "title": key, "description": "d",
+					"category_top": category, "category_sub": "", "local_path": f"documents/{category}/{key}.pdf",
+					"etag": '"v1"', "content_type": "application/pdf", "sha256": "h", "filename": f"{key}.pdf",
+				})
+			not_modified = scraper.DownloadResult(ok=True, not_modified=True, headers={"etag": '"v1"', "content_type": "application/pdf"})
+			args = scraper.parseArguments([])
+			page_cache = {"https://example.org/": {}}
+
+			with _redirected_data_dir(data_dir):
+				with patch("scripts.scraper_dokumente.loadMetadata", return_value={"documents": old_entries}), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=(docs, {"k1", "k2"})) as crawl_mock, \
+					 patch("scripts.scraper_dokumente.loadPageCache") as load_cache_mock, \
+					 patch("scripts.scraper_dokumente.downloadFile", return_value=not_modified) as download_mock:
+					result = scraper.runScrape(args, object(), page_cache=page_cache, deferred_categories={"Selten"})
+
+				self.assertEqual(result.exit_code, 0)
+				self.assertEqual(result.categories, {"Selten", "Oft"})
+				self.assertEqual(result.changed_categories, set())
+				load_cache_mock.assert_not_called()
+				self.assertIs(crawl_mock.call_args.kwargs["page_cache"], page_cache)
+				self.assertEqual([call.args[1] for call in download_mock.call_args_list], ["https://example.org/k2.pdf"])
+				saved = {entry["entry_key"]: entry for entry in scraper.loadMetadata()["documents"]}
+				self.assertEqual(saved["k1"]["etag"], '"v1"')
+				self.assertEqual(saved["k1"]["content_type"], "application/pdf")
+
+	def test_schedule_adapts_intervals_to_observed_changes(self):
+		schedule = {}
+		now = 1_000_000.0
+		first = scraper.ScrapeResult(0, categories={"Oft", "Selten"}, changed_categories={"Oft"})
+		scraper.updateSchedule(schedule, first, set(), now)
+
+		initial = scraper.DAEMON_INITIAL_INTERVAL_SECONDS
+		self.assertEqual(schedule["Oft"]["interval_seconds"], initial * scraper.DAEMON_SPEEDUP_FACTOR)
+		self.assertEqual(schedule["Selten"]["interval_seconds"], initial * scraper.DAEMON_BACKOFF_FACTOR)
+		self.assertEqual(scraper.deferredCategories(schedule, now + 1), {"Oft", "Selten"})
+		self.assertEqual(scraper.deferredCategories(schedule, now + initial), {"Selten"})
+		self.assertEqual(scraper.nextRunAt(schedule, now), now + initial * scraper.DAEMON_SPEEDUP_FACTOR)
+
+		# Eine nicht fällige Kategorie bleibt unverändert, außer es tauchen neue Dokumente auf
+		later = now + initial
+		second = scraper.ScrapeResult(0, categories={"Selten", "Neu"}, changed_categories={"Neu"})
+		before = dict(schedule["Selten"])
+		scraper.updateSchedule(schedule, second, {"Selten"}, later)
+		self.assertEqual(schedule["Selten"], before)
+		self.assertNotIn("Oft", schedule)
+		self.assertEqual(schedule["Neu"]["changes"], 1)
+
+		for _ in range(40):
+			scraper.updateSchedule(schedule, scraper.ScrapeResult(0, categories={"Selten"}), set(), later)
+		self.assertEqual(schedule["Selten"]["interval_seconds"], scraper.DAEMON_MAX_INTERVAL_SECONDS)
+		self.assertEqual(scraper.nextRunAt(schedule, later), later + scraper.DAEMON_PAGE_INTERVAL_SECONDS)
+
+	def test_daemon_reuses_session_and_writes_plan(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			session = object()
+			results = [
+				scraper.ScrapeResult(0, categories={"A", "B"}, changed_categories={"A"}),
+				scraper.ScrapeResult(1, categories={"A", "B"}),
+			]
+			with _redirected_data_dir(data_dir):
+				with patch("scripts.scraper_dokumente.buildSession", return_value=session) as session_mock, \
+					 patch("scripts.scraper_dokumente.loadPageCache", return_value={}), \
+					 patch("scripts.scraper_dokumente.DAEMON_PAGE_INTERVAL_SECONDS", 0.0), \
+					 patch("scripts.scraper_dokumente.runScrape", side_effect=results) as run_mock:
+					exit_code = scraper.main(["--daemon", "--max-cycles", "2", "--resume"])
+
+				self.assertEqual(exit_code, 0)
+				session_mock.assert_called_once()
+				first, second = run_mock.call_args_list
+				self.assertIs(second.args[1], session)
+				self.assertIs(first.kwargs["page_cache"], second.kwargs["page_cache"])
+				self.assertEqual(first.kwargs["deferred_categories"], set())
+				self.assertEqual(second.kwargs["deferred_categories"], {"A", "B"})
+				self.assertFalse(second.args[0].resume)
+				plan = scraper.json.loads(scraper.DAEMON_SCHEDULE_FILE.read_text(encoding="utf-8"))
+				self.assertEqual(sorted(plan["categories"]), ["A", "B"])
+				self.assertEqual(plan["categories"]["B"]["checks"], 1)
+				self.assertIn("next_run_at", plan)
+
+	# Seiten-Cache mit Validatoren und gespeicherten Extraktionsergebnissen
+	def test_crawl_with_page_cache_skips_parsing_on_304(self):
+		start = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
+		html = """
+		<ul class='nav nav-tabs'><li class='nav-link' id='s'><a data-href='#t1'>Studium</a></li></ul>
+		<div id='t1'><h2>Sub</h2><a href='/fileadmin/docs/a.pdf'>Dok A</a></div>
+		"""
+		first = _FakeSession(get_response=_FakeResponse(text=html, headers={"ETag": '"p1"'}))
+		page_cache = {}
+		docs, keys = scraper.crawlAllDocuments(first, start, page_cache=page_cache)
+		self.assertEqual(page_cache[start]["etag"], '"p1"')
+
+		second = _FakeSession(get_response=_FakeResponse(status_code=304))
+		with patch("scripts.scraper_dokumente.extractDocumentsFromHtml") as extract_mock:
+			cached_docs, cached_keys = scraper.crawlAllDocuments(second, start, page_cache=page_cache)
+
+		extract_mock.assert_not_called()
+		self.assertEqual(second.last_get_kwargs["headers"]["If-None-Match"], '"p1"')
+		self.assertEqual(cached_docs, docs)
+		self.assertEqual(cached_keys, keys)
+
+	def test_extract_documents_cached_reuses_result_for_same_body(self):
+		url = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
+		html = "<ul class='nav nav-tabs'><li class='nav-link'><a data-href='#t'>A</a></li></ul><div id='t'><a href='/x.pdf'>X</a></div>"
+		page_cache = {}
+		docs, _, _ = scraper.extractDocumentsCached(url, html, {}, page_cache)
+		with patch("scripts.scraper_dokumente.extractDocumentsFromHtml") as extract_mock:
+			again, _, _ = scraper.extractDocumentsCached(url, html, {"etag": '"neu"'}, page_cache)
+		extract_mock.assert_not_called()
+		self.assertEqual(again, docs)
+		self.assertEqual(page_cache[url]["etag"], '"neu"')
+
+	def test_load_page_cache_discards_other_version(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			original = scraper.PAGE_CACHE_FILE
+			scraper.PAGE_CACHE_FILE = Path(tmp) / "cache.json"
+			try:
+				scraper.savePageCache({"u": {"etag": "x"}})
+				self.assertEqual(scraper.loadPageCache(), {"u": {"etag": "x"}})
+				scraper.PAGE_CACHE_FILE.write_text('{"version": -1, "pages": {"u": {}}}', encoding="utf-8")
+				self.assertEqual(scraper.loadPageCache(), {})
+			finally:
+				scraper.PAGE_CACHE_FILE = original
+
+	# Einmaliger Durchlauf pro Tab liefert dieselben Werte wie die Einzelsuche pro Link
+	def _build_large_documents_page(self, sections=40):
+		blocks = []
+		for i in range(sections):
+			heading = "<h2></h2>" if i % 7 == 0 else f"<h{2 + i % 2}>Abschnitt {i}</h{2 + i % 2}>"
+			blocks.append(heading)
+			blocks.append(
+				"<ul>"
+				f"<li><a href='/fileadmin/d/{i}a.pdf' title='A {i}'>A {i}</a><div class='ce-uploads-description x'>Beschreibung {i}</div></li>"
+				f"<li><span><a href='/fileadmin/d/{i}b.pdf'>B {i}</a></span><ul><li><div class='ce-uploads-description'>Innen {i}</div></li></ul></li>"
+				f"<li><a href='/fileadmin/d/{i}c.docx'>C {i}</a></li>"
+				"</ul>"
+			)
+			blocks.append(f"<a href='/fileadmin/d/{i}d.pdf'>D {i}</a><span>x</span><div class='ce-uploads-description'>Geschwister {i}</div>")
+			blocks.append(f"<p><a href='/fileadmin/d/{i}e.xlsx'>E {i}</a> Hinweis zum Formular {i}</p>")
+			blocks.append(f"<div><a href='/fileadmin/d/{i}f.pdf'>F {i}</a> ok</div><a href='#top'>nach oben</a>")
+		return (
+			"<html><body><h2>Vor dem Tab</h2>"
+			"<ul class='nav nav-tabs'><li class='nav-link' id='s'><a data-href='#t1'>Studium</a></li></ul>"
+			f"<div id='t1'>{''.join(blocks)}</div></body></html>"
+		)
+
+	def test_scan_pane_links_matches_per_link_lookup(self):
+		soup = scraper.BeautifulSoup(self._build_large_documents_page(), "html.parser")
+		pane = soup.find("div", id="t1")
+		expected = [
+			(link, scraper.nearestSubHeading(link, pane), scraper.extractDescription(link))
+			for link in pane.find_all("a", href=True)
+		]
+		self.assertEqual(scraper.scanPaneLinks(pane), expected)
+		self.assertGreater(len(expected), 200)
+
+	def test_extract_documents_from_html_large_page(self):
+		html = self._build_large_documents_page(sections=60)
+		docs, keys, _ = scraper.extractDocumentsFromHtml(
+			"https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads",
+			html,
+		)
+		self.assertEqual(len(docs), 60 * 6)
+		self.assertEqual(len(keys), 60 * 6)
+		by_title = {doc.title: doc for doc in docs}
+		self.assertEqual(by_title["A 1"].description, "Beschreibung 1")
+		self.assertEqual(by_title["B 1"].description, "Innen 1")
+		self.assertEqual(by_title["D 1"].description, "Geschwister 1")
+		self.assertEqual(by_title["E 1"].description, "Hinweis zum Formular 1")
+		self.assertEqual(by_title["C 1"].category_sub, "Abschnitt 1")
+		# Leere Überschriften zählen nicht, die vorherige bleibt gültig
+		self.assertEqual(by_title["A 7"].category_sub, "Abschnitt 6")
+		self.assertEqual(by_title["A 0"].category_sub, "")
+
+	# Eingeschränktes Parsen und austauschbares Parser-Backend
+	def test_tab_strainer_keeps_only_tabs(self):
+		html = """
+		<html><body>
+		  <header><div id='kopf'><a href='/fileadmin/logo.png'>Logo</a></div></header>
+		  <ul class='nav nav-tabs'><li class='nav-link' id='s'><a data-href=' #t1 '>Studium</a></li></ul>
+		  <div id='t1'><h2>Sub</h2><a href='/fileadmin/a.pdf'>A</a></div>
+		  <footer><ul class='nav'><li>Impressum</li></ul></footer>
+		</body></html>
+		"""
+		soup = scraper.BeautifulSoup(html, "html.parser", parse_only=scraper.TabStrainer(html))
+		self.assertIsNotNone(soup.find("div", id="t1"))
+		self.assertIsNone(soup.find("div", id="kopf"))
+		self.assertIsNone(soup.find("footer"))
+		self.assertEqual(scraper.collectTabMapping(soup), [("t1", "Studium", False)])
+
+	def test_extract_documents_from_html_same_result_for_all_parsers(self):
+		html = self._build_large_documents_page(sections=10)
+		base = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
+		reference = scraper.extractDocumentsFromHtml(base, html, parser="html.parser")
+		self.assertEqual(len(reference[0]), 60)
+		self.assertEqual(scraper.extractDocumentsFromHtml(base, html), reference)
+		self.assertEqual(scraper.extractDocumentsFromHtml(base, html, tabs_only=True), reference)
+		try:
+			import lxml  # noqa: F401
+		except ImportError:
+			self.skipTest("lxml nicht installiert")
+		self.assertEqual(scraper.extractDocumentsFromHtml(base, html, parser="lxml"), reference)
+
+	def test_extract_documents_from_html_keeps_outer_li_description_by_default(self):
+		# Liegt der Tab in einem li, stammt die Beschreibung aus diesem Vorfahren
+		html = """
+		<ul class='nav nav-tabs'><li class='nav-link' id='s'><a data-href='#t1'>Studium</a></li></ul>
+		<ul><li><div class='ce-uploads-description'>Gilt für alle Ordnungen</div>
+		  <div id='t1'><h2>Sub</h2><a href='/fileadmin/a.pdf'>A</a></div>
+		</li></ul>
+		"""
+		base = "https://www.ravensburg.dhbw.de/service-einrichtungen/dokumente-downloads"
+		docs, _, _ = scraper.extractDocumentsFromHtml(base, html)
+		strained, _, _ = scraper.extractDocumentsFromHtml(base, html, tabs_only=True)
+
+		self.assertEqual(scraper.HTML_PARSER, "html.parser")
+		self.assertEqual(docs[0].description, "Gilt für alle Ordnungen")
+		# Der TabStrainer baut das umgebende li nicht auf und ist deshalb nur auf Wunsch aktiv
+		self.assertEqual(strained[0].description, "")
+
+	# Hash und Bytezahl entstehen beim Streamen
+	def test_download_file_hashes_while_streaming(self):
+		response = _FakeResponse(
+			headers={"Content-Type": "application/pdf", "Content-Length": "3"},
+			chunks=[b"a", b"", b"bc"],
+		)
+		session = _FakeSession(get_response=response)
+		with tempfile.TemporaryDirectory() as tmp:
+			dest = Path(tmp) / "a.pdf"
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", dest)
+			self.assertTrue(result.ok)
+			self.assertEqual(result.size, 3)
+			self.assertEqual(result.sha256, scraper.computeSha256(dest))
+			self.assertEqual(result.headers["content_type"], "application/pdf")
+
+	def test_download_file_detects_truncated_body(self):
+		response = _FakeResponse(
+			headers={"Content-Type": "application/pdf", "Content-Length": "10"},
+			chunks=[b"abc"],
+		)
+		session = _FakeSession(get_response=response)
+		with tempfile.TemporaryDirectory() as tmp:
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", Path(tmp) / "a.pdf")
+		self.assertFalse(result.ok)
+		self.assertIn("3 von 10", result.error)
+
+	# Atomare Downloads über Teildateien und Fortsetzen per Range
+	def test_download_file_interrupted_keeps_destination_and_partial(self):
+		response = _FakeResponse(
+			headers={"Content-Type": "application/pdf", "Content-Length": "6", "ETag": '"v2"'},
+			chunks=[b"abc", RuntimeError("timeout")],
+		)
+		session = _FakeSession(get_response=response)
+		with tempfile.TemporaryDirectory() as tmp:
+			dest = Path(tmp) / "a.pdf"
+			dest.write_bytes(b"alt")
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", dest)
+			part, state = scraper.partialPaths(dest)
+			self.assertFalse(result.ok)
+			# Die alte Datei bleibt vollständig erhalten, der Teil liegt für den nächsten Lauf bereit
+			self.assertEqual(dest.read_bytes(), b"alt")
+			self.assertEqual(part.read_bytes(), b"abc")
+			self.assertTrue(state.exists())
+
+	def test_download_file_resumes_with_range(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			dest = Path(tmp) / "a.pdf"
+			part, state = scraper.partialPaths(dest)
+			part.write_bytes(b"abc")
+			state.write_text('{"url": "https://example.org/a.pdf", "etag": "\\"v2\\"", "last_modified": ""}', encoding="utf-8")
+			response = _FakeResponse(
+				headers={"Content-Type": "application/pdf", "Content-Length": "3", "Content-Range": "bytes 3-5/6", "ETag": '"v2"'},
+				chunks=[b"def"],
+				status_code=206,
+			)
+			session = _FakeSession(get_response=response)
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", dest)
+
+			self.assertTrue(result.ok)
+			self.assertEqual(dest.read_bytes(), b"abcdef")
+			self.assertEqual(result.size, 6)
+			self.assertEqual(result.headers["content_length"], "6")
+			self.assertEqual(result.sha256, scraper.computeSha256(dest))
+			self.assertFalse(part.exists())
+			self.assertFalse(state.exists())
+			self.assertEqual(session.last_get_kwargs["headers"]["Range"], "bytes=3-")
+			self.assertEqual(session.last_get_kwargs["headers"]["If-Range"], '"v2"')
+
+	def test_download_file_restarts_when_server_ignores_range(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			dest = Path(tmp) / "a.pdf"
+			part, state = scraper.partialPaths(dest)
+			part.write_bytes(b"xyz")
+			state.write_text('{"url": "https://example.org/a.pdf", "etag": "", "last_modified": "Mon"}', encoding="utf-8")
+			response = _FakeResponse(headers={"Content-Type": "application/pdf"}, chunks=[b"neu"])
+			session = _FakeSession(get_response=response)
+			result = scraper.downloadFile(session, "https://example.org/a.pdf", dest)
+
+			self.assertTrue(result.ok)
+			self.assertEqual(dest.read_bytes(), b"neu")
+			self.assertEqual(session.last_get_kwargs["headers"]["If-Range"], "Mon")
+
+	# Inhaltsadressierter Blob-Speicher mit Hardlinks
+	def test_store_blob_links_identical_content(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			with _redirected_data_dir(Path(tmp)):
+				first = scraper.DOCUMENTS_DIR / "A" / "x.pdf"
+				second = scraper.DOCUMENTS_DIR / "B" / "x.pdf"
+				for path in (first, second):
+					path.parent.mkdir(parents=True)
+					path.write_bytes(b"gleich")
+				digest = scraper.computeSha256(first)
+
+				self.assertTrue(scraper.storeBlob(first, digest))
+				self.assertTrue(scraper.storeBlob(second, digest))
+
+				blob = scraper.blobPath(digest)
+				self.assertTrue(os.path.samefile(blob, first))
+				self.assertTrue(os.path.samefile(blob, second))
+				self.assertEqual(second.read_bytes(), b"gleich")
+
+				self.assertEqual(scraper.pruneBlobStore({digest}), 0)
+				self.assertEqual(scraper.pruneBlobStore(set()), 1)
+				self.assertTrue(first.exists())
+
+	def test_main_downloads_same_url_only_once(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			docs = [
+				scraper.SourceDocument("k1", "https://example.org/a.pdf", "A", "d", "Studium", ""),
+				scraper.SourceDocument("k2", "https://example.org/a.pdf", "A", "d", "Praxis", ""),
+			]
+
+			def fake_download(_session, url, destination, validators=None):
+				destination.parent.mkdir(parents=True, exist_ok=True)
+				destination.write_bytes(b"inhalt")
+				return scraper.DownloadResult(ok=True, headers={"etag": '"e"'}, sha256=scraper.hashlib.sha256(b"inhalt").hexdigest(), size=6)
+
+			with _redirected_data_dir(data_dir):
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=(docs, {"k1", "k2"})), \
+					 patch("scripts.scraper_dokumente.downloadFile", side_effect=fake_download) as download_mock, \
+					 patch("scripts.scraper_dokumente.send_new_without_description_notification", return_value=True), \
+					 patch("scripts.scraper_dokumente.time.sleep"):
+					exit_code = scraper.main()
+
+				self.assertEqual(exit_code, 0)
+				self.assertEqual(download_mock.call_count, 1)
+				first = data_dir / "documents" / "Studium" / "a.pdf"
+				second = data_dir / "documents" / "Praxis" / "a.pdf"
+				self.assertTrue(os.path.samefile(first, second))
+				saved = scraper.loadMetadata()
+				self.assertEqual({entry["sha256"] for entry in saved["documents"]}, {scraper.hashlib.sha256(b"inhalt").hexdigest()})
+				self.assertEqual(saved["change_seq"], 1)
+				self.assertEqual(scraper.ChangeFeed().since(0)[0]["added"], ["k1", "k2"])
+
+	def test_precompress_outputs_covers_metadata_and_text_documents(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			with _redirected_data_dir(data_dir):
+				csv_path = scraper.DOCUMENTS_DIR / "A" / "liste.csv"
+				csv_path.parent.mkdir(parents=True)
+				csv_path.write_text("Name;Raum\n" * 500, encoding="utf-8")
+				(scraper.DOCUMENTS_DIR / "A" / "a.pdf").write_bytes(b"%PDF" * 500)
+				documents = [
+					{"entry_key": "c", "local_path": "documents/A/liste.csv", "sha256": "1" * 64},
+					{"entry_key": "p", "local_path": "documents/A/a.pdf", "sha256": "2" * 64},
+				]
+				scraper.saveMetadata({"documents": documents * 20})
+				scraper.saveDocumentsIndex(scraper.buildDocumentsIndex({"documents": documents}))
+
+				stats = scraper.precompressOutputs(documents)
+
+				# Der kleine Index bleibt unkomprimiert, die PDF-Datei wird gar nicht betrachtet
+				self.assertEqual((stats["compressed"], stats["skipped"]), (2, 1))
+				self.assertTrue(scraper.METADATA_FILE.with_name("dokumente_metadata.json.gz").is_file())
+				self.assertFalse((scraper.DOCUMENTS_DIR / "A" / "a.pdf.gz").exists())
+				compressed = (scraper.DOCUMENTS_DIR / "A" / "liste.csv.gz").read_bytes()
+				self.assertEqual(scraper.precompress.gzip.decompress(compressed), csv_path.read_bytes())
+				self.assertEqual(scraper.precompressOutputs(documents)["unchanged"], 3)
+
+				# Varianten laut Manifest tauchen nicht als Dokumente auf, heruntergeladene Archive schon
+				(scraper.DOCUMENTS_DIR / "A" / "a.pdf.gz").write_bytes(b"gz")
+				(scraper.DOCUMENTS_DIR / "A" / "paket.gz").write_bytes(b"gz")
+				index = scraper.buildDocumentsIndex({"documents": documents})
+				self.assertEqual(
+					sorted(entry["local_path"] for entry in index["documents"]),
+					["documents/A/a.pdf", "documents/A/a.pdf.gz", "documents/A/liste.csv", "documents/A/paket.gz"],
+				)
+				(scraper.DOCUMENTS_DIR / "A" / "a.pdf.gz").unlink()
+				(scraper.DOCUMENTS_DIR / "A" / "paket.gz").unlink()
+
+				# Entfernte Dokumente verlieren ihre Varianten
+				scraper.precompressOutputs(documents[1:])
+				self.assertFalse((scraper.DOCUMENTS_DIR / "A" / "liste.csv.gz").exists())
+
+	# Änderungs-Feed mit Sequenznummern und Offset-Index
+	def test_compute_changes_classifies_entries(self):
+		old_by_key = {
+			"same": {"entry_key": "same", "sha256": "1", "title": "A", "last_seen": "gestern"},
+			"content": {"entry_key": "content", "sha256": "1", "title": "B"},
+			"meta": {"entry_key": "meta", "sha256": "1", "title": "C"},
+			"gone": {"entry_key": "gone", "sha256": "1"},
+		}
+		documents = [
+			{"entry_key": "same", "sha256": "1", "title": "A", "last_seen": "heute", "downloaded_at": "heute"},
+			{"entry_key": "content", "sha256": "2", "title": "B"},
+			{"entry_key": "meta", "sha256": "1", "title": "C neu"},
+			{"entry_key": "new", "sha256": "3"},
+		]
+
+		self.assertEqual(scraper.computeChanges(old_by_key, documents), {
+			"added": ["new"],
+			"updated": ["content"],
+			"removed": ["gone"],
+			"metadata_changed": ["meta"],
+		})
+
+	def test_change_feed_reads_only_newer_records_and_recovers_torn_writes(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			feed = scraper.ChangeFeed(Path(tmp) / "changes.jsonl", Path(tmp) / "changes.idx")
+			self.assertEqual(feed.lastSeq(), 0)
+			self.assertEqual(feed.since(0), [])
+
+			for key in ("a", "b", "c"):
+				feed.append({"added": [key]})
+
+			self.assertEqual(feed.lastSeq(), 3)
+			self.assertEqual([record["added"] for record in feed.since(1)], [["b"], ["c"]])
+			self.assertEqual(feed.since(3), [])
+			self.assertEqual(len(feed.since(-5)), 3)
+
+			# Abbruch nach der JSONL-Zeile bzw. mitten im Indexeintrag
+			with feed.path.open("ab") as handle:
+				handle.write(b'{"seq":4,"added":["x"]}\n{"seq":5')
+			with feed.index_path.open("ab") as handle:
+				handle.write(b"\x00\x00")
+			self.assertEqual(feed.lastSeq(), 3)
+			self.assertEqual(len(feed.since(0)), 3)
+
+			self.assertEqual(feed.append({"added": ["d"]}), 4)
+			self.assertEqual([record["added"] for record in feed.since(2)], [["c"], ["d"]])
+			self.assertEqual(len(feed.path.read_text(encoding="utf-8").splitlines()), 4)
+
+	# SQLite-Metadaten mit Einzel-Upserts und JSON-Export
+	def test_sqlite_store_upsert_query_and_export(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			store = scraper.SqliteMetadataStore(Path(tmp) / "meta.sqlite")
+			try:
+				mode = store._connection.execute("PRAGMA journal_mode").fetchone()[0]
+				self.assertEqual(mode.lower(), "wal")
+
+				store.upsert({"entry_key": "b", "url": "https://example.org/x.pdf", "local_path": "documents/B/x.pdf", "sha256": "1"})
+				store.upsert({"entry_key": "a", "url": "https://example.org/x.pdf", "local_path": "documents/A/x.pdf", "sha256": "1"})
+				store.upsert({"entry_key": "b", "url": "https://example.org/x.pdf", "local_path": "documents/B/x.pdf", "sha256": "2"})
+
+				self.assertEqual(store.count(), 2)
+				self.assertEqual(store.get("b")["sha256"], "2")
+				self.assertEqual([entry["entry_key"] for entry in store.byUrl("https://example.org/x.pdf")], ["a", "b"])
+				self.assertEqual(store.byLocalPath("documents/A/x.pdf")["entry_key"], "a")
+				self.assertIsNone(store.byLocalPath("documents/C/x.pdf"))
+
+				self.assertEqual(store.deleteKeys(["a", "fehlt"]), 1)
+				store.setMeta("updated_at", "2025-01-01T00:00:00+00:00")
+				exported = store.exportMetadata()
+				self.assertEqual(exported["document_count"], 1)
+				self.assertEqual(exported["updated_at"], "2025-01-01T00:00:00+00:00")
+				self.assertEqual(exported["source"], scraper.BASE_URL)
+				self.assertEqual(exported["documents"][0]["entry_key"], "b")
+			finally:
+				store.close()
+
+	def test_main_with_metadata_db_imports_json_and_keeps_export(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			doc = scraper.SourceDocument("k1", "https://example.org/a.pdf", "A", "d", "Studium", "")
+			stale = {"entry_key": "alt", "url": "https://example.org/alt.pdf", "title": "Alt", "local_path": ""}
+
+			def fake_download(_session, url, destination, validators=None):
+				destination.parent.mkdir(parents=True, exist_ok=True)
+				destination.write_bytes(b"inhalt")
+				return scraper.DownloadResult(ok=True, headers={"etag": '"e"'}, sha256=scraper.hashlib.sha256(b"inhalt").hexdigest(), size=6)
+
+			with _redirected_data_dir(data_dir):
+				scraper.saveMetadata({"updated_at": "x", "source": scraper.BASE_URL, "documents": [stale]})
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=([doc], {"k1"})), \
+					 patch("scripts.scraper_dokumente.downloadFile", side_effect=fake_download), \
+					 patch("scripts.scraper_dokumente.send_new_without_description_notification", return_value=True), \
+					 patch("scripts.scraper_dokumente.time.sleep"):
+					exit_code = scraper.main(["--metadata-db"])
+
+				self.assertEqual(exit_code, 0)
+				store = scraper.SqliteMetadataStore(scraper.METADATA_DB_FILE)
+				try:
+					self.assertEqual(store.keys(), {"k1"})
+					exported = store.exportMetadata()
+				finally:
+					store.close()
+				saved = scraper.loadMetadata()
+				self.assertEqual(saved["documents"], exported["documents"])
+				self.assertEqual(saved["document_count"], 1)
+
+	# Journal pro Dokument und Fortsetzen nach einem Abbruch
+	def test_load_run_journal_ignores_truncated_line_and_later_failure(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			path = Path(tmp) / "journal.jsonl"
+			journal = scraper.RunJournal(path)
+			journal.record("a", "done", {"entry_key": "a"})
+			journal.record("b", "done", {"entry_key": "b"})
+			journal.record("b", "failed", error="timeout")
+			journal.close()
+			with path.open("a", encoding="utf-8") as handle:
+				handle.write('{"entry_key": "c", "stat')
+
+			self.assertEqual(scraper.loadRunJournal(path), {"a": {"entry_key": "a"}})
+
+	def test_main_resume_skips_journaled_documents(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			docs = [
+				scraper.SourceDocument("k1", "https://example.org/a.pdf", "A", "d", "Studium", ""),
+				scraper.SourceDocument("k2", "https://example.org/b.pdf", "B", "d", "Studium", ""),
+			]
+
+			def fake_download(_session, url, destination, validators=None):
+				destination.parent.mkdir(parents=True, exist_ok=True)
+				destination.write_bytes(url.encode())
+				return scraper.DownloadResult(ok=True, sha256=scraper.hashlib.sha256(url.encode()).hexdigest())
+
+			with _redirected_data_dir(data_dir):
+				# Ein abgebrochener Lauf hat k1 bereits fertig geladen
+				done = scraper.buildDocumentEntry(docs[0], Path("documents/Studium/a.pdf"), {})
+				(data_dir / done["local_path"]).parent.mkdir(parents=True)
+				(data_dir / done["local_path"]).write_bytes(b"a")
+				journal = scraper.RunJournal()
+				journal.record("k1", "done", done)
+				journal.close()
+
+				with patch("scripts.scraper_dokumente.buildSession", return_value=object()), \
+					 patch("scripts.scraper_dokumente.crawlAllDocuments", return_value=(docs, {"k1", "k2"})), \
+					 patch("scripts.scraper_dokumente.downloadFile", side_effect=fake_download) as download_mock, \
+					 patch("scripts.scraper_dokumente.send_new_without_description_notification", return_value=True), \
+					 patch("scripts.scraper_dokumente.time.sleep"):
+					exit_code = scraper.main(["--resume"])
+
+				self.assertEqual(exit_code, 0)
+				self.assertEqual([call.args[1] for call in download_mock.call_args_list], ["https://example.org/b.pdf"])
+				saved = scraper.loadMetadata()
+				self.assertEqual({entry["entry_key"] for entry in saved["documents"]}, {"k1", "k2"})
+				self.assertFalse(scraper.JOURNAL_FILE.exists())
+
+	# Adaptiver Token-Bucket pro Host
+	def test_rate_limiter_waits_for_tokens_and_backs_off(self):
+		clock = [0.0]
+		sleeps = []
+
+		def fake_sleep(seconds):
+			sleeps.append(seconds)
+			clock[0] += seconds
+
+		limiter = scraper.AdaptiveRateLimiter(rate=2.0, burst=1.0, clock=lambda: clock[0])
+		url = "https://example.org/a.pdf"
+		with patch("scripts.scraper_dokumente.time.sleep", side_effect=fake_sleep):
+			limiter.acquire(url)
+			limiter.acquire(url)
+			self.assertEqual(sleeps, [0.5])
+
+			limiter.feedback(url, 200, 0.1)
+			self.assertEqual(limiter.rate(url), 2.0 + scraper.RATE_INCREASE_STEP)
+
+			limiter.feedback(url, 429, 0.1, retry_after=10.0)
+			self.assertEqual(limiter.rate(url), (2.0 + scraper.RATE_INCREASE_STEP) * scraper.RATE_BACKOFF_FACTOR)
+			limiter.acquire("https://other.example.org/b.pdf")
+			self.assertEqual(len(sleeps), 1)
+			limiter.acquire(url)
+			self.assertGreaterEqual(clock[0], 10.5)
+
+	def test_parse_retry_after_seconds_and_date(self):
+		self.assertEqual(scraper.parseRetryAfter("7"), 7.0)
+		self.assertEqual(scraper.parseRetryAfter("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+		self.assertEqual(scraper.parseRetryAfter("999999"), scraper.RETRY_AFTER_MAX_SECONDS)
+		self.assertIsNone(scraper.parseRetryAfter("bald"))
+		self.assertIsNone(scraper.parseRetryAfter(None))
+
+	def test_rate_limited_adapter_retries_after_429(self):
+		busy = MagicMock(status_code=429, headers={"Retry-After": "2"})
+		ok = MagicMock(status_code=200, headers={})
+		request = MagicMock(url="https://example.org/a.pdf", method="GET")
+		limiter = MagicMock()
+		adapter = scraper.RateLimitedAdapter(limiter=limiter)
+
+		with patch.object(scraper.http_client.HTTPAdapter, "send", side_effect=[busy, ok]) as send_mock:
+			response = adapter.send(request)
+
+		self.assertIs(response, ok)
+		self.assertEqual(send_mock.call_count, 2)
+		self.assertEqual(limiter.acquire.call_count, 2)
+		self.assertEqual(limiter.feedback.call_args_list[0].args[3], 2.0)
+		busy.close.assert_called_once()
+
+	# Aufräumen verwaister Dateien und leerer Ordner
+	def test_sweep_orphans_removes_untracked_files_and_empty_dirs(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			with _redirected_data_dir(data_dir):
+				files = {
+					"documents/A/keep.pdf": b"k",
+					"documents/A/.keep2.pdf.part": b"p",
+					"documents/A/.keep2.pdf.part.json": b"{}",
+					"documents/A/keep.pdf.gz": b"g",
+					"documents/A/.gone.pdf.part": b"pp",
+					"documents/Alt/Sub/orphan.pdf": b"12345",
+					"documents/A/manual.docx": b"123",
+				}
+				for relative, content in files.items():
+					(data_dir / relative).parent.mkdir(parents=True, exist_ok=True)
+					(data_dir / relative).write_bytes(content)
+				tracked = {os.path.join("documents", "A", "keep.pdf"), os.path.join("documents", "A", "keep2.pdf")}
+
+				result = scraper.sweepOrphans(tracked)
+
+				self.assertEqual(result.files, 3)
+				self.assertEqual(result.bytes_reclaimed, 10)
+				self.assertEqual(result.directories, 2)
+				remaining = sorted(str(path.relative_to(data_dir)) for path in data_dir.rglob("*") if path.is_file())
+				self.assertEqual(remaining, sorted(relative for relative in files if "gone" not in relative and "Alt" not in relative and "manual" not in relative))
+				self.assertTrue((data_dir / "documents").is_dir())
+
+	def test_sweep_orphans_quarantines_and_ignores_hardlinked_bytes(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			with _redirected_data_dir(data_dir):
+				orphan = data_dir / "documents" / "X" / "a.pdf"
+				orphan.parent.mkdir(parents=True)
+				orphan.write_bytes(b"abc")
+				linked = data_dir / "documents" / "X" / "b.pdf"
+				blob = data_dir / "blob"
+				blob.write_bytes(b"defg")
+				os.link(blob, linked)
+
+				result = scraper.sweepOrphans(set(), scraper.QUARANTINE_DIR)
+
+				self.assertEqual(result.files, 2)
+				self.assertEqual((scraper.QUARANTINE_DIR / "documents" / "X" / "a.pdf").read_bytes(), b"abc")
+				self.assertFalse((data_dir / "documents" / "X").exists())
+
+				orphan.parent.mkdir(parents=True)
+				os.link(blob, linked)
+				self.assertEqual(scraper.sweepOrphans(set()).bytes_reclaimed, 0)
+
+	# Vorberechneter Index für /api/documents
+	def test_build_documents_index_joins_files_and_metadata(self):
+		with tempfile.TemporaryDirectory() as tmp:
+			data_dir = Path(tmp) / "data"
+			with _redirected_data_dir(data_dir):
+				for relative in ("Studium/Pruefung/a.pdf", "Studium/b.pdf", "c.pdf", "Studium/.d.pdf.part"):
+					path = scraper.DOCUMENTS_DIR / relative
+					path.parent.mkdir(parents=True, exist_ok=True)
+					path.write_bytes(b"x")
+				metadata = {"documents": [
+					{"local_path": "documents/Studium/b.pdf", "title": "B", "description": "Beschreibung", "filename": "b.pdf", "thumbnail": "thumbnails/ab/b.webp"},
+					{"local_path": "documents/Fehlt/x.pdf", "title": "X"},
+				]}
+
+				index = scraper.buildDocumentsIndex(metadata)
+				scraper.saveDocumentsIndex(index)
+
+				self.assertEqual(index["total"], 3)
+				self.assertEqual(index["metadata_total"], 2)
+				self.assertEqual([record["local_path"] for record in index["documents"]], [
+					"documents/Studium/Pruefung/a.pdf", "documents/Studium/b.pdf", "documents/c.pdf",
+				])
+				self.assertEqual(index["documents"][1]["title"], "B")
+				self.assertEqual(index["documents"][1]["thumbnail"], "thumbnails/ab/b.webp")
+				self.assertEqual(index["documents"][0]["thumbnail"], "")
+				self.assertEqual(index["documents"][2]["category"], "Allgemein")
+				studium = [node for node in index["categories"] if node["name"] == "Studium"][0]
+				self.assertEqual((studium["count"], studium["documents"]), (2, 1))
+				self.assertEqual(studium["children"][0]["path"], "Studium/Pruefung")
+
+				saved = scraper.json.loads(scraper.DOCUMENTS_INDEX_FILE.read_text(encoding="utf-8"))
+				self.assertEqual(saved["etag"], index["etag"])
+				self.assertEqual(scraper.buildDocumentsIndex(metadata)["etag"], index["etag"])
+				metadata["documents"][0]["title"] = "Neu"
+				self.assertNotEqual(scraper.buildDocumentsIndex(metadata)["etag"], index["etag"])
 
 if __name__ == "__main__":
 	unittest.main()
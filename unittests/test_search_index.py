@@ -0,0 +1,122 @@
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	# Importpfad erweitern dass scripts.search_index auch beim direkten Teststart gefunden wird
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import scripts.search_index as search_index
+
+
+def _write_docx(path: Path, text: str) -> None:
+	# Minimale DOCX-Datei, die nur den Dokumenttext enthält
+	path.parent.mkdir(parents=True, exist_ok=True)
+	with zipfile.ZipFile(path, "w") as archive:
+		archive.writestr("word/document.xml", f"<w:document><w:body><w:p><w:t>{text}</w:t></w:p></w:body></w:document>")
+
+
+def _write_odt(path: Path, text: str) -> None:
+	# Minimale ODT-Datei mit content.xml
+	path.parent.mkdir(parents=True, exist_ok=True)
+	with zipfile.ZipFile(path, "w") as archive:
+		archive.writestr("content.xml", f"<office:document-content><text:p>{text}</text:p></office:document-content>")
+
+
+class SearchIndexTests(unittest.TestCase):
+	def setUp(self):
+		self._tmp = tempfile.TemporaryDirectory()
+		self.data_dir = Path(self._tmp.name) / "data"
+		self.index_dir = self.data_dir / "search_index"
+
+	def tearDown(self):
+		self._tmp.cleanup()
+
+	def _entry(self, key, relative, sha, title="", description=""):
+		return {"entry_key": key, "local_path": relative, "sha256": sha, "title": title, "description": description}
+
+	# Tokenisierung und Textextraktion
+	def test_tokenize_normalizes_case_and_umlauts(self):
+		self.assertEqual(search_index.tokenize("Prüfungsordnung, PRÄSENZ & Maß a"), ["pruefungsordnung", "praesenz", "mass"])
+
+	def test_extract_text_from_office_formats(self):
+		docx = self.data_dir / "a.docx"
+		odt = self.data_dir / "b.odt"
+		_write_docx(docx, "Praxisbericht &amp; Vorlage")
+		_write_odt(odt, "Antrag Urlaubssemester")
+
+		self.assertIn("Praxisbericht & Vorlage", search_index.extractText(docx))
+		self.assertIn("Urlaubssemester", search_index.extractText(odt))
+		self.assertEqual(search_index.extractText(self.data_dir / "fehlt.docx"), "")
+
+	# Index aufbauen, abfragen und inkrementell aktualisieren
+	def test_search_ranks_documents_containing_all_terms(self):
+		_write_docx(self.data_dir / "documents" / "a.docx", "Vorlage für den Praxisbericht im Studium")
+		_write_docx(self.data_dir / "documents" / "b.docx", "Praxisbericht Bewertung durch den Betreuer")
+		entries = [
+			self._entry("a", "documents/a.docx", "1" * 64, title="Praxisbericht Vorlage"),
+			self._entry("b", "documents/b.docx", "2" * 64, title="Bewertungsbogen"),
+			self._entry("c", "documents/c.pdf", "3" * 64, title="Studienordnung", description="Vorlage"),
+		]
+		index = search_index.SearchIndex(self.index_dir)
+		stats = index.update(entries, self.data_dir)
+
+		self.assertEqual(stats["indexed"], 3)
+		self.assertEqual(stats["extracted"], 2)
+		fresh = search_index.SearchIndex(self.index_dir)
+		self.assertEqual([key for key, _ in fresh.search("praxisbericht vorlage")], ["a"])
+		self.assertEqual([key for key, _ in fresh.search("Praxisbericht")], ["a", "b"])
+		self.assertEqual(fresh.search("Vorlage Mensa"), [])
+		self.assertEqual(fresh.search(""), [])
+
+	def test_update_skips_unchanged_and_reuses_content_by_sha(self):
+		_write_docx(self.data_dir / "documents" / "a.docx", "Vorlage Praxisbericht")
+		entries = [self._entry("a", "documents/a.docx", "1" * 64, title="A")]
+		search_index.SearchIndex(self.index_dir).update(entries, self.data_dir)
+
+		with patch("scripts.search_index.extractText") as extract_mock:
+			stats = search_index.SearchIndex(self.index_dir).update(entries, self.data_dir)
+			self.assertEqual(stats, {"indexed": 0, "removed": 0, "extracted": 0, "shards_written": 0})
+
+			# Gleicher Inhalt unter neuem Titel wird ohne neue Extraktion neu indexiert
+			renamed = [self._entry("a", "documents/a.docx", "1" * 64, title="Neuer Titel")]
+			stats = search_index.SearchIndex(self.index_dir).update(renamed, self.data_dir)
+			extract_mock.assert_not_called()
+		self.assertEqual(stats["indexed"], 1)
+		self.assertEqual([key for key, _ in search_index.SearchIndex(self.index_dir).search("titel vorlage")], ["a"])
+		self.assertEqual(search_index.SearchIndex(self.index_dir).search("A"), [])
+
+	def test_update_removes_documents_and_their_content(self):
+		_write_docx(self.data_dir / "documents" / "a.docx", "Praxisbericht")
+		entries = [
+			self._entry("a", "documents/a.docx", "1" * 64),
+			self._entry("b", "documents/b.txt", "2" * 64, title="Praxisbericht Hinweise"),
+		]
+		index = search_index.SearchIndex(self.index_dir)
+		index.update(entries, self.data_dir)
+
+		stats = search_index.SearchIndex(self.index_dir).update(entries[1:], self.data_dir)
+
+		self.assertEqual(stats["removed"], 1)
+		self.assertEqual([key for key, _ in search_index.SearchIndex(self.index_dir).search("praxisbericht")], ["b"])
+		self.assertFalse(search_index.SearchIndex(self.index_dir).contentPath("1" * 64).exists())
+
+	def test_missing_pdf_support_rebuilds_when_it_becomes_available(self):
+		entries = [self._entry("a", "documents/a.docx", "1" * 64, title="Vorlage")]
+		_write_docx(self.data_dir / "documents" / "a.docx", "Praxisbericht")
+		with patch("scripts.search_index.PdfReader", None):
+			search_index.SearchIndex(self.index_dir).update(entries, self.data_dir)
+		with patch("scripts.search_index.PdfReader", object()):
+			stats = search_index.SearchIndex(self.index_dir).update(entries, self.data_dir)
+
+		self.assertEqual(stats["indexed"], 1)
+		self.assertEqual(stats["extracted"], 0)
+		self.assertEqual(stats["shards_written"], search_index.SHARD_COUNT)
+
+
+if __name__ == "__main__":
+	unittest.main()
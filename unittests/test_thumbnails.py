@@ -0,0 +1,94 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+	# Importpfad erweitern dass scripts.thumbnails auch beim direkten Teststart gefunden wird
+	sys.path.insert(0, str(PROJECT_ROOT))
+
+import scripts.thumbnails as thumbnails
+
+
+class ThumbnailTests(unittest.TestCase):
+	def setUp(self):
+		self._tmp = tempfile.TemporaryDirectory()
+		self.data_dir = Path(self._tmp.name) / "data"
+		self.thumbnails_dir = self.data_dir / "thumbnails"
+
+	def tearDown(self):
+		self._tmp.cleanup()
+
+	def _entry(self, relative, sha):
+		return {"entry_key": relative, "local_path": relative, "sha256": sha}
+
+	def _writeImage(self, relative, color, size=(800, 400), mode="RGB"):
+		path = self.data_dir / relative
+		path.parent.mkdir(parents=True, exist_ok=True)
+		thumbnails.Image.new(mode, size, color).save(path)
+		return path
+
+	# Weiterverwendung ohne Bildbibliothek
+	def test_existing_thumbnails_are_reused_and_orphans_removed(self):
+		reused = self.thumbnails_dir / thumbnails.thumbnailName("a" * 64, "webp")
+		orphan = self.thumbnails_dir / thumbnails.thumbnailName("b" * 64, "jpg")
+		for path in (reused, orphan):
+			path.parent.mkdir(parents=True, exist_ok=True)
+			path.write_bytes(b"bild")
+		entries = [
+			self._entry("documents/logo.png", "a" * 64),
+			self._entry("documents/kopie.PNG", "a" * 64),
+			self._entry("documents/neu.jpg", "c" * 64),
+			{**self._entry("documents/text.pdf", "d" * 64), "thumbnail": "thumbnails/alt.webp"},
+		]
+
+		with patch("scripts.thumbnails.Image", None):
+			stats = thumbnails.updateThumbnails(entries, self.data_dir, self.thumbnails_dir)
+
+		self.assertEqual(stats, {"generated": 0, "reused": 1, "failed": 0, "removed": 1})
+		expected = f"thumbnails/{thumbnails.thumbnailName('a' * 64, 'webp')}"
+		self.assertEqual([entry.get("thumbnail") for entry in entries], [expected, expected, None, None])
+		self.assertTrue(reused.exists())
+		self.assertFalse(orphan.parent.exists())
+
+	# Erzeugen mit Pillow
+	@unittest.skipUnless(thumbnails.Image is not None, "Pillow ist nicht installiert")
+	def test_thumbnails_are_generated_once_per_content(self):
+		self._writeImage("documents/logo.png", (200, 0, 0, 0), mode="RGBA")
+		self._writeImage("documents/foto.jpg", (0, 0, 200), size=(300, 900))
+		self._writeImage("documents/kopie.jpg", (0, 0, 200), size=(300, 900))
+		(self.data_dir / "documents" / "kaputt.gif").write_bytes(b"kein Bild")
+		entries = [
+			self._entry("documents/logo.png", "1" * 64),
+			self._entry("documents/foto.jpg", "2" * 64),
+			self._entry("documents/kopie.jpg", "2" * 64),
+			self._entry("documents/kaputt.gif", "3" * 64),
+		]
+
+		stats = thumbnails.updateThumbnails(entries, self.data_dir, self.thumbnails_dir, workers=2)
+
+		self.assertEqual((stats["generated"], stats["failed"]), (2, 1))
+		self.assertEqual(entries[1]["thumbnail"], entries[2]["thumbnail"])
+		self.assertNotIn("thumbnail", entries[3])
+		with thumbnails.Image.open(self.data_dir / entries[1]["thumbnail"]) as image:
+			self.assertEqual(max(image.size), thumbnails.THUMBNAIL_SIZE)
+			self.assertEqual(image.size[1], thumbnails.THUMBNAIL_SIZE)
+
+		with patch("scripts.thumbnails.renderAll") as render_mock:
+			render_mock.return_value = []
+			stats = thumbnails.updateThumbnails(entries[:3], self.data_dir, self.thumbnails_dir)
+		self.assertEqual(render_mock.call_args.args[0], [])
+		self.assertEqual(stats["reused"], 2)
+
+		# Neuer Inhalt unter demselben Pfad ersetzt das alte Vorschaubild
+		self._writeImage("documents/logo.png", (0, 200, 0))
+		entries[0]["sha256"] = "4" * 64
+		stats = thumbnails.updateThumbnails(entries[:3], self.data_dir, self.thumbnails_dir, workers=1)
+		self.assertEqual((stats["generated"], stats["removed"]), (1, 1))
+		self.assertIn("4" * 64, entries[0]["thumbnail"])
+
+
+if __name__ == "__main__":
+	unittest.main()